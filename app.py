@@ -4,15 +4,29 @@ Nova interface visual moderna e interativa.
 """
 
 import streamlit as st
+import functools
 import time
 import os
 import sys
+import logging
 from pathlib import Path
 
-sys.path.append(str(Path(__file__).parent / "src"))
+_SRC_PATH = str(Path(__file__).parent / "src")
+if _SRC_PATH not in sys.path:
+    sys.path.append(_SRC_PATH)
 
-from src.core import DesmentAI
-from src.utils import LLMLoader
+# Configuração única de logging; os módulos de src apenas obtêm seus loggers
+logging.basicConfig(
+    level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Traceback completo na interface apenas em modo de desenvolvimento
+DEBUG = os.getenv("DESMENTAI_DEBUG", "false").lower() == "true"
+
+# DesmentAI e LLMLoader são importados dentro das funções em cache: carregam
+# LangChain, LangGraph e torch, e não devem atrasar a primeira renderização
 
 st.set_page_config(
     page_title="DesmentAI - Combate a Fake News",
@@ -21,396 +35,146 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-st.markdown("""
-<style>
-    /* Importar fontes */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap');
-    
-    /* Reset global */
-    * {
-        font-family: 'Inter', sans-serif;
-    }
-    
-    .main .block-container {
-        padding-top: 1rem;
-        padding-bottom: 1rem;
-        max-width: 1200px;
-    }
-    
-    /* Cabeçalho principal com animação */
-    .hero-section {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
-        color: white;
-        padding: 4rem 2rem;
-        border-radius: 20px;
-        margin-bottom: 3rem;
-        text-align: center;
-        position: relative;
-        overflow: hidden;
-        box-shadow: 0 20px 40px rgba(102, 126, 234, 0.3);
-    }
-    
-    .hero-section::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        bottom: 0;
-        background: url('data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><defs><pattern id="grain" width="100" height="100" patternUnits="userSpaceOnUse"><circle cx="25" cy="25" r="1" fill="white" opacity="0.1"/><circle cx="75" cy="75" r="1" fill="white" opacity="0.1"/><circle cx="50" cy="10" r="0.5" fill="white" opacity="0.1"/></pattern></defs><rect width="100" height="100" fill="url(%23grain)"/></svg>');
-        opacity: 0.3;
-    }
-    
-    .hero-content {
-        position: relative;
-        z-index: 1;
-    }
-    
-    .hero-title {
-        font-size: 4rem;
-        font-weight: 800;
-        margin-bottom: 1rem;
-        background: linear-gradient(45deg, #fff, #f0f9ff);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        text-shadow: 0 4px 8px rgba(0,0,0,0.1);
-    }
-    
-    .hero-subtitle {
-        font-size: 1.5rem;
-        font-weight: 300;
-        opacity: 0.9;
-        margin-bottom: 2rem;
-    }
-    
-    .hero-stats {
-        display: flex;
-        justify-content: center;
-        gap: 3rem;
-        margin-top: 2rem;
-    }
-    
-    .stat-item {
-        text-align: center;
-    }
-    
-    .stat-number {
-        font-size: 2.5rem;
-        font-weight: 700;
-        display: block;
-    }
-    
-    .stat-label {
-        font-size: 0.9rem;
-        opacity: 0.8;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-    }
-    
-    /* Cards modernos */
-    .modern-card {
-        background: white;
-        border-radius: 16px;
-        padding: 2rem;
-        margin: 1.5rem 0;
-        box-shadow: 0 10px 30px rgba(0,0,0,0.1);
-        border: 1px solid rgba(255,255,255,0.2);
-        transition: all 0.3s ease;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .modern-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 4px;
-        background: linear-gradient(90deg, #667eea, #764ba2);
-    }
-    
-    .modern-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 20px 40px rgba(0,0,0,0.15);
-    }
-    
-    /* Status indicators modernos */
-    .status-badge {
-        display: inline-flex;
-        align-items: center;
-        gap: 0.5rem;
-        padding: 0.5rem 1rem;
-        border-radius: 50px;
-        font-weight: 600;
-        font-size: 0.9rem;
-    }
-    
-    .status-success {
-        background: linear-gradient(135deg, #10b981, #059669);
-        color: white;
-        box-shadow: 0 4px 12px rgba(16, 185, 129, 0.3);
-    }
-    
-    .status-error {
-        background: linear-gradient(135deg, #ef4444, #dc2626);
-        color: white;
-        box-shadow: 0 4px 12px rgba(239, 68, 68, 0.3);
-    }
-    
-    .status-warning {
-        background: linear-gradient(135deg, #f59e0b, #d97706);
-        color: white;
-        box-shadow: 0 4px 12px rgba(245, 158, 11, 0.3);
-    }
-    
-    /* Conclusões com design único */
-    .conclusion-modern {
-        border-radius: 16px;
-        padding: 2rem;
-        margin: 2rem 0;
-        font-weight: 700;
-        font-size: 1.3rem;
-        text-align: center;
-        position: relative;
-        overflow: hidden;
-        box-shadow: 0 10px 30px rgba(0,0,0,0.1);
-    }
-    
-    .conclusion-false {
-        background: linear-gradient(135deg, #fef2f2 0%, #fee2e2 100%);
-        border: 2px solid #ef4444;
-        color: #991b1b;
-    }
-    
-    .conclusion-true {
-        background: linear-gradient(135deg, #f0fdf4 0%, #dcfce7 100%);
-        border: 2px solid #22c55e;
-        color: #15803d;
-    }
-    
-    .conclusion-partial {
-        background: linear-gradient(135deg, #fffbeb 0%, #fef3c7 100%);
-        border: 2px solid #f59e0b;
-        color: #92400e;
-    }
-    
-    .conclusion-insufficient {
-        background: linear-gradient(135deg, #f8fafc 0%, #e2e8f0 100%);
-        border: 2px solid #64748b;
-        color: #475569;
-    }
-    
-    /* Fontes com design moderno */
-    .source-modern {
-        background: linear-gradient(135deg, #f8fafc 0%, #f1f5f9 100%);
-        border: 1px solid #e2e8f0;
-        border-radius: 12px;
-        padding: 1.5rem;
-        margin: 1rem 0;
-        transition: all 0.3s ease;
-        position: relative;
-    }
-    
-    .source-modern:hover {
-        transform: translateX(5px);
-        box-shadow: 0 8px 25px rgba(0,0,0,0.1);
-        border-color: #3b82f6;
-    }
-    
-    .source-header {
-        display: flex;
-        align-items: center;
-        gap: 1rem;
-        margin-bottom: 1rem;
-    }
-    
-    .source-icon {
-        width: 50px;
-        height: 50px;
-        background: linear-gradient(135deg, #3b82f6, #1d4ed8);
-        border-radius: 12px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        color: white;
-        font-size: 1.5rem;
-        font-weight: 700;
-    }
-    
-    .source-title {
-        color: #1e40af;
-        font-size: 1.2rem;
-        font-weight: 700;
-        margin: 0;
-    }
-    
-    .source-details {
-        background: white;
-        padding: 1rem;
-        border-radius: 8px;
-        border-left: 4px solid #3b82f6;
-        font-size: 0.95rem;
-        color: #374151;
-    }
-    
-    .source-details strong {
-        color: #1f2937;
-        font-weight: 600;
-    }
-    
-    /* Botões modernos */
-    .modern-button {
-        background: linear-gradient(135deg, #3b82f6 0%, #1d4ed8 100%);
-        color: white;
-        border: none;
-        border-radius: 12px;
-        padding: 1rem 2rem;
-        font-weight: 600;
-        font-size: 1.1rem;
-        transition: all 0.3s ease;
-        box-shadow: 0 8px 20px rgba(59, 130, 246, 0.3);
-        cursor: pointer;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .modern-button:hover {
-        background: linear-gradient(135deg, #1d4ed8 0%, #1e40af 100%);
-        transform: translateY(-2px);
-        box-shadow: 0 12px 25px rgba(59, 130, 246, 0.4);
-    }
-    
-    .modern-button::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -100%;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
-        transition: left 0.5s;
-    }
-    
-    .modern-button:hover::before {
-        left: 100%;
-    }
-    
-    /* Formulário moderno */
-    .form-modern {
-        background: white;
-        border-radius: 16px;
-        padding: 2rem;
-        box-shadow: 0 10px 30px rgba(0,0,0,0.1);
-        border: 1px solid #e2e8f0;
-    }
-    
-    .form-title {
-        color: #1f2937;
-        font-size: 1.5rem;
-        font-weight: 700;
-        margin-bottom: 1.5rem;
-        text-align: center;
-    }
-    
-    /* Disclaimer moderno */
-    .disclaimer-modern {
-        background: linear-gradient(135deg, #fffbeb 0%, #fef3c7 100%);
-        border: 2px solid #f59e0b;
-        border-radius: 16px;
-        padding: 2rem;
-        margin: 2rem 0;
-        box-shadow: 0 10px 30px rgba(245, 158, 11, 0.1);
-        position: relative;
-    }
-    
-    .disclaimer-modern::before {
-        content: '⚠️';
-        position: absolute;
-        top: -15px;
-        left: 20px;
-        background: #f59e0b;
-        color: white;
-        width: 30px;
-        height: 30px;
-        border-radius: 50%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 1.2rem;
-    }
-    
-    .disclaimer-title {
-        color: #92400e;
-        font-size: 1.3rem;
-        font-weight: 700;
-        margin: 0 0 1rem 0;
-        padding-left: 1rem;
-    }
-    
-    .disclaimer-list {
-        color: #92400e;
-        margin: 0;
-        padding-left: 1.5rem;
-    }
-    
-    .disclaimer-list li {
-        margin-bottom: 0.8rem;
-        line-height: 1.6;
-    }
-    
-    /* Sidebar moderna */
-    .sidebar-modern {
-        background: linear-gradient(180deg, #f8fafc 0%, #f1f5f9 100%);
-        border-radius: 16px;
-        padding: 1.5rem;
-        margin: 1rem 0;
-    }
-    
-    /* Animações */
-    @keyframes fadeInUp {
-        from {
-            opacity: 0;
-            transform: translateY(30px);
-        }
-        to {
-            opacity: 1;
-            transform: translateY(0);
-        }
-    }
-    
-    .fade-in {
-        animation: fadeInUp 0.6s ease-out;
-    }
-    
-    /* Responsividade */
-    @media (max-width: 768px) {
-        .hero-title {
-            font-size: 2.5rem;
-        }
-        
-        .hero-stats {
-            flex-direction: column;
-            gap: 1rem;
-        }
-        
-        .modern-card {
-            padding: 1.5rem;
-        }
-    }
-</style>
-""", unsafe_allow_html=True)
+# Folha de estilos da interface
+_CSS_PATH = Path(__file__).parent / "assets" / "styles.css"
+
+# Cabeçalho hero moderno
+_HEADER_HTML = """
+<div class="hero-section">
+    <div class="hero-content">
+        <h1 class="hero-title">🔍 DesmentAI</h1>
+        <p class="hero-subtitle">Sistema Inteligente de Combate a Fake News</p>
+    </div>
+</div>
+"""
+
+@st.cache_data(show_spinner=False)
+def load_css():
+    """Lê a folha de estilos uma única vez por processo."""
+    return _CSS_PATH.read_text(encoding="utf-8")
+
+def inject_css():
+    """Injeta a folha de estilos da interface."""
+    st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
+
+def render_header():
+    """Renderiza o cabeçalho hero."""
+    st.markdown(_HEADER_HTML, unsafe_allow_html=True)
+
+# Nomes legíveis dos arquivos da base de conhecimento
+_SOURCE_MAPPING = {
+    "verificacao_covid.html": "Verificação COVID-19",
+    "verificacao_clima.html": "Verificação Clima",
+    "verificacao_economia.txt": "Verificação Economia",
+    "verificacao_eleicoes.txt": "Verificação Eleições",
+    "verificacao_saude.txt": "Verificação Saúde",
+    "agencia_lupa.txt": "Agência Lupa",
+    "aos_fatos.txt": "Aos Fatos",
+    "boatos_org.txt": "Boatos.org",
+    "folha_ciencia.txt": "Folha Ciência",
+    "g1_politica.txt": "G1 Política"
+}
+
+# Aviso de sucesso e quadro de conclusão, pré-montados para cada conclusão
+_SUCCESS_CARD_HTML = """
+<div class="modern-card fade-in">
+    <h3 style="color: #22c55e; text-align: center; margin: 0;">✅ Verificação concluída!</h3>
+</div>
+"""
+
+_CONCLUSION_HTML = {
+    conclusion: f'{_SUCCESS_CARD_HTML}<div class="conclusion-modern conclusion-{css_class} fade-in">{label}</div>'
+    for conclusion, (css_class, label) in {
+        "VERDADEIRA": ("true", "✅ VERDADEIRA"),
+        "FALSA": ("false", "❌ FALSA"),
+        "PARCIALMENTE VERDADEIRA": ("partial", "⚠️ PARCIALMENTE VERDADEIRA"),
+        "INSUFICIENTE": ("insufficient", "❔ EVIDÊNCIAS INSUFICIENTES")
+    }.items()
+}
+
+# Descrição de cada etapa do grafo exibida no progresso da verificação
+_STAGE_LABELS = {
+    "supervisor": "Consulta analisada",
+    "retriever": "Documentos recuperados",
+    "claims": "Afirmações extraídas",
+    "self_check": "Evidências avaliadas",
+    "conclusion": "Conclusão identificada",
+    "answer": "Resposta gerada",
+    "safety": "Revisão de segurança concluída",
+    "error_handler": "Erro tratado"
+}
+
+# Lista de modelos exibida no painel lateral
+_MODELS_MD = """
+**Modelos de Linguagem (Gemini):**
+- `gemini-2.0-flash` - Mais recente e rápido - ⭐ RECOMENDADO
+- `gemini-1.5-flash` - Rápido e eficiente
+- `gemini-1.5-pro` - Alta qualidade
+- `gemini-1.0-pro` - Estável e confiável
+
+**Modelos de Embeddings:**
+- `all-MiniLM-L6-v2` - Rápido (22MB) - ⭐ RECOMENDADO
+- `paraphrase-multilingual-MiniLM-L12-v2` - Multilíngue (118MB)
+- `BAAI/bge-small-en-v1.5` - Boa qualidade (33MB)
 
+**Comandos de configuração:**
+"""
+
+_CONFIG_COMMANDS = """make config-gemini        # Modelo padrão (2.0-flash)
+make config-gemini-1.5    # Modelo 1.5-flash
+make config-gemini-pro    # Modelo 1.5-pro
+make quick-start-gemini   # Início rápido"""
+
+# Exemplos de afirmações para verificação rápida
+EXAMPLES = [
+    "A vacina contra COVID-19 causa autismo",
+    "O aquecimento global é causado pela atividade humana",
+    "As urnas eletrônicas brasileiras já foram fraudadas",
+    "Beber água com limão cura o câncer",
+    "O salário mínimo vai dobrar no próximo ano"
+]
+
+@st.cache_resource
+def get_llm_loader():
+    """Retorna o carregador de LLM compartilhado entre reruns e sessões."""
+    from src.utils import LLMLoader
+    return LLMLoader()
+
+@st.cache_resource(show_spinner="Inicializando sistema...")
+def get_desmentai():
+    """
+    Inicializa o DesmentAI uma única vez por processo, reutilizando o cliente do LLM.
+    
+    Embeddings, índice e agentes só são carregados na primeira verificação,
+    de modo que a abertura do app não espera por eles.
+    
+    Uma inicialização com falha gera exceção, para que não fique em cache e
+    seja refeita no próximo rerun.
+    """
+    from src.core import DesmentAI
+    desmentai = DesmentAI(llm_loader=get_llm_loader(), lazy=True)
+    if not desmentai.is_initialized:
+        raise RuntimeError(desmentai.initialization_error or "Falha na inicialização")
+    desmentai.precompute_query_embeddings(EXAMPLES)
+    return desmentai
+
+@st.cache_data(ttl=300, show_spinner=False)
 def check_gemini_status():
-    """Verifica se o Gemini está configurado e funcionando."""
+    """
+    Verifica se o Gemini está configurado e alcançável, com um GET HTTP aos
+    metadados do modelo (v1beta/models/<modelo>), sem gerar texto.
+    
+    Returns:
+        Tupla (status, mensagem de erro ou None). A exibição do erro fica a
+        cargo de quem chama, pois elementos dentro de funções em cache são
+        reproduzidos a cada acerto do cache.
+    """
     try:
-        llm_loader = LLMLoader()
-        return llm_loader.check_connection()
+        return get_llm_loader().probe_connection(), None
     except Exception as e:
-        st.error(f"Erro ao verificar Gemini: {str(e)}")
-        return False
+        return False, str(e)
 
+@functools.lru_cache(maxsize=512)
 def format_source_name(source_path):
     """Formata o nome da fonte de forma mais legível."""
     if not source_path:
@@ -419,35 +183,208 @@ def format_source_name(source_path):
     # Extrair nome do arquivo
     filename = os.path.basename(source_path)
     
-    # Mapear nomes de arquivos para nomes mais legíveis
-    source_mapping = {
-        "verificacao_covid.html": "Verificação COVID-19",
-        "verificacao_clima.html": "Verificação Clima",
-        "verificacao_economia.txt": "Verificação Economia",
-        "verificacao_eleicoes.txt": "Verificação Eleições",
-        "verificacao_saude.txt": "Verificação Saúde",
-        "agencia_lupa.txt": "Agência Lupa",
-        "aos_fatos.txt": "Aos Fatos",
-        "boatos_org.txt": "Boatos.org",
-        "folha_ciencia.txt": "Folha Ciência",
-        "g1_politica.txt": "G1 Política"
-    }
-    
-    return source_mapping.get(filename, filename.replace("_", " ").title())
+    return _SOURCE_MAPPING.get(filename) or filename.replace("_", " ").title()
 
-def main():
-    """Função principal da aplicação."""
-    
-    # Cabeçalho hero moderno
+def render_result(result, streamed="", header_slot=None, answer_slot=None):
+    """
+    Renderiza o resultado de uma verificação bem-sucedida.
+    
+    Args:
+        result: VerificationResult retornado pelo DesmentAI
+        streamed: Texto da resposta já exibido via stream
+        header_slot: Espaço reservado acima da resposta para o aviso e a conclusão
+        answer_slot: Espaço reservado onde a resposta foi transmitida
+    """
+    header = header_slot if header_slot is not None else st.empty()
+    
+    # Aviso de sucesso e quadro de conclusão em um único bloco
+    header.markdown(
+        _CONCLUSION_HTML.get(result.conclusion, _CONCLUSION_HTML["INSUFICIENTE"]),
+        unsafe_allow_html=True
+    )
+    
+    # Resposta final: substitui o texto transmitido se o agente Safety o revisou
+    final_answer = result.final_answer or "Resposta não disponível"
+    if final_answer != streamed:
+        (answer_slot if answer_slot is not None else st.empty()).markdown(final_answer)
+    
+    # Fontes e citações (uma única tabela ordenável)
+    citations = result.citations
+    if citations:
+        st.subheader("📚 Fontes Utilizadas")
+        citations = sorted(citations, key=lambda x: x.get("relevance_score", 0.0), reverse=True)
+        
+        rows = []
+        for citation in citations:
+            source = citation.get("source", "Fonte desconhecida")
+            url = citation.get("url") or (source if source.startswith("http") else None)
+            rows.append({
+                "Fonte": format_source_name(source),
+                "Arquivo": source,
+                "URL": url,
+                "Relevância": citation.get("relevance_score", 0.0)
+            })
+        
+        st.dataframe(
+            rows,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "URL": st.column_config.LinkColumn("URL"),
+                "Relevância": st.column_config.ProgressColumn(
+                    "Relevância", format="%.2f", min_value=0.0, max_value=1.0
+                )
+            }
+        )
+    else:
+        st.info("Nenhuma fonte específica foi utilizada para esta verificação.")
+    
+    # Disclaimer
     st.markdown("""
-    <div class="hero-section">
-        <div class="hero-content">
-            <h1 class="hero-title">🔍 DesmentAI</h1>
-            <p class="hero-subtitle">Sistema Inteligente de Combate a Fake News</p>
-        </div>
+    <div class="disclaimer-modern fade-in">
+        <h5 class="disclaimer-title">DISCLAIMER IMPORTANTE</h5>
+        <ul class="disclaimer-list">
+            <li>Esta informação é baseada em dados públicos disponíveis e não substitui a consulta a fontes primárias ou especialistas.</li>
+            <li>O objetivo é fornecer uma análise informativa com base nas fontes disponíveis.</li>
+            <li>Não oferecemos conselhos legais, médicos ou financeiros específicos.</li>
+            <li>Recomendamos sempre consultar fontes oficiais e especialistas.</li>
+            <li>As informações podem estar desatualizadas ou incompletas.</li>
+            <li>Use esta ferramenta como ponto de partida para investigação adicional.</li>
+        </ul>
     </div>
     """, unsafe_allow_html=True)
     
+    # Detalhes técnicos
+    with st.expander("🔧 Detalhes Técnicos"):
+        timings = result.timings
+        if timings:
+            st.metric("Tempo total", f"{timings.get('total_ms', 0.0):.0f} ms")
+            phases = {name: value for name, value in timings.items() if name != "total_ms"}
+            st.bar_chart({"ms": phases})
+        
+        if result.agent_results:
+            from src.utils.serialization import to_json
+            st.json(to_json(result.agent_results), expanded=False)
+        else:
+            st.write("Detalhes técnicos não disponíveis")
+
+@st.fragment
+def render_sidebar(desmentai, gemini_status):
+    """
+    Renderiza o painel lateral de status e ações.
+    
+    Executado como fragmento: cliques nos botões e ajustes nos controles
+    reexecutam apenas este painel, sem redesenhar o formulário e o resultado.
+    
+    Args:
+        desmentai: Instância do DesmentAI (None se a inicialização falhou)
+        gemini_status: Se o Gemini está configurado e alcançável
+    """
+    # Status do sistema
+    st.header("📊 Status do Sistema")
+    
+    # Estágios independentes: geração (API remota) e embeddings (modelo local)
+    init_success = desmentai is not None
+    embedding_manager = desmentai.embedding_manager if init_success else None
+    embedding_device = embedding_manager.device if embedding_manager else os.getenv("EMBEDDING_DEVICE", "cpu")
+    
+    if gemini_status:
+        llm_badge = '<div class="status-badge status-success">✅ LLM: Gemini Configurado</div>'
+    else:
+        llm_badge = '<div class="status-badge status-error">❌ LLM: Gemini Não Configurado</div>'
+    
+    if embedding_manager and embedding_manager.embedding_model is not None:
+        embedding_badge = f'<div class="status-badge status-success">✅ Embeddings: Carregados ({embedding_device})</div>'
+    elif init_success:
+        embedding_badge = '<div class="status-badge status-warning">⏳ Embeddings: Carregados na primeira verificação</div>'
+    else:
+        embedding_badge = '<div class="status-badge status-error">❌ Embeddings: Não Carregados</div>'
+    
+    st.markdown(llm_badge + embedding_badge, unsafe_allow_html=True)
+    
+    # Informações do sistema
+    st.header("ℹ️ Informações")
+    st.markdown(
+        "**Provedor:** Google Gemini (API)\n\n"
+        "**Modelo:** gemini-2.0-flash\n\n"
+        f"**Embeddings:** sentence-transformers (local, `{embedding_device}`)\n\n"
+        "**Vector Store:** FAISS"
+    )
+    
+    # Parâmetros de busca vetorial
+    st.header("🎛️ Parâmetros de Busca")
+    top_k = st.slider(
+        "Documentos recuperados (top_k)", 1, 20, 5,
+        help="Mais documentos aumentam a cobertura, mas também o tempo de resposta"
+    )
+    
+    # nprobe e efSearch só aparecem quando o índice carregado os utiliza
+    search_support = desmentai.get_search_param_support() if init_success else {}
+    nprobe = None
+    if search_support.get("nprobe"):
+        nprobe = st.slider(
+            "Listas IVF visitadas (nprobe)", 1, 128, min(max(desmentai.nprobe, 1), 128),
+            help="Valores maiores melhoram o recall do índice IVF ao custo de latência"
+        )
+    ef_search = None
+    if search_support.get("ef_search"):
+        ef_search = st.slider(
+            "Candidatos HNSW avaliados (efSearch)", 16, 512, min(max(desmentai.ef_search, 16), 512),
+            help="Valores maiores melhoram o recall do índice HNSW ao custo de latência"
+        )
+    if init_success:
+        desmentai.set_search_params(top_k=top_k, nprobe=nprobe, ef_search=ef_search)
+    
+    # Botões de ação
+    st.header("⚡ Ações Rápidas")
+    
+    if st.button("🔄 Recarregar Dados", use_container_width=True):
+        if init_success:
+            with st.spinner("Recarregando dados..."):
+                try:
+                    # Forçar nova verificação de conexão com o Gemini
+                    get_llm_loader().clear_connection_cache()
+                    check_gemini_status.clear()
+                    desmentai.reload_data()
+                    st.success("Dados recarregados com sucesso!")
+                except Exception as e:
+                    st.error(f"Erro ao recarregar dados: {str(e)}")
+        else:
+            st.warning("Sistema não inicializado")
+    
+    if st.button("🧹 Limpar Cache de Resultados", use_container_width=True):
+        if init_success:
+            desmentai.clear_cache()
+            st.success("Cache limpo! A próxima verificação será refeita.")
+        else:
+            st.warning("Sistema não inicializado")
+    
+    if st.button("📊 Status Detalhado", use_container_width=True):
+        if init_success:
+            try:
+                status = desmentai.get_system_status()
+                st.json(status)
+            except Exception as e:
+                st.error(f"Erro ao obter status: {str(e)}")
+        else:
+            st.warning("Sistema não inicializado")
+    
+    # Modelos disponíveis
+    st.header("🎯 Modelos Disponíveis")
+    
+    with st.expander("Ver modelos Gemini"):
+        st.markdown(_MODELS_MD)
+        st.code(_CONFIG_COMMANDS, language="bash")
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+def main():
+    """Função principal da aplicação."""
+    
+    # Estilos e cabeçalho hero moderno
+    inject_css()
+    render_header()
+    
     # Layout em duas colunas
     col1, col2 = st.columns([2, 1])
     
@@ -456,7 +393,9 @@ def main():
         st.markdown('<h2 class="form-title">🔍 Verificar Notícia</h2>', unsafe_allow_html=True)
         
         # Verificar status do Gemini
-        gemini_status = check_gemini_status()
+        gemini_status, gemini_error = check_gemini_status()
+        if gemini_error:
+            st.error(f"Erro ao verificar Gemini: {gemini_error}")
         
         if not gemini_status:
             st.error("""
@@ -471,8 +410,7 @@ def main():
         
         # Inicializar sistema
         try:
-            with st.spinner("Inicializando sistema..."):
-                desmentai = DesmentAI()
+            desmentai = get_desmentai()
             init_success = True
         except Exception as e:
             st.error(f"Erro ao inicializar sistema: {str(e)}")
@@ -496,156 +434,82 @@ def main():
                 help="Digite a notícia ou afirmação que deseja verificar"
             )
             
-            # Botão de verificação
-            submitted = st.form_submit_button("🔍 Verificar Notícia", use_container_width=True)
+            # Exemplos prontos (um único widget, sem rerun extra)
+            example = st.selectbox(
+                "Ou escolha um exemplo:",
+                [""] + EXAMPLES,
+                format_func=lambda x: x or "Selecione um exemplo..."
+            )
+            
+            # Botões de verificação
+            btn_col1, btn_col2 = st.columns(2)
+            with btn_col1:
+                submitted = st.form_submit_button("🔍 Verificar Notícia", use_container_width=True)
+            with btn_col2:
+                example_submitted = st.form_submit_button("📋 Verificar Exemplo", use_container_width=True)
+            
+            if example_submitted:
+                news_text = example
+                submitted = True
             
             if submitted:
                 if not news_text.strip():
                     st.warning("Por favor, digite uma notícia ou afirmação para verificar.")
                 else:
-                    # Processar verificação
-                    with st.spinner("Verificando notícia..."):
-                        try:
-                            result = desmentai.verify_news(news_text)
+                    # Processar verificação, com progresso por etapa
+                    status = st.status("Verificando notícia...", expanded=True)
+                    
+                    def on_stage(stage, elapsed):
+                        label = _STAGE_LABELS.get(stage, stage)
+                        if stage == "conclusion":
+                            label = f"{label}: {result.conclusion}"
+                        status.write(f"✔️ {label} ({elapsed * 1000:.0f} ms)")
+                        status.update(label=f"Verificando notícia... {label}")
+                    
+                    try:
+                        # Espaço reservado para o aviso de conclusão
+                        status_slot = st.empty()
+                        
+                        # Resposta principal, exibida conforme é gerada
+                        st.subheader("📰 Resposta Detalhada")
+                        from src.core import VerificationResult
+                        result = VerificationResult()
+                        answer_slot = st.empty()
+                        streamed = answer_slot.write_stream(desmentai.verify_news_stream(news_text, result, on_stage))
+                        streamed = streamed if isinstance(streamed, str) else ""
+                        
+                        if result.success:
+                            status.update(label="Verificação concluída", state="complete", expanded=False)
+                            
+                            # Guardar para reexibir em reruns sem nova verificação
+                            st.session_state.last_result = result
+                            st.session_state.last_query = news_text
                             
-                            if result["success"]:
-                                # Mostrar resultado de sucesso
-                                st.markdown("""
-                                <div class="modern-card fade-in">
-                                    <h3 style="color: #22c55e; text-align: center; margin: 0;">✅ Verificação concluída!</h3>
-                                </div>
-                                """, unsafe_allow_html=True)
-                                
-                                # Resposta principal
-                                st.subheader("📰 Resposta Detalhada")
-                                
-                                # Resposta detalhada
-                                st.write(result.get("final_answer", "Resposta não disponível"))
-                                st.markdown('</div>', unsafe_allow_html=True)
-                                
-                                # Fontes e citações
-                                citations = result.get("citations", [])
-                                if citations:
-                                    st.subheader("📚 Fontes Utilizadas")
-                                    citations = sorted(citations, key=lambda x: x.get("relevance_score", 0.0), reverse=True)
-                                    
-                                    for i, citation in enumerate(citations, 1):
-                                        source = citation.get("source", "Fonte desconhecida")
-                                        url = citation.get("url", "")
-                                        relevance = citation.get("relevance_score", 0.0)
-                                        
-                                        # Formatar nome da fonte
-                                        formatted_source = format_source_name(source)
-                                        
-                                        st.markdown(f"""
-                                        <div class="source-modern fade-in">
-                                            <div class="source-header">
-                                                <div class="source-icon">{i}</div>
-                                                <h5 class="source-title">📄 {formatted_source}</h5>
-                                            </div>
-                                            <div class="source-details">
-                                                <strong>Arquivo:</strong> {source}<br>
-                                                <strong>Relevância:</strong> {relevance:.2f}<br>
-                                            </div>
-                                        </div>
-                                        """, unsafe_allow_html=True)
-                                else:
-                                    st.info("Nenhuma fonte específica foi utilizada para esta verificação.")
-                                
-                                # Disclaimer
-                                st.markdown("""
-                                <div class="disclaimer-modern fade-in">
-                                    <h5 class="disclaimer-title">DISCLAIMER IMPORTANTE</h5>
-                                    <ul class="disclaimer-list">
-                                        <li>Esta informação é baseada em dados públicos disponíveis e não substitui a consulta a fontes primárias ou especialistas.</li>
-                                        <li>O objetivo é fornecer uma análise informativa com base nas fontes disponíveis.</li>
-                                        <li>Não oferecemos conselhos legais, médicos ou financeiros específicos.</li>
-                                        <li>Recomendamos sempre consultar fontes oficiais e especialistas.</li>
-                                        <li>As informações podem estar desatualizadas ou incompletas.</li>
-                                        <li>Use esta ferramenta como ponto de partida para investigação adicional.</li>
-                                    </ul>
-                                </div>
-                                """, unsafe_allow_html=True)
-                                
-                                # Detalhes técnicos
-                                with st.expander("🔧 Detalhes Técnicos"):
-                                    if "agent_results" in result:
-                                        st.json(result["agent_results"])
-                                    else:
-                                        st.write("Detalhes técnicos não disponíveis")
-                                
-                            else:
-                                # Mostrar erro
-                                st.error(f"❌ Erro na verificação: {result.get('error', 'Erro desconhecido')}")
-                                
-                        except Exception as e:
-                            st.error(f"Erro inesperado: {str(e)}")
+                            render_result(result, streamed, status_slot, answer_slot)
+                        else:
+                            # Mostrar erro
+                            st.session_state.pop("last_result", None)
+                            status.update(label="Falha na verificação", state="error")
+                            st.error(f"❌ Erro na verificação: {result.error or 'Erro desconhecido'}")
+                            
+                    except Exception as e:
+                        status.update(label="Falha na verificação", state="error")
+                        st.error(f"Erro inesperado: {str(e)}")
+                        logger.exception("Falha na verificação")
+                        if DEBUG:
                             st.exception(e)
+            
+            elif st.session_state.get("last_result"):
+                # Reexibir a última verificação (ex.: após clique em botões da barra lateral)
+                st.caption(f"Última verificação: {st.session_state.last_query}")
+                header_slot = st.empty()
+                st.subheader("📰 Resposta Detalhada")
+                render_result(st.session_state.last_result, header_slot=header_slot)
         
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
-        # Status do sistema
-        st.header("📊 Status do Sistema")
-        
-        if gemini_status:
-            st.markdown('<div class="status-badge status-success">✅ Gemini Configurado</div>', unsafe_allow_html=True)
-        else:
-            st.markdown('<div class="status-badge status-error">❌ Gemini Não Configurado</div>', unsafe_allow_html=True)
-        
-        # Informações do sistema
-        st.header("ℹ️ Informações")
-        st.write("**Provedor:** Google Gemini (API)")
-        st.write("**Modelo:** gemini-2.0-flash")
-        st.write("**Embeddings:** sentence-transformers")
-        st.write("**Vector Store:** FAISS")
-        
-        # Botões de ação
-        st.header("⚡ Ações Rápidas")
-        
-        if st.button("🔄 Recarregar Dados", use_container_width=True):
-            if init_success:
-                with st.spinner("Recarregando dados..."):
-                    try:
-                        desmentai.reload_data()
-                        st.success("Dados recarregados com sucesso!")
-                    except Exception as e:
-                        st.error(f"Erro ao recarregar dados: {str(e)}")
-            else:
-                st.warning("Sistema não inicializado")
-        
-        if st.button("📊 Status Detalhado", use_container_width=True):
-            if init_success:
-                try:
-                    status = desmentai.get_system_status()
-                    st.json(status)
-                except Exception as e:
-                    st.error(f"Erro ao obter status: {str(e)}")
-            else:
-                st.warning("Sistema não inicializado")
-        
-        # Modelos disponíveis
-        st.header("🎯 Modelos Disponíveis")
-        
-        with st.expander("Ver modelos Gemini"):
-            st.write("**Modelos de Linguagem (Gemini):**")
-            st.write("• `gemini-2.0-flash` - Mais recente e rápido - ⭐ RECOMENDADO")
-            st.write("• `gemini-1.5-flash` - Rápido e eficiente")
-            st.write("• `gemini-1.5-pro` - Alta qualidade")
-            st.write("• `gemini-1.0-pro` - Estável e confiável")
-            
-            st.write("**Modelos de Embeddings:**")
-            st.write("• `all-MiniLM-L6-v2` - Rápido (22MB) - ⭐ RECOMENDADO")
-            st.write("• `paraphrase-multilingual-MiniLM-L12-v2` - Multilíngue (118MB)")
-            st.write("• `BAAI/bge-small-en-v1.5` - Boa qualidade (33MB)")
-            
-            st.write("**Comandos de configuração:**")
-            st.code("make config-gemini        # Modelo padrão (2.0-flash)")
-            st.code("make config-gemini-1.5    # Modelo 1.5-flash")
-            st.code("make config-gemini-pro    # Modelo 1.5-pro")
-            st.code("make quick-start-gemini   # Início rápido")
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+        render_sidebar(desmentai if init_success else None, gemini_status)
     
     # Rodapé moderno
     st.markdown("""
@@ -5,6 +5,7 @@ Script para avaliar o DesmentAI usando RAGAS.
 
 import sys
 import os
+import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -15,7 +16,7 @@ load_dotenv()
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.core import DesmentAI
-from src.evaluation import RAGASEvaluator
+from src.evaluation import RAGASEvaluatorV2
 import logging
 
 # Configurar logging
@@ -32,9 +33,8 @@ def main():
         # 1. Inicializar DesmentAI
         print("Inicializando DesmentAI...")
         desmentai = DesmentAI()
-        success = desmentai.initialize()
         
-        if not success:
+        if not desmentai.is_initialized:
             print("❌ Falha na inicialização do DesmentAI")
             sys.exit(1)
         
@@ -42,14 +42,13 @@ def main():
         
         # 2. Inicializar avaliador
         print("Inicializando avaliador RAGAS...")
-        evaluator = RAGASEvaluator()
+        evaluator = RAGASEvaluatorV2()
         
         # 3. Executar avaliação
         print("Executando avaliação...")
         print("Isso pode levar alguns minutos...")
         
         # Escolher tipo de avaliação
-        import sys
         if len(sys.argv) > 1 and sys.argv[1] == "full":
             evaluation_type = "full"
         else:
@@ -57,10 +56,16 @@ def main():
         
         print(f"Executando avaliação: {evaluation_type}")
         
-        if evaluation_type == "quick":
-            results = evaluator.run_quick_evaluation(desmentai)
+        dataset_path = os.getenv("EVALUATION_DATASET")
+        if dataset_path:
+            test_dataset = evaluator.load_dataset(dataset_path)
+        elif evaluation_type == "quick":
+            test_dataset = evaluator.create_quick_dataset()
         else:
-            results = evaluator.evaluate_desmentai(desmentai)
+            test_dataset = evaluator.create_test_dataset()
+        
+        # Verificações concorrentes (limitadas por EVALUATION_CONCURRENCY)
+        results = asyncio.run(evaluator.aevaluate_desmentai(desmentai, test_dataset))
         
         # 4. Mostrar resultados
         if results.get("success", True):
@@ -55,7 +55,7 @@ def setup_initial_data():
         # 5. Inicializar DesmentAI para criar vector store
         logger.info("Inicializando DesmentAI...")
         desmentai = DesmentAI()
-        success = desmentai.initialize()
+        success = desmentai.is_initialized
         
         if success:
             logger.info("✅ DesmentAI inicializado com sucesso!")
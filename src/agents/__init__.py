@@ -4,7 +4,7 @@ Módulo de agentes para o DesmentAI.
 
 from .supervisor import SupervisorAgent
 from .retriever_agent import RetrieverAgent
-from .self_check_agent import SelfCheckAgent
+from .self_check_agent import SelfCheckAgent, BatchEvaluationConfig
 from .answer_agent import AnswerAgent
 from .safety_agent import SafetyAgent
 
@@ -12,6 +12,7 @@ __all__ = [
     "SupervisorAgent",
     "RetrieverAgent", 
     "SelfCheckAgent",
+    "BatchEvaluationConfig",
     "AnswerAgent",
     "SafetyAgent"
 ]
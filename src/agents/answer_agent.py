@@ -2,26 +2,52 @@
 Agente Answer - Gera respostas baseadas em evidências encontradas.
 """
 
-from typing import Dict, Any, List
+import re
+from typing import Callable, Dict, Any, List, Optional
 from langchain_core.language_models.base import BaseLanguageModel
+from ..utils.llm_cache import LLMResponseCache
+from ..utils.llm_response import extract_text
+from ..entity.evidence import EvidenceColumns
 import logging
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+# Configurar logging (o nível e os handlers são definidos pela aplicação)
 logger = logging.getLogger(__name__)
 
+# Linha de conclusão da resposta do LLM (ex.: "CONCLUSÃO: FALSA")
+_CONCLUSION_RE = re.compile(r"^\s*CONCLUSÃO:\s*(.+)$", re.MULTILINE | re.IGNORECASE)
+
+# Modelos de linha para citações formatadas (com e sem URL)
+_CITATION_TEMPLATE = "{i}. {source} - {url} (relevância: {relevance_score:.2f})"
+_CITATION_TEMPLATE_NO_URL = "{i}. {source} (relevância: {relevance_score:.2f})"
+
+# Parte fixa da resposta para evidências insuficientes (varia apenas a consulta)
+_INSUFFICIENT_TEMPLATE = {
+    "conclusion": "INSUFICIENTE",
+    "evidence_quality": "INSUFFICIENT",
+    "num_documents": 0,
+    "agent": "ANSWER"
+}
+
+_INSUFFICIENT_ANSWER = (
+    "Não foi possível encontrar informações suficientes para verificar a afirmação '{query}' "
+    "em nossas fontes confiáveis. Recomendamos consultar fontes primárias ou especialistas "
+    "para obter informações mais precisas."
+)
+
 
 class AnswerAgent:
     """Agente responsável por gerar respostas baseadas em evidências."""
     
-    def __init__(self, llm: BaseLanguageModel):
+    def __init__(self, llm: BaseLanguageModel, response_cache: LLMResponseCache = None):
         """
         Inicializa o agente answer.
         
         Args:
             llm: Instância do modelo de linguagem
+            response_cache: Cache de respostas do LLM (padrão: um cache próprio)
         """
         self.llm = llm
+        self.response_cache = response_cache or LLMResponseCache()
         self.system_prompt = """Você é um agente especializado em gerar respostas verificadas para combate a fake news.
 
 Sua função é criar respostas claras, precisas e baseadas em evidências encontradas.
@@ -41,7 +67,9 @@ FORMATO DA RESPOSTA:
 - EXPLICAÇÃO: [explicação detalhada do raciocínio]"""
 
     def generate_answer(self, query: str, documents: List[Dict[str, Any]], evidence_quality: str, 
-                       search_source: str = "unknown") -> Dict[str, Any]:
+                       search_source: str = "unknown",
+                       on_conclusion: Optional[Callable[[str], None]] = None,
+                       evidence: Optional[EvidenceColumns] = None) -> Dict[str, Any]:
         """
         Gera uma resposta baseada nas evidências encontradas.
         
@@ -49,6 +77,38 @@ FORMATO DA RESPOSTA:
             query: Consulta/afirmação a ser verificada
             documents: Lista de documentos com evidências
             evidence_quality: Qualidade das evidências (SUFFICIENT, INSUFFICIENT, etc.)
+            on_conclusion: Callback chamado com a conclusão assim que a linha
+                "CONCLUSÃO:" é gerada, antes do fim da resposta
+            evidence: Evidências em colunas montadas pelo retriever
+            
+        Returns:
+            Dicionário com a resposta gerada
+        """
+        try:
+            if evidence_quality == "INSUFFICIENT":
+                return self._generate_insufficient_evidence_response(query)
+            
+            # Transmitir a resposta do LLM (ou reaproveitar a resposta ao mesmo prompt)
+            response = self._stream_answer(self._build_answer_prompt(query, documents, evidence), on_conclusion)
+            
+            return self._build_answer_result(response, query, documents, evidence_quality, search_source)
+            
+        except Exception as e:
+            return self._answer_error_result(e, query, documents, evidence_quality)
+    
+    async def agenerate_answer(self, query: str, documents: List[Dict[str, Any]], evidence_quality: str,
+                               search_source: str = "unknown",
+                               on_conclusion: Optional[Callable[[str], None]] = None,
+                               evidence: Optional[EvidenceColumns] = None) -> Dict[str, Any]:
+        """
+        Versão assíncrona de generate_answer, usando a API assíncrona do LLM.
+        
+        Args:
+            query: Consulta/afirmação a ser verificada
+            documents: Lista de documentos com evidências
+            evidence_quality: Qualidade das evidências (SUFFICIENT, INSUFFICIENT, etc.)
+            on_conclusion: Callback chamado com a conclusão antecipada
+            evidence: Evidências em colunas montadas pelo retriever
             
         Returns:
             Dicionário com a resposta gerada
@@ -57,11 +117,106 @@ FORMATO DA RESPOSTA:
             if evidence_quality == "INSUFFICIENT":
                 return self._generate_insufficient_evidence_response(query)
             
-            # Preparar contexto das evidências
-            evidence_context = self._prepare_evidence_context(documents)
+            response = await self._astream_answer(self._build_answer_prompt(query, documents, evidence), on_conclusion)
+            
+            return self._build_answer_result(response, query, documents, evidence_quality, search_source)
             
-            # Prompt para gerar resposta
-            answer_prompt = f"""
+        except Exception as e:
+            return self._answer_error_result(e, query, documents, evidence_quality)
+    
+    def _stream_answer(self, prompt: str, on_conclusion: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Gera a resposta via llm.stream, publicando a conclusão assim que
+        a sua linha se completa.
+        
+        Args:
+            prompt: Prompt de geração
+            on_conclusion: Callback da conclusão antecipada
+            
+        Returns:
+            Texto completo da resposta
+        """
+        key = self.response_cache.key_for(self.llm, prompt, "answer")
+        cached = self.response_cache.get(key) if key is not None else None
+        if cached is not None:
+            logger.info("Resposta do LLM em cache (answer)")
+            self._publish_conclusion(cached, on_conclusion)
+            return cached
+        
+        chunks = []
+        pending = on_conclusion is not None
+        for chunk in self.llm.stream(prompt):
+            text = extract_text(chunk)
+            chunks.append(text)
+            if pending and "\n" in text:
+                pending = not self._publish_conclusion("".join(chunks), on_conclusion)
+        
+        response_text = "".join(chunks)
+        if pending:
+            self._publish_conclusion(response_text + "\n", on_conclusion)
+        
+        if key is not None:
+            self.response_cache.set(key, response_text)
+        return response_text
+    
+    async def _astream_answer(self, prompt: str, on_conclusion: Optional[Callable[[str], None]] = None) -> str:
+        """Versão assíncrona de _stream_answer, usando llm.astream."""
+        key = self.response_cache.key_for(self.llm, prompt, "answer")
+        cached = self.response_cache.get(key) if key is not None else None
+        if cached is not None:
+            logger.info("Resposta do LLM em cache (answer)")
+            self._publish_conclusion(cached, on_conclusion)
+            return cached
+        
+        chunks = []
+        pending = on_conclusion is not None
+        async for chunk in self.llm.astream(prompt):
+            text = extract_text(chunk)
+            chunks.append(text)
+            if pending and "\n" in text:
+                pending = not self._publish_conclusion("".join(chunks), on_conclusion)
+        
+        response_text = "".join(chunks)
+        if pending:
+            self._publish_conclusion(response_text + "\n", on_conclusion)
+        
+        if key is not None:
+            self.response_cache.set(key, response_text)
+        return response_text
+    
+    @staticmethod
+    def _publish_conclusion(text: str, on_conclusion: Optional[Callable[[str], None]]) -> bool:
+        """
+        Procura a conclusão entre as linhas já completas do texto e a publica.
+        
+        Args:
+            text: Texto gerado até o momento
+            on_conclusion: Callback da conclusão antecipada
+            
+        Returns:
+            True se a conclusão foi encontrada
+        """
+        if on_conclusion is None:
+            return False
+        
+        # Considerar só linhas completas: "CONCLUSÃO: PARC" ainda está sendo gerada
+        match = _CONCLUSION_RE.search(text, 0, max(text.rfind("\n"), 0))
+        if not match:
+            return False
+        
+        try:
+            on_conclusion(match.group(1).strip().upper())
+        except Exception as e:
+            logger.warning(f"Erro ao publicar conclusão antecipada: {str(e)}")
+        return True
+    
+    def _build_answer_prompt(self, query: str, documents: List[Dict[str, Any]],
+                             evidence: Optional[EvidenceColumns] = None) -> str:
+        """Monta o prompt de geração de resposta."""
+        # Preparar contexto das evidências
+        evidence_context = self._prepare_evidence_context(documents, evidence)
+        
+        return f"""
             Afirmação a verificar: "{query}"
             
             Evidências encontradas:
@@ -75,36 +230,37 @@ FORMATO DA RESPOSTA:
             - Use linguagem clara e acessível
             - Indique claramente a conclusão sobre a veracidade da afirmação
             """
-            
-            # Fazer chamada para o LLM
-            response = self.llm.invoke(answer_prompt)
-            
-            # Processar resposta
-            result = self._parse_answer_response(response, documents, search_source)
-            
-            # Adicionar metadados
-            result.update({
-                "query": query,
-                "evidence_quality": evidence_quality,
-                "num_documents": len(documents),
-                "agent": "ANSWER"
-            })
-            
-            logger.info(f"Answer gerou resposta: {result.get('conclusion', 'UNKNOWN')}")
-            return result
-            
-        except Exception as e:
-            logger.error(f"Erro na geração de resposta: {str(e)}")
-            return {
-                "conclusion": "ERRO",
-                "answer": f"Erro ao gerar resposta: {str(e)}",
-                "citations": [],
-                "evidence_summary": [],
-                "query": query,
-                "evidence_quality": evidence_quality,
-                "num_documents": len(documents) if documents else 0,
-                "agent": "ANSWER"
-            }
+    
+    def _build_answer_result(self, response, query: str, documents: List[Dict[str, Any]],
+                             evidence_quality: str, search_source: str) -> Dict[str, Any]:
+        """Processa a resposta do LLM e adiciona os metadados."""
+        result = self._parse_answer_response(response, documents, search_source)
+        
+        # Adicionar metadados
+        result.update({
+            "query": query,
+            "evidence_quality": evidence_quality,
+            "num_documents": len(documents),
+            "agent": "ANSWER"
+        })
+        
+        logger.info("Answer gerou resposta: %s", result.get('conclusion', 'UNKNOWN'))
+        return result
+    
+    def _answer_error_result(self, error: Exception, query: str, documents: List[Dict[str, Any]],
+                             evidence_quality: str) -> Dict[str, Any]:
+        """Monta a resposta de erro da geração."""
+        logger.error(f"Erro na geração de resposta: {str(error)}")
+        return {
+            "conclusion": "ERRO",
+            "answer": f"Erro ao gerar resposta: {str(error)}",
+            "citations": [],
+            "evidence_summary": [],
+            "query": query,
+            "evidence_quality": evidence_quality,
+            "num_documents": len(documents) if documents else 0,
+            "agent": "ANSWER"
+        }
     
     def _generate_insufficient_evidence_response(self, query: str) -> Dict[str, Any]:
         """
@@ -117,43 +273,35 @@ FORMATO DA RESPOSTA:
             Resposta padrão para evidências insuficientes
         """
         return {
-            "conclusion": "INSUFICIENTE",
-            "answer": f"Não foi possível encontrar informações suficientes para verificar a afirmação '{query}' em nossas fontes confiáveis. Recomendamos consultar fontes primárias ou especialistas para obter informações mais precisas.",
+            **_INSUFFICIENT_TEMPLATE,
+            "answer": _INSUFFICIENT_ANSWER.format(query=query),
             "citations": [],
             "evidence_summary": [],
-            "query": query,
-            "evidence_quality": "INSUFFICIENT",
-            "num_documents": 0,
-            "agent": "ANSWER"
+            "query": query
         }
     
-    def _prepare_evidence_context(self, documents: List[Dict[str, Any]]) -> str:
+    def _prepare_evidence_context(self, documents: List[Dict[str, Any]],
+                                  evidence: Optional[EvidenceColumns] = None) -> str:
         """
         Prepara o contexto das evidências para geração de resposta.
         
         Args:
             documents: Lista de documentos com evidências
+            evidence: Colunas já montadas pelo retriever (montadas aqui se ausentes)
             
         Returns:
             String com contexto formatado
         """
-        context_parts = []
+        if evidence is None or len(evidence) != len(documents):
+            evidence = EvidenceColumns.from_documents(documents)
         
-        for i, doc in enumerate(documents, 1):
-            content = doc["content"]
-            source = doc["metadata"].get("source", "Fonte desconhecida")
-            url = doc["metadata"].get("url", "")
-            relevance = doc.get("relevance_score", 0.0)
-            
-            context_parts.append(f"""
-            Evidência {i}:
-            Fonte: {source}
-            URL: {url}
-            Relevância: {relevance:.2f}
-            Conteúdo: {content}
-            """)
-        
-        return "\n".join(context_parts)
+        # Sem indentação: cada espaço à esquerda viraria token no prompt
+        return "\n".join(
+            f"Evidência {i}:\nFonte: {source}\nURL: {url}\nRelevância: {score:.2f}\nConteúdo: {content}"
+            for i, (content, source, url, score) in enumerate(
+                zip(evidence.contents, evidence.sources, evidence.urls, evidence.scores.tolist()), 1
+            )
+        )
     
     def _filter_documents_by_source(self, documents: List[Dict[str, Any]], search_source: str) -> List[Dict[str, Any]]:
         """
@@ -172,7 +320,7 @@ FORMATO DA RESPOSTA:
         elif search_source in ["hybrid", "web_only"]:
             # Híbrido ou apenas web: mostrar apenas documentos da web
             web_docs = [doc for doc in documents if doc.get("source") == "web"]
-            logger.info(f"Filtrados {len(documents)} documentos para {len(web_docs)} documentos web")
+            logger.info("Filtrados %d documentos para %d documentos web", len(documents), len(web_docs))
             return web_docs
         else:
             # Fonte desconhecida: mostrar todos
@@ -191,60 +339,39 @@ FORMATO DA RESPOSTA:
         Returns:
             Dicionário com resposta processada
         """
-        try:
-            if hasattr(response, 'content'):
-                response_text = response.content
-            else:
-                response_text = str(response)
-            
-            lines = response_text.strip().split('\n')
-            conclusion = "INSUFICIENTE"
-            answer = response_text
-            citations = []
-            evidence_summary = []
-            
-            # Extrair conclusão
-            for line in lines:
-                if line.startswith("CONCLUSÃO:"):
-                    conclusion = line.split(":", 1)[1].strip().upper()
-                    break
-            
-            # Filtrar documentos baseado na fonte da busca
-            filtered_documents = self._filter_documents_by_source(documents, search_source)
-            
-            # Extrair citações dos documentos filtrados
-            for doc in filtered_documents:
-                source = doc["metadata"].get("source", "Fonte desconhecida")
-                url = doc["metadata"].get("url", "")
-                citation = {
-                    "source": source,
-                    "url": url,
-                    "relevance_score": doc.get("relevance_score", 0.0)
-                }
-                citations.append(citation)
-            
-            # Extrair resumo das evidências dos documentos filtrados
-            for doc in filtered_documents:
-                evidence_summary.append({
-                    "content": doc["content"][:200] + "...",
-                    "source": doc["metadata"].get("source", "Fonte desconhecida")
-                })
-            
-            return {
-                "conclusion": conclusion,
-                "answer": response_text,
-                "citations": citations,
-                "evidence_summary": evidence_summary
-            }
+        response_text = extract_text(response)
+        
+        citations = []
+        evidence_summary = []
+        
+        # Extrair conclusão
+        match = _CONCLUSION_RE.search(response_text)
+        conclusion = match.group(1).strip().upper() if match else "INSUFICIENTE"
+        
+        # Filtrar documentos baseado na fonte da busca
+        filtered_documents = self._filter_documents_by_source(documents, search_source)
+        
+        # Extrair citações e resumo das evidências em uma única passada
+        for doc in filtered_documents:
+            metadata = doc["metadata"]
+            source = metadata.get("source", "Fonte desconhecida")
             
-        except Exception as e:
-            logger.error(f"Erro ao processar resposta: {str(e)}")
-            return {
-                "conclusion": "ERRO",
-                "answer": response,
-                "citations": [],
-                "evidence_summary": []
-            }
+            citations.append({
+                "source": source,
+                "url": metadata.get("url", ""),
+                "relevance_score": doc.get("relevance_score", 0.0)
+            })
+            evidence_summary.append({
+                "content": doc["content"][:200] + "...",
+                "source": source
+            })
+        
+        return {
+            "conclusion": conclusion,
+            "answer": response_text,
+            "citations": citations,
+            "evidence_summary": evidence_summary
+        }
     
     def format_citations(self, citations: List[Dict[str, Any]]) -> str:
         """
@@ -261,19 +388,21 @@ FORMATO DA RESPOSTA:
         
         formatted_citations = []
         for i, citation in enumerate(citations, 1):
-            source = citation.get("source", "Fonte desconhecida")
-            url = citation.get("url", "")
-            score = citation.get("relevance_score", 0.0)
-            
-            if url:
-                formatted_citations.append(f"{i}. {source} - {url} (relevância: {score:.2f})")
-            else:
-                formatted_citations.append(f"{i}. {source} (relevância: {score:.2f})")
+            fields = {
+                "i": i,
+                "source": citation.get("source", "Fonte desconhecida"),
+                "url": citation.get("url", ""),
+                "relevance_score": citation.get("relevance_score", 0.0)
+            }
+            template = _CITATION_TEMPLATE if fields["url"] else _CITATION_TEMPLATE_NO_URL
+            formatted_citations.append(template.format_map(fields))
         
         return "\n".join(formatted_citations)
     
     def process_query(self, query: str, documents: List[Dict[str, Any]], evidence_quality: str, 
-                     search_source: str = "unknown") -> Dict[str, Any]:
+                     search_source: str = "unknown",
+                     on_conclusion: Optional[Callable[[str], None]] = None,
+                     evidence: Optional[EvidenceColumns] = None) -> Dict[str, Any]:
         """
         Processa uma consulta completa, gerando resposta baseada em evidências.
         
@@ -281,32 +410,65 @@ FORMATO DA RESPOSTA:
             query: Consulta do usuário
             documents: Lista de documentos com evidências
             evidence_quality: Qualidade das evidências
+            on_conclusion: Callback chamado com a conclusão antecipada
+            evidence: Evidências em colunas montadas pelo retriever
             
         Returns:
             Resultado completo da geração de resposta
         """
         try:
             # Gerar resposta
-            result = self.generate_answer(query, documents, evidence_quality, search_source)
+            result = self.generate_answer(query, documents, evidence_quality, search_source, on_conclusion, evidence)
+            return self._finalize_result(result)
             
-            # Formatar citações
-            if result.get("citations"):
-                result["formatted_citations"] = self.format_citations(result["citations"])
+        except Exception as e:
+            return self._process_error_result(e, query, documents, evidence_quality)
+    
+    async def aprocess_query(self, query: str, documents: List[Dict[str, Any]], evidence_quality: str,
+                             search_source: str = "unknown",
+                             on_conclusion: Optional[Callable[[str], None]] = None,
+                             evidence: Optional[EvidenceColumns] = None) -> Dict[str, Any]:
+        """
+        Versão assíncrona de process_query.
+        
+        Args:
+            query: Consulta do usuário
+            documents: Lista de documentos com evidências
+            evidence_quality: Qualidade das evidências
+            on_conclusion: Callback chamado com a conclusão antecipada
+            evidence: Evidências em colunas montadas pelo retriever
             
-            logger.info(f"Answer processou consulta: {result.get('conclusion', 'UNKNOWN')}")
-            return result
+        Returns:
+            Resultado completo da geração de resposta
+        """
+        try:
+            result = await self.agenerate_answer(query, documents, evidence_quality, search_source, on_conclusion, evidence)
+            return self._finalize_result(result)
             
         except Exception as e:
-            logger.error(f"Erro no processamento da consulta: {str(e)}")
-            return {
-                "conclusion": "ERRO",
-                "answer": f"Erro ao processar consulta: {str(e)}",
-                "citations": [],
-                "evidence_summary": [],
-                "formatted_citations": "Erro ao formatar citações",
-                "query": query,
-                "evidence_quality": evidence_quality,
-                "num_documents": len(documents) if documents else 0,
-                "agent": "ANSWER"
-            }
+            return self._process_error_result(e, query, documents, evidence_quality)
+    
+    def _finalize_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Adiciona as citações formatadas ao resultado."""
+        if result.get("citations"):
+            result["formatted_citations"] = self.format_citations(result["citations"])
+        
+        logger.info("Answer processou consulta: %s", result.get('conclusion', 'UNKNOWN'))
+        return result
+    
+    def _process_error_result(self, error: Exception, query: str, documents: List[Dict[str, Any]],
+                              evidence_quality: str) -> Dict[str, Any]:
+        """Monta o resultado de erro do processamento da consulta."""
+        logger.error(f"Erro no processamento da consulta: {str(error)}")
+        return {
+            "conclusion": "ERRO",
+            "answer": f"Erro ao processar consulta: {str(error)}",
+            "citations": [],
+            "evidence_summary": [],
+            "formatted_citations": "Erro ao formatar citações",
+            "query": query,
+            "evidence_quality": evidence_quality,
+            "num_documents": len(documents) if documents else 0,
+            "agent": "ANSWER"
+        }
 
@@ -3,21 +3,122 @@ Agente Retriever - Busca informações relevantes na base de conhecimento.
 Implementa busca híbrida: local + web quando necessário.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from langchain.schema import Document
 from langchain_core.language_models.base import BaseLanguageModel
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_community.vectorstores import FAISS
 from ..datasource.web import WebDatasource
 from ..entity.document import Document as EntityDocument
+from ..entity.evidence import EvidenceColumns
 from ..utils.document_processor import DocumentProcessor
+from ..utils.llm_response import extract_text
 from ..utils.embeddings import EmbeddingManager
+from ..utils.batching import MicroBatcher
+from ..utils.llm_cache import LLMResponseCache
+from ..utils.semantic_cache import SemanticCache
+from ..utils.keywords import TOKEN_HASHES_KEY, keyword_ids, keyword_overlap
+import os
+import re
+import asyncio
 import logging
-import pandas as pd
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import numpy as np
+from cachetools import LRUCache
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+# Configurar logging (o nível e os handlers são definidos pela aplicação)
 logger = logging.getLogger(__name__)
 
+# Prompt de extração de afirmações: as instruções fixas ficam na mensagem de
+# sistema, à frente da consulta, para que o prefixo seja idêntico entre as
+# chamadas (e aproveitado pelo cache de contexto do provedor)
+_CLAIMS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "Extraia as principais afirmações/fatos relevantes dos documentos encontrados para a consulta do usuário.\n\n"
+               "Retorne apenas as afirmações principais, uma por linha, sem numeração."),
+    ("human", 'Consulta: "{query}"\n\nDocumentos:\n{documents}...')
+])
+
+# Similaridade de Jaccard a partir da qual dois textos são quase duplicados
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _shingles(text: str, size: int) -> frozenset:
+    """Conjunto de n-gramas de palavras (shingles) do texto, sem caixa e pontuação."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return frozenset([" ".join(words)])
+    return frozenset(" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def _distinct_indices(texts: List[str], size: int) -> List[int]:
+    """
+    Seleciona os textos que não são quase duplicados de um anterior.
+    
+    Args:
+        texts: Textos na ordem de preferência
+        size: Tamanho dos shingles (em palavras)
+        
+    Returns:
+        Índices dos textos mantidos
+    """
+    kept, kept_shingles = [], []
+    for i, text in enumerate(texts):
+        shingles = _shingles(text, size)
+        if all(len(shingles & other) / len(shingles | other) < NEAR_DUPLICATE_THRESHOLD for other in kept_shingles):
+            kept.append(i)
+            kept_shingles.append(shingles)
+    return kept
+
+
+# Buscas na web especulativas do caminho síncrono (concorrem com a busca local)
+_WEB_PREFETCH = ThreadPoolExecutor(
+    max_workers=int(os.getenv("WEB_PREFETCH_WORKERS", "4")),
+    thread_name_prefix="web-prefetch"
+)
+
+# Ids de palavras já calculados por conteúdo, para documentos que não os
+# trazem nos metadados (ex.: resultados da web): a tokenização de cada
+# conteúdo é feita uma só vez
+_KEYWORD_IDS = LRUCache(maxsize=4096)
+_KEYWORD_IDS_LOCK = threading.Lock()
+
+
+def _document_keyword_ids(documents: List[Dict[str, Any]]) -> List[np.ndarray]:
+    """
+    Retorna os ids de palavras de cada documento.
+    
+    Usa os ids gravados na ingestão e vetoriza apenas os conteúdos inéditos.
+    
+    Args:
+        documents: Documentos com conteúdo e metadados
+        
+    Returns:
+        Lista de arrays de ids, um por documento
+    """
+    ids = [doc.get("metadata", {}).get(TOKEN_HASHES_KEY) for doc in documents]
+    
+    missing = [i for i, row in enumerate(ids) if row is None]
+    if missing:
+        with _KEYWORD_IDS_LOCK:
+            for i in missing:
+                ids[i] = _KEYWORD_IDS.get(documents[i]["content"])
+        
+        missing = [i for i in missing if ids[i] is None]
+        if missing:
+            new_ids = keyword_ids([documents[i]["content"] for i in missing])
+            with _KEYWORD_IDS_LOCK:
+                for i, row in zip(missing, new_ids):
+                    ids[i] = row
+                    _KEYWORD_IDS[documents[i]["content"]] = row
+    
+    return [np.asarray(row, dtype=np.uint32) for row in ids]
+
 
 class RetrieverAgent:
     """Agente responsável por buscar informações relevantes na base de conhecimento.
@@ -27,7 +128,9 @@ class RetrieverAgent:
                  document_processor: DocumentProcessor = None, 
                  embedding_manager: EmbeddingManager = None,
                  min_local_docs: int = 2,
-                 web_search_threshold: float = 0.6):
+                 web_search_threshold: float = 0.6,
+                 top_k: int = 5,
+                 response_cache: LLMResponseCache = None):
         """
         Inicializa o agente retriever.
         
@@ -38,14 +141,31 @@ class RetrieverAgent:
             embedding_manager: Gerenciador de embeddings para indexar novos docs
             min_local_docs: Número mínimo de documentos locais para não buscar na web
             web_search_threshold: Threshold de similaridade para considerar busca local suficiente
+            top_k: Número de documentos locais recuperados por consulta
         """
         self.llm = llm
+        self.response_cache = response_cache or LLMResponseCache()
         self.vector_store = vector_store
         self.document_processor = document_processor
         self.embedding_manager = embedding_manager
         self.min_local_docs = min_local_docs
         self.web_search_threshold = web_search_threshold
-        self.web_datasource = WebDatasource()
+        self.top_k = top_k
+        self.web_datasource = WebDatasource.instance()
+        self.speculative_web_search = os.getenv("WEB_SEARCH_SPECULATIVE", "false").lower() == "true"
+        
+        # Resultados de busca reaproveitados por consultas semanticamente próximas
+        self._search_cache = SemanticCache(
+            threshold=float(os.getenv("RETRIEVAL_CACHE_THRESHOLD", "0.9"))
+        )
+        
+        # Buscas concorrentes no índice são agrupadas em uma única chamada ao FAISS
+        self._search_batcher = MicroBatcher(
+            self._search_batch,
+            max_batch_size=int(os.getenv("SEARCH_BATCH_MAX_SIZE", "32")),
+            max_wait_ms=float(os.getenv("SEARCH_BATCH_MAX_WAIT_MS", "5")),
+            name="faiss-batcher"
+        )
         
         self.system_prompt = """Você é um agente especializado em busca de informações relevantes para verificação de notícias.
 
@@ -57,7 +177,25 @@ Sua função é:
 
 SEMPRE retorne os documentos encontrados, mesmo que sejam poucos."""
 
-    def search_documents_local(self, query: str, k: int = 5, score_threshold: float = 0.6) -> Dict[str, Any]:
+    def _search_batch(self, items: List[tuple]) -> List[List[tuple]]:
+        """
+        Executa um lote de buscas vetoriais com uma única chamada ao índice.
+        
+        Args:
+            items: Lista de (embedding da consulta, k)
+            
+        Returns:
+            Lista de (documento, distância) para cada item, na mesma ordem
+        """
+        max_k = max(k for _, k in items)
+        results = self.embedding_manager.similarity_search_by_vectors(
+            [vector for vector, _ in items],
+            k=max_k
+        )
+        return [docs[:k] for docs, (_, k) in zip(results, items)]
+    
+    def search_documents_local(self, query: str, k: int = 5, score_threshold: float = 0.6,
+                               query_embedding: Optional[List[float]] = None) -> Dict[str, Any]:
         """
         Busca documentos relevantes na base local.
         
@@ -65,61 +203,38 @@ SEMPRE retorne os documentos encontrados, mesmo que sejam poucos."""
             query: Consulta do usuário
             k: Número de documentos a retornar
             score_threshold: Limiar mínimo de similaridade
+            query_embedding: Embedding da consulta já calculado, se houver
             
         Returns:
             Dicionário com os documentos encontrados e metadados
         """
         try:
-            logger.info(f"Buscando documentos locais para: {query[:100]}...")
-            
-            # Buscar documentos similares
-            documents = self.vector_store.similarity_search_with_score(
-                query, 
-                k=k
-            )
-            
-            # Filtrar por score threshold (FAISS usa distância, então menor = melhor)
-            # Converter threshold de similaridade para distância
-            distance_threshold = (1.0 / score_threshold) - 1.0 if score_threshold > 0 else float('inf')
-            
-            filtered_docs = [
-                (doc, score) for doc, score in documents 
-                if score <= distance_threshold
-            ]
-            
-            # Se não encontrou documentos suficientes, relaxar o threshold
-            if len(filtered_docs) < 2:
-                logger.warning("Poucos documentos locais encontrados, relaxando threshold")
-                filtered_docs = documents[:3]  # Pegar os 3 melhores
-            
-            # Preparar resultado
-            result = {
-                "query": query,
-                "documents": [],
-                "num_documents": len(filtered_docs),
-                "search_successful": len(filtered_docs) > 0,
-                "source": "local"
-            }
-            
-            # Processar documentos encontrados
-            for i, (doc, score) in enumerate(filtered_docs):
-                # FAISS retorna distância (menor = mais similar)
-                # Converter para similaridade (maior = mais similar)
-                # Usar 1 / (1 + score) para normalizar entre 0 e 1
-                similarity_score = 1.0 / (1.0 + float(score))
-                
-                doc_info = {
-                    "content": doc.page_content,
-                    "metadata": doc.metadata,
-                    "relevance_score": similarity_score,
-                    "raw_distance": float(score),  # Manter distância original para debug
-                    "rank": i + 1,
-                    "source": "local"
-                }
-                result["documents"].append(doc_info)
+            logger.info("Buscando documentos locais para: %s...", query[:100])
+            
+            # Buscar documentos similares (reaproveitando embeddings já calculados)
+            start = time.perf_counter()
+            if self.embedding_manager and self.embedding_manager.vector_store is not None:
+                query_vector = query_embedding
+                if query_vector is None:
+                    query_vector = self.embedding_manager.embed_query(query)
+                embedded = time.perf_counter()
+                documents = self._search_batcher((query_vector, k))
+            else:
+                embedded = start
+                if query_embedding is not None:
+                    documents = self.vector_store.similarity_search_with_score_by_vector(query_embedding, k=k)
+                else:
+                    documents = self.vector_store.similarity_search_with_score(query, k=k)
+                similarities = EmbeddingManager.to_similarity(
+                    self.vector_store.index, np.array([score for _, score in documents])
+                )
+                documents = [(doc, float(similarity)) for (doc, _), similarity in zip(documents, similarities)]
+            searched = time.perf_counter()
             
-            logger.info(f"Encontrados {len(filtered_docs)} documentos locais relevantes")
-            return result
+            return self._build_local_result(query, documents, score_threshold, {
+                "embed_ms": (embedded - start) * 1000,
+                "search_ms": (searched - embedded) * 1000
+            })
             
         except Exception as e:
             logger.error(f"Erro na busca de documentos locais: {str(e)}")
@@ -132,6 +247,108 @@ SEMPRE retorne os documentos encontrados, mesmo que sejam poucos."""
                 "error": str(e)
             }
     
+    def search_documents_batch(self, queries: List[str], k: int = 5,
+                               score_threshold: float = 0.6) -> List[Dict[str, Any]]:
+        """
+        Busca várias consultas na base local de uma só vez.
+        
+        Os embeddings são calculados em um único lote e as consultas vão ao
+        índice em uma única chamada (na GPU, um único lançamento de kernel).
+        
+        Args:
+            queries: Consultas do usuário
+            k: Número de documentos por consulta
+            score_threshold: Limiar mínimo de similaridade
+            
+        Returns:
+            Resultado de search_documents_local para cada consulta, na mesma ordem
+        """
+        if not queries:
+            return []
+        
+        if not self.embedding_manager or self.embedding_manager.vector_store is None:
+            return [self.search_documents_local(query, k, score_threshold) for query in queries]
+        
+        try:
+            start = time.perf_counter()
+            self.embedding_manager.precompute_query_embeddings(queries)
+            vectors = [self.embedding_manager.embed_query(query) for query in queries]
+            embedded = time.perf_counter()
+            results = self.embedding_manager.similarity_search_by_vectors(vectors, k=k)
+            searched = time.perf_counter()
+            
+            timings = {
+                "embed_ms": (embedded - start) * 1000,
+                "search_ms": (searched - embedded) * 1000
+            }
+            return [
+                self._build_local_result(query, documents, score_threshold, dict(timings))
+                for query, documents in zip(queries, results)
+            ]
+            
+        except Exception as e:
+            logger.error(f"Erro na busca em lote de documentos locais: {str(e)}")
+            return [
+                {
+                    "query": query,
+                    "documents": [],
+                    "num_documents": 0,
+                    "search_successful": False,
+                    "source": "local",
+                    "error": str(e)
+                }
+                for query in queries
+            ]
+    
+    def _build_local_result(self, query: str, documents: List[tuple], score_threshold: float,
+                            timings: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Filtra os documentos de uma busca local e monta o resultado.
+        
+        Args:
+            query: Consulta do usuário
+            documents: Lista de (documento, similaridade) em ordem decrescente
+            score_threshold: Limiar mínimo de similaridade
+            timings: Tempos da busca em ms
+            
+        Returns:
+            Dicionário com os documentos encontrados e metadados
+        """
+        # Filtrar por similaridade de cosseno (maior = mais similar)
+        filtered_docs = [
+            (doc, score) for doc, score in documents 
+            if score >= score_threshold
+        ]
+        
+        # Se não encontrou documentos suficientes, relaxar o threshold
+        if len(filtered_docs) < 2:
+            logger.warning("Poucos documentos locais encontrados, relaxando threshold")
+            filtered_docs = documents[:3]  # Pegar os 3 melhores
+        
+        # Preparar resultado
+        result = {
+            "query": query,
+            "documents": [],
+            "num_documents": len(filtered_docs),
+            "search_successful": len(filtered_docs) > 0,
+            "source": "local",
+            "timings": timings
+        }
+        
+        # Processar documentos encontrados
+        for i, (doc, score) in enumerate(filtered_docs):
+            doc_info = {
+                "content": doc.page_content,
+                "metadata": doc.metadata,
+                "relevance_score": score,
+                "rank": i + 1,
+                "source": "local"
+            }
+            result["documents"].append(doc_info)
+        
+        logger.info("Encontrados %d documentos locais relevantes", len(filtered_docs))
+        return result
+    
     def search_documents_web(self, query: str, max_results: int = 5) -> Dict[str, Any]:
         """
         Busca documentos na web usando Tavily.
@@ -144,56 +361,90 @@ SEMPRE retorne os documentos encontrados, mesmo que sejam poucos."""
             Dicionário com os documentos encontrados e metadados
         """
         try:
-            logger.info(f"Buscando documentos na web para: {query[:100]}...")
+            logger.info("Buscando documentos na web para: %s...", query[:100])
             
             # Buscar na web
+            start = time.perf_counter()
             web_documents = self.web_datasource.search(query)
+            result = self._build_web_result(query, web_documents[:max_results])
+            result["timings"] = {"web_ms": (time.perf_counter() - start) * 1000}
+            return result
             
-            # Limitar número de resultados
-            web_documents = web_documents[:max_results]
-            
-            # Preparar resultado
-            result = {
-                "query": query,
-                "documents": [],
-                "num_documents": len(web_documents),
-                "search_successful": len(web_documents) > 0,
-                "source": "web"
-            }
+        except Exception as e:
+            return self._web_error_result(query, e)
+    
+    async def asearch_documents_web(self, query: str, max_results: int = 5) -> Dict[str, Any]:
+        """
+        Versão assíncrona de search_documents_web.
+        
+        Args:
+            query: Consulta do usuário
+            max_results: Número máximo de resultados
             
-            # Processar documentos encontrados
-            for i, doc in enumerate(web_documents):
-                # Calcular score de similaridade baseado na posição
-                # Documentos web têm score decrescente baseado na ordem
-                base_score = 0.8 - (i * 0.1)  # 0.8, 0.7, 0.6, etc.
-                base_score = max(0.5, base_score)  # Mínimo de 0.5
-                
-                doc_info = {
-                    "content": doc.content,
-                    "metadata": {
-                        "source": doc.source,
-                        "id": doc.id,
-                        "type": "web"
-                    },
-                    "relevance_score": base_score,
-                    "rank": i + 1,
-                    "source": "web"
-                }
-                result["documents"].append(doc_info)
+        Returns:
+            Dicionário com os documentos encontrados e metadados
+        """
+        try:
+            logger.info("Buscando documentos na web para: %s...", query[:100])
             
-            logger.info(f"Encontrados {len(web_documents)} documentos na web")
+            start = time.perf_counter()
+            web_documents = await self.web_datasource.asearch(query)
+            result = self._build_web_result(query, web_documents[:max_results])
+            result["timings"] = {"web_ms": (time.perf_counter() - start) * 1000}
             return result
             
         except Exception as e:
-            logger.error(f"Erro na busca de documentos na web: {str(e)}")
-            return {
-                "query": query,
-                "documents": [],
-                "num_documents": 0,
-                "search_successful": False,
-                "source": "web",
-                "error": str(e)
+            return self._web_error_result(query, e)
+    
+    def _build_web_result(self, query: str, web_documents: List[EntityDocument]) -> Dict[str, Any]:
+        """Monta o resultado da busca na web a partir dos documentos encontrados."""
+        # Preparar resultado
+        result = {
+            "query": query,
+            "documents": [],
+            "num_documents": len(web_documents),
+            "search_successful": len(web_documents) > 0,
+            "source": "web"
+        }
+        
+        # Processar documentos encontrados
+        for i, doc in enumerate(web_documents):
+            # Calcular score de similaridade baseado na posição
+            # Documentos web têm score decrescente baseado na ordem
+            base_score = 0.8 - (i * 0.1)  # 0.8, 0.7, 0.6, etc.
+            base_score = max(0.5, base_score)  # Mínimo de 0.5
+            
+            metadata = {
+                "source": doc.source,
+                "id": doc.id,
+                "type": "web"
+            }
+            if doc.title:
+                metadata["title"] = doc.title
+            
+            doc_info = {
+                "content": doc.content,
+                "metadata": metadata,
+                "relevance_score": base_score,
+                "rank": i + 1,
+                "source": "web"
             }
+            result["documents"].append(doc_info)
+        
+        logger.info("Encontrados %d documentos na web", len(web_documents))
+        return result
+    
+    def _web_error_result(self, query: str, error: Exception) -> Dict[str, Any]:
+        """Monta o resultado de erro da busca na web."""
+        logger.error(f"Erro na busca de documentos na web: {str(error)}")
+        return {
+            "query": query,
+            "documents": [],
+            "num_documents": 0,
+            "search_successful": False,
+            "source": "web",
+            "error": str(error)
+        }
     
     def should_search_web(self, local_result: Dict[str, Any]) -> bool:
         """
@@ -207,31 +458,37 @@ SEMPRE retorne os documentos encontrados, mesmo que sejam poucos."""
         """
         # Se não encontrou documentos locais suficientes
         if local_result["num_documents"] < self.min_local_docs:
-            logger.info(f"Poucos documentos locais encontrados ({local_result['num_documents']} < {self.min_local_docs}), buscando na web")
+            logger.info("Poucos documentos locais encontrados (%d < %d), buscando na web",
+                        local_result['num_documents'], self.min_local_docs)
             return True
         
         # Se os documentos encontrados têm baixa relevância
-        if local_result["documents"]:
-            scores = [doc["relevance_score"] for doc in local_result["documents"]]
-            avg_score = sum(scores) / len(scores)
-            max_score = max(scores)
-            min_score = min(scores)
+        documents = local_result["documents"]
+        if documents:
+            # Os documentos locais vêm em ordem decrescente de similaridade:
+            # o primeiro é o melhor score, sem varrer a lista
+            max_score = documents[0]["relevance_score"]
+            if max_score < self.web_search_threshold + 0.1:  # Ligeiramente mais rigoroso
+                logger.info("Melhor documento local com baixa relevância (max: %.3f), buscando na web", max_score)
+                return True
+            
+            scores = np.fromiter((doc["relevance_score"] for doc in documents), dtype=np.float32, count=len(documents))
+            avg_score = float(scores.mean())
             
             # Log detalhado para debug
-            logger.info(f"Scores locais: avg={avg_score:.3f}, max={max_score:.3f}, min={min_score:.3f}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Scores locais: avg=%.3f, max=%.3f, min=%.3f", avg_score, max_score, float(scores.min()))
             
             # Buscar na web se:
             # 1. Score médio baixo OU
-            # 2. Melhor score individual baixo OU  
-            # 3. Todos os scores são baixos
+            # 2. Ambos baixos (o melhor score individual já foi verificado acima)
             should_search = (
                 avg_score < self.web_search_threshold or 
-                max_score < (self.web_search_threshold + 0.1) or  # Ligeiramente mais rigoroso
-                (max_score < 0.6 and avg_score < 0.5)  # Ambos baixos
+                (max_score < 0.6 and avg_score < 0.5)
             )
             
             if should_search:
-                logger.info(f"Documentos locais com baixa relevância (avg: {avg_score:.3f}, max: {max_score:.3f}), buscando na web")
+                logger.info("Documentos locais com baixa relevância (avg: %.3f, max: %.3f), buscando na web", avg_score, max_score)
                 return True
         
         logger.info("Documentos locais suficientes, não buscando na web")
@@ -260,7 +517,7 @@ SEMPRE retorne os documentos encontrados, mesmo que sejam poucos."""
                     metadata={
                         **doc["metadata"],
                         "saved_from_web": True,
-                        "saved_at": str(pd.Timestamp.now())
+                        "saved_at": datetime.now().isoformat(sep=" ")
                     }
                 )
                 langchain_docs.append(langchain_doc)
@@ -286,6 +543,12 @@ SEMPRE retorne os documentos encontrados, mesmo que sejam poucos."""
         """
         Busca documentos usando estratégia híbrida (local + web).
         
+        Com WEB_SEARCH_SPECULATIVE=true, a busca na web começa em uma thread
+        junto com a local e o resultado é descartado se os documentos locais
+        bastarem. Neste caminho a chamada não pode ser cancelada depois de
+        iniciada (Future.cancel só evita as que ainda estão na fila), então
+        cada consulta consome uma chamada ao Tavily. Desativado por padrão.
+        
         Args:
             query: Consulta do usuário
             k: Número de documentos a retornar
@@ -294,97 +557,232 @@ SEMPRE retorne os documentos encontrados, mesmo que sejam poucos."""
         Returns:
             Dicionário com os documentos encontrados e metadados
         """
+        web_future = None
         try:
-            logger.info(f"Iniciando busca híbrida para: {query[:100]}...")
+            query_vector, cached = self._lookup_search_cache(query, k, score_threshold)
+            if cached is not None:
+                return cached
             
-            # 1. Buscar localmente primeiro
-            local_result = self.search_documents_local(query, k, score_threshold)
+            logger.info("Iniciando busca híbrida para: %s...", query[:100])
+            
+            if self.speculative_web_search:
+                web_future = _WEB_PREFETCH.submit(self.search_documents_web, query, 3)
+            
+            # 1. Buscar localmente (com o embedding já calculado)
+            local_result = self.search_documents_local(query, k, score_threshold, query_vector)
             
             # 2. Decidir se deve buscar na web
             if self.should_search_web(local_result):
-                web_result = self.search_documents_web(query, max_results=3)
+                if web_future is None:
+                    web_future = _WEB_PREFETCH.submit(self.search_documents_web, query, 3)
+                web_result = web_future.result()
+                web_ms = web_result.get("timings", {}).get("web_ms", 0.0)
                 
                 # 3. Salvar documentos da web se encontrou
                 if web_result["search_successful"] and web_result["documents"]:
                     self.save_web_documents(web_result["documents"])
                 
                 # 4. Combinar resultados
-                combined_documents = local_result["documents"] + web_result["documents"]
-                
-                # 5. Reordenar por relevância
-                combined_documents.sort(key=lambda x: x["relevance_score"], reverse=True)
-                
-                # 6. Atualizar ranks
-                for i, doc in enumerate(combined_documents):
-                    doc["rank"] = i + 1
-                
-                result = {
-                    "query": query,
-                    "documents": combined_documents,
-                    "num_documents": len(combined_documents),
-                    "search_successful": True,
-                    "source": "hybrid",
-                    "local_docs": local_result["num_documents"],
-                    "web_docs": web_result["num_documents"]
-                }
-                
-                logger.info(f"Busca híbrida concluída: {local_result['num_documents']} locais + {web_result['num_documents']} web")
+                result = self._combine_results(query, local_result, web_result, web_ms)
             else:
-                # Usar apenas resultados locais
-                result = local_result
-                result["source"] = "local_only"
-                logger.info("Usando apenas resultados locais")
+                if web_future is not None:
+                    web_future.cancel()
+                result = self._local_only_result(local_result)
             
+            self._store_search_cache(query_vector, k, score_threshold, result)
             return result
             
         except Exception as e:
-            logger.error(f"Erro na busca híbrida: {str(e)}")
-            return {
-                "query": query,
-                "documents": [],
-                "num_documents": 0,
-                "search_successful": False,
-                "source": "error",
-                "error": str(e)
-            }
+            if web_future is not None:
+                web_future.cancel()
+            return self._hybrid_error_result(query, e)
     
-    def rerank_documents(self, query: str, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    async def asearch_documents(self, query: str, k: int = 5, score_threshold: float = 0.6) -> Dict[str, Any]:
         """
-        Reordena documentos baseado na relevância para a consulta.
+        Versão assíncrona de search_documents.
+        
+        Com WEB_SEARCH_SPECULATIVE=true, a busca na web começa junto com a
+        local e a tarefa é cancelada se os documentos locais bastarem; assim a
+        latência passa de local + web para max(local, web). Uma requisição já
+        enviada ao Tavily ainda pode ser cobrada. Desativado por padrão.
         
         Args:
-            query: Consulta original
-            documents: Lista de documentos com scores
+            query: Consulta do usuário
+            k: Número de documentos a retornar
+            score_threshold: Limiar mínimo de similaridade
             
         Returns:
-            Lista de documentos reordenados
+            Dicionário com os documentos encontrados e metadados
         """
+        web_task = None
         try:
-            # Implementação simples de reranking baseada em palavras-chave
-            query_words = set(query.lower().split())
-            
-            for doc in documents:
-                content_words = set(doc["content"].lower().split())
-                # Calcular overlap de palavras-chave
-                overlap = len(query_words.intersection(content_words))
-                doc["keyword_overlap"] = overlap
-            
-            # Reordenar por overlap de palavras-chave + score de similaridade
-            documents.sort(
-                key=lambda x: (x["keyword_overlap"], x["relevance_score"]), 
-                reverse=True
-            )
+            query_vector, cached = await asyncio.to_thread(self._lookup_search_cache, query, k, score_threshold)
+            if cached is not None:
+                return cached
             
-            # Atualizar ranks
-            for i, doc in enumerate(documents):
-                doc["rank"] = i + 1
+            logger.info("Iniciando busca híbrida para: %s...", query[:100])
             
-            logger.info("Documentos reordenados por relevância")
-            return documents
+            if self.speculative_web_search:
+                web_task = asyncio.create_task(self.asearch_documents_web(query, max_results=3))
+            
+            local_result = await asyncio.to_thread(self.search_documents_local, query, k, score_threshold, query_vector)
+            
+            if not self.should_search_web(local_result):
+                if web_task is not None:
+                    web_task.cancel()
+                result = self._local_only_result(local_result)
+                self._store_search_cache(query_vector, k, score_threshold, result)
+                return result
+            
+            if web_task is None:
+                web_task = asyncio.create_task(self.asearch_documents_web(query, max_results=3))
+            web_result = await web_task
+            web_ms = web_result.get("timings", {}).get("web_ms", 0.0)
+            
+            if web_result["search_successful"] and web_result["documents"]:
+                await asyncio.to_thread(self.save_web_documents, web_result["documents"])
+            
+            result = self._combine_results(query, local_result, web_result, web_ms)
+            self._store_search_cache(query_vector, k, score_threshold, result)
+            return result
             
         except Exception as e:
-            logger.error(f"Erro no reranking: {str(e)}")
+            if web_task is not None:
+                web_task.cancel()
+            return self._hybrid_error_result(query, e)
+    
+    def _lookup_search_cache(self, query: str, k: int, score_threshold: float) -> tuple:
+        """
+        Procura um resultado de busca de uma consulta semanticamente próxima.
+        
+        Args:
+            query: Consulta do usuário
+            k: Número de documentos pedido
+            score_threshold: Limiar de similaridade pedido
+            
+        Returns:
+            Tupla (embedding da consulta, cópia do resultado em cache ou None);
+            o embedding é None quando não há gerenciador de embeddings
+        """
+        if self.embedding_manager is None:
+            return None, None
+        
+        query_vector = self.embedding_manager.embed_query(query)
+        hit = self._search_cache.lookup(query_vector)
+        if hit is None:
+            return query_vector, None
+        
+        similarity, (cached_k, cached_threshold, cached) = hit
+        if (cached_k, cached_threshold) != (k, score_threshold):
+            return query_vector, None
+        
+        logger.info("Busca em cache semântico (%.3f) para: %s...", similarity, query[:100])
+        
+        # O reranking altera os documentos; cada acerto recebe as suas cópias
+        return query_vector, {
+            **cached,
+            "query": query,
+            "documents": [dict(doc) for doc in cached["documents"]],
+            "timings": {"search_cache_ms": 0.0}
+        }
+    
+    def _store_search_cache(self, query_vector, k: int, score_threshold: float, result: Dict[str, Any]) -> None:
+        """Armazena um resultado de busca bem-sucedido."""
+        if query_vector is None or not result.get("search_successful"):
+            return
+        
+        snapshot = {**result, "documents": [dict(doc) for doc in result["documents"]]}
+        self._search_cache.add(query_vector, (k, score_threshold, snapshot))
+    
+    def clear_cache(self) -> None:
+        """Remove os resultados de busca em cache."""
+        self._search_cache.clear()
+    
+    def close(self) -> None:
+        """Encerra as threads do agrupador de buscas (ex.: ao substituir o agente)."""
+        self._search_batcher.close()
+    
+    def _combine_results(self, query: str, local_result: Dict[str, Any], web_result: Dict[str, Any],
+                         web_ms: float) -> Dict[str, Any]:
+        """Combina os resultados locais e da web em ordem de relevância."""
+        combined_documents = local_result["documents"] + web_result["documents"]
+        
+        # Reordenar por relevância (argsort estável: empates mantêm locais antes da web)
+        scores = np.fromiter((doc["relevance_score"] for doc in combined_documents),
+                             dtype=np.float32, count=len(combined_documents))
+        order = np.argsort(-scores, kind="stable")
+        combined_documents = [combined_documents[i] for i in order]
+        
+        # Atualizar ranks
+        for rank, doc in enumerate(combined_documents, 1):
+            doc["rank"] = rank
+        
+        result = {
+            "query": query,
+            "documents": combined_documents,
+            "num_documents": len(combined_documents),
+            "search_successful": True,
+            "source": "hybrid",
+            "local_docs": local_result["num_documents"],
+            "web_docs": web_result["num_documents"],
+            "timings": {**local_result.get("timings", {}), "web_ms": web_ms}
+        }
+        
+        logger.info("Busca híbrida concluída: %d locais + %d web",
+                    local_result['num_documents'], web_result['num_documents'])
+        return result
+    
+    @staticmethod
+    def _local_only_result(local_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Usa apenas os resultados locais."""
+        local_result["source"] = "local_only"
+        logger.info("Usando apenas resultados locais")
+        return local_result
+    
+    @staticmethod
+    def _hybrid_error_result(query: str, error: Exception) -> Dict[str, Any]:
+        """Monta o resultado de erro da busca híbrida."""
+        logger.error(f"Erro na busca híbrida: {str(error)}")
+        return {
+            "query": query,
+            "documents": [],
+            "num_documents": 0,
+            "search_successful": False,
+            "source": "error",
+            "error": str(error)
+        }
+    
+    def rerank_documents(self, query: str, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Reordena documentos baseado na relevância para a consulta.
+        
+        Args:
+            query: Consulta original
+            documents: Lista de documentos com scores
+            
+        Returns:
+            Lista de documentos reordenados
+        """
+        if not documents:
             return documents
+        
+        # Overlap de palavras-chave entre a consulta e cada documento
+        overlaps = keyword_overlap(keyword_ids([query])[0], _document_keyword_ids(documents))
+        scores = np.array([doc["relevance_score"] for doc in documents])
+        
+        for doc, overlap in zip(documents, overlaps):
+            doc["keyword_overlap"] = int(overlap)
+        
+        # Reordenar por overlap de palavras-chave + score de similaridade
+        order = np.lexsort((-scores, -overlaps))
+        documents[:] = [documents[i] for i in order]
+        
+        # Atualizar ranks
+        for i, doc in enumerate(documents):
+            doc["rank"] = i + 1
+        
+        logger.info("Documentos reordenados por relevância")
+        return documents
     
     def extract_key_claims(self, query: str, documents: List[Dict[str, Any]]) -> List[str]:
         """
@@ -401,54 +799,110 @@ SEMPRE retorne os documentos encontrados, mesmo que sejam poucos."""
             if not documents:
                 return []
             
-            # Combinar conteúdo dos documentos
-            combined_content = "\n\n".join([doc["content"] for doc in documents])
-            
-            # Prompt para extrair afirmações
-            extraction_prompt = f"""
-            Com base na consulta "{query}" e nos documentos encontrados, extraia as principais afirmações/fatos relevantes.
+            # Títulos/afirmações já presentes nos metadados dispensam o LLM
+            claims = self._metadata_claims(documents)
+            if claims:
+                return claims
             
-            Documentos:
-            {combined_content[:2000]}...
+            # Fazer chamada para o LLM (via cache de respostas)
+            response = self.response_cache.invoke(self.llm, self._build_claims_prompt(query, documents), "claims")
+            return self._parse_claims(response)
             
-            Retorne apenas as afirmações principais, uma por linha, sem numeração.
-            """
-            
-            # Fazer chamada para o LLM
-            response = self.llm.invoke(extraction_prompt)
+        except Exception as e:
+            logger.error(f"Erro na extração de afirmações: {str(e)}")
+            return []
+    
+    async def aextract_key_claims(self, query: str, documents: List[Dict[str, Any]]) -> List[str]:
+        """
+        Versão assíncrona de extract_key_claims.
+        
+        Args:
+            query: Consulta original
+            documents: Lista de documentos
             
-            # Processar resposta
-            if hasattr(response, 'content'):
-                response_text = response.content
-            else:
-                response_text = str(response)
+        Returns:
+            Lista de afirmações principais
+        """
+        try:
+            if not documents:
+                return []
             
-            claims = [
-                claim.strip() 
-                for claim in response_text.split('\n') 
-                if claim.strip() and not claim.strip().startswith(('1.', '2.', '3.', '-', '*'))
-            ]
+            claims = self._metadata_claims(documents)
+            if claims:
+                return claims
             
-            logger.info(f"Extraídas {len(claims)} afirmações principais")
-            return claims[:5]  # Limitar a 5 afirmações
+            response = await self.response_cache.ainvoke(self.llm, self._build_claims_prompt(query, documents), "claims")
+            return self._parse_claims(response)
             
         except Exception as e:
             logger.error(f"Erro na extração de afirmações: {str(e)}")
             return []
     
-    def process_query(self, query: str) -> Dict[str, Any]:
+    @staticmethod
+    def _metadata_claims(documents: List[Dict[str, Any]]) -> List[str]:
+        """
+        Usa títulos ou afirmações gravados nos metadados na ingestão.
+        
+        Args:
+            documents: Lista de documentos
+            
+        Returns:
+            Até 5 afirmações, ou lista vazia se os metadados não cobrem
+            documentos suficientes (mínimo de 3, ou todos se houver menos)
+        """
+        titles = [
+            title for title in dict.fromkeys(
+                doc["metadata"].get("title") or doc["metadata"].get("claim") for doc in documents
+            )
+            if title
+        ]
+        
+        if len(titles) < min(3, len(documents)):
+            return []
+        
+        logger.info("Afirmações obtidas dos metadados: %d", len(titles[:5]))
+        return titles[:5]
+    
+    def _build_claims_prompt(self, query: str, documents: List[Dict[str, Any]]) -> List[BaseMessage]:
+        """Monta as mensagens de extração de afirmações."""
+        # Combinar conteúdo dos documentos, sem os quase duplicados (ex.: a
+        # mesma notícia em dois portais), que só repetiriam as afirmações
+        contents = [doc["content"] for doc in documents]
+        combined_content = "\n\n".join(contents[i] for i in _distinct_indices(contents, 5))
+        
+        return _CLAIMS_PROMPT.format_messages(query=query, documents=combined_content[:2000])
+    
+    def _parse_claims(self, response) -> List[str]:
+        """Extrai a lista de afirmações da resposta do LLM."""
+        response_text = extract_text(response)
+        
+        claims = [
+            claim.strip() 
+            for claim in response_text.split('\n') 
+            if claim.strip() and not claim.strip().startswith(('1.', '2.', '3.', '-', '*'))
+        ]
+        
+        # Descartar afirmações repetidas com outras palavras
+        claims = [claims[i] for i in _distinct_indices(claims, 1)]
+        
+        logger.info("Extraídas %d afirmações principais", len(claims))
+        return claims[:5]  # Limitar a 5 afirmações
+    
+    def process_query(self, query: str, extract_claims: bool = True) -> Dict[str, Any]:
         """
         Processa uma consulta completa usando busca híbrida.
         
         Args:
             query: Consulta do usuário
+            extract_claims: Se False, pula a extração de afirmações (quando ela
+                é executada em paralelo por outro nó do grafo)
             
         Returns:
             Resultado completo da busca
         """
         try:
             # Buscar documentos usando estratégia híbrida
-            search_result = self.search_documents(query)
+            search_result = self.search_documents(query, k=self.top_k)
             
             if not search_result["search_successful"]:
                 return search_result
@@ -457,33 +911,81 @@ SEMPRE retorne os documentos encontrados, mesmo que sejam poucos."""
             documents = self.rerank_documents(query, search_result["documents"])
             
             # Extrair afirmações principais
-            key_claims = self.extract_key_claims(query, documents)
+            timings = dict(search_result.get("timings", {}))
+            key_claims = []
+            if extract_claims:
+                start = time.perf_counter()
+                key_claims = self.extract_key_claims(query, documents)
+                timings["claims_ms"] = (time.perf_counter() - start) * 1000
             
-            # Preparar resultado final
-            result = {
-                "query": query,
-                "documents": documents,
-                "key_claims": key_claims,
-                "num_documents": len(documents),
-                "search_successful": True,
-                "agent": "RETRIEVER",
-                "search_source": search_result.get("source", "unknown"),
-                "local_docs": search_result.get("local_docs", 0),
-                "web_docs": search_result.get("web_docs", 0)
-            }
+            return self._build_query_result(query, search_result, documents, key_claims, timings)
             
-            logger.info(f"Retriever processou consulta com sucesso: {len(documents)} documentos ({search_result.get('source', 'unknown')})")
-            return result
+        except Exception as e:
+            return self._query_error_result(query, e)
+    
+    async def aprocess_query(self, query: str, extract_claims: bool = True) -> Dict[str, Any]:
+        """
+        Versão assíncrona de process_query. A busca local e a busca na web
+        são sobrepostas; a extração de afirmações usa a API assíncrona do LLM.
+        
+        Args:
+            query: Consulta do usuário
+            extract_claims: Se False, pula a extração de afirmações
+            
+        Returns:
+            Resultado completo da busca
+        """
+        try:
+            search_result = await self.asearch_documents(query, k=self.top_k)
+            
+            if not search_result["search_successful"]:
+                return search_result
+            
+            documents = self.rerank_documents(query, search_result["documents"])
+            
+            timings = dict(search_result.get("timings", {}))
+            key_claims = []
+            if extract_claims:
+                start = time.perf_counter()
+                key_claims = await self.aextract_key_claims(query, documents)
+                timings["claims_ms"] = (time.perf_counter() - start) * 1000
+            
+            return self._build_query_result(query, search_result, documents, key_claims, timings)
             
         except Exception as e:
-            logger.error(f"Erro no processamento da consulta: {str(e)}")
-            return {
-                "query": query,
-                "documents": [],
-                "key_claims": [],
-                "num_documents": 0,
-                "search_successful": False,
-                "error": str(e),
-                "agent": "RETRIEVER",
-                "search_source": "error"
-            }
+            return self._query_error_result(query, e)
+    
+    def _build_query_result(self, query: str, search_result: Dict[str, Any], documents: List[Dict[str, Any]],
+                            key_claims: List[str], timings: Dict[str, float]) -> Dict[str, Any]:
+        """Monta o resultado final do processamento da consulta."""
+        result = {
+            "query": query,
+            "documents": documents,
+            "evidence": EvidenceColumns.from_documents(documents),
+            "key_claims": key_claims,
+            "num_documents": len(documents),
+            "search_successful": True,
+            "agent": "RETRIEVER",
+            "search_source": search_result.get("source", "unknown"),
+            "local_docs": search_result.get("local_docs", 0),
+            "web_docs": search_result.get("web_docs", 0),
+            "timings": timings
+        }
+        
+        logger.info("Retriever processou consulta com sucesso: %d documentos (%s)",
+                    len(documents), search_result.get('source', 'unknown'))
+        return result
+    
+    def _query_error_result(self, query: str, error: Exception) -> Dict[str, Any]:
+        """Monta o resultado de erro do processamento da consulta."""
+        logger.error(f"Erro no processamento da consulta: {str(error)}")
+        return {
+            "query": query,
+            "documents": [],
+            "key_claims": [],
+            "num_documents": 0,
+            "search_successful": False,
+            "error": str(error),
+            "agent": "RETRIEVER",
+            "search_source": "error"
+        }
@@ -2,27 +2,73 @@
 Agente Safety - Revisa respostas finais para garantir segurança e ética.
 """
 
+import re
 from typing import Dict, Any, List
 from langchain_core.language_models.base import BaseLanguageModel
+from langchain_core.prompts import ChatPromptTemplate
+from ..utils.llm_cache import LLMResponseCache
+from ..utils.llm_response import extract_text
 import logging
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - pyahocorasick é instalado com as dependências
+    ahocorasick = None
+
+# Configurar logging (o nível e os handlers são definidos pela aplicação)
 logger = logging.getLogger(__name__)
 
+# Palavras-chave potencialmente problemáticas
+HARMFUL_KEYWORDS = (
+    "conselho legal", "advogado", "processo judicial",
+    "diagnóstico", "tratamento médico", "medicamento",
+    "investimento", "compra de ações", "conselho financeiro",
+    "violência", "ódio", "discriminação"
+)
 
-class SafetyAgent:
-    """Agente responsável por revisar respostas finais para garantir segurança."""
+
+def _build_keyword_matcher(keywords):
+    """
+    Cria uma função que encontra todas as palavras-chave de um texto em uma única passada.
     
-    def __init__(self, llm: BaseLanguageModel):
-        """
-        Inicializa o agente safety.
+    Usa um autômato Aho-Corasick quando o pyahocorasick está disponível e,
+    caso contrário, uma alternância de regex compilada.
+    
+    Args:
+        keywords: Palavras-chave (em minúsculas)
         
-        Args:
-            llm: Instância do modelo de linguagem
-        """
-        self.llm = llm
-        self.system_prompt = """Você é um agente de segurança especializado em revisar respostas de verificação de notícias.
+    Returns:
+        Função que recebe o texto em minúsculas e retorna o conjunto de palavras encontradas
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return lambda text: {keyword for _, keyword in automaton.iter(text)}
+    
+    pattern = re.compile("|".join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)))
+    return lambda text: set(pattern.findall(text))
+
+
+_find_harmful_keywords = _build_keyword_matcher(HARMFUL_KEYWORDS)
+
+# Disclaimer anexado a todas as respostas
+_STANDARD_DISCLAIMER = """⚠️ **DISCLAIMER IMPORTANTE** ⚠️
+
+Esta informação é baseada em dados públicos disponíveis e não substitui a consulta a fontes primárias ou especialistas. O objetivo é fornecer uma análise informativa com base nas fontes disponíveis.
+
+- Não oferecemos conselhos legais, médicos ou financeiros específicos
+- Recomendamos sempre consultar fontes oficiais e especialistas
+- As informações podem estar desatualizadas ou incompletas
+- Use esta ferramenta como ponto de partida para investigação adicional"""
+
+# Campos da revisão de segurança ("DECISÃO: ...", um por linha)
+_SAFETY_RE = re.compile(r"^\s*(DECISÃO|MOTIVO|SUGESTÕES):[ \t]*(.*?)\s*$", re.MULTILINE)
+
+
+# Instruções do agente, compartilhadas por todas as instâncias
+_SAFETY_SYSTEM_PROMPT = """Você é um agente de segurança especializado em revisar respostas de verificação de notícias.
 
 Sua função é garantir que as respostas sejam seguras, éticas e não ofereçam conselhos perigosos.
 
@@ -39,8 +85,42 @@ AÇÕES POSSÍVEIS:
 - MODIFY: Resposta precisa de modificação
 - REJECT: Resposta rejeitada por questões de segurança
 
-SEMPRE inclua um disclaimer padrão."""
+SEMPRE inclua um disclaimer padrão.
+
+Para cada resposta, verifique se:
+1. A resposta oferece conselhos legais, médicos ou financeiros específicos
+2. A resposta promove violência ou discurso de ódio
+3. A resposta é neutra e objetiva
+4. A resposta inclui disclaimers apropriados
+
+Responda no formato:
+DECISÃO: [APPROVE/MODIFY/REJECT]
+MOTIVO: [explicação da decisão]
+SUGESTÕES: [sugestões de melhoria se MODIFY]"""
 
+# Instruções fixas no prefixo (sistema); só a mensagem do usuário varia
+_REVIEW_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", _SAFETY_SYSTEM_PROMPT),
+    ("human", 'Consulta: "{query}"\nConclusão: {conclusion}\nResposta: {answer}\n\nRevise esta resposta para questões de segurança e ética.')
+])
+
+
+class SafetyAgent:
+    """Agente responsável por revisar respostas finais para garantir segurança."""
+    
+    def __init__(self, llm: BaseLanguageModel, response_cache: LLMResponseCache = None):
+        """
+        Inicializa o agente safety.
+        
+        Args:
+            llm: Instância do modelo de linguagem
+            response_cache: Cache de respostas do LLM (opcional)
+        """
+        self.llm = llm
+        self.response_cache = response_cache or LLMResponseCache()
+        self.system_prompt = _SAFETY_SYSTEM_PROMPT
+        self.review_prompt = _REVIEW_PROMPT
+    
     def review_response(self, query: str, answer: str, conclusion: str) -> Dict[str, Any]:
         """
         Revisa uma resposta para questões de segurança.
@@ -55,57 +135,67 @@ SEMPRE inclua um disclaimer padrão."""
         """
         try:
             # Prompt de revisão
-            review_prompt = f"""
-            Consulte: "{query}"
-            Conclusão: {conclusion}
-            Resposta: {answer}
+            review_prompt = self.review_prompt.format_messages(query=query, conclusion=conclusion, answer=answer)
             
-            Revise esta resposta para questões de segurança e ética.
+            # Fazer chamada para o LLM (via cache de respostas)
+            response = self.response_cache.invoke(self.llm, review_prompt, "safety")
+            return self._build_review_result(response, query, answer, conclusion)
             
-            Verifique se:
-            1. A resposta oferece conselhos legais, médicos ou financeiros específicos
-            2. A resposta promove violência ou discurso de ódio
-            3. A resposta é neutra e objetiva
-            4. A resposta inclui disclaimers apropriados
-            
-            Responda no formato:
-            DECISÃO: [APPROVE/MODIFY/REJECT]
-            MOTIVO: [explicação da decisão]
-            SUGESTÕES: [sugestões de melhoria se MODIFY]
-            """
-            
-            # Fazer chamada para o LLM
-            response = self.llm.invoke(review_prompt)
-            
-            # Processar resposta
-            result = self._parse_safety_response(response)
-            
-            # Adicionar disclaimer padrão
-            result["disclaimer"] = self._get_standard_disclaimer()
-            
-            # Adicionar metadados
-            result.update({
-                "query": query,
-                "original_answer": answer,
-                "original_conclusion": conclusion,
-                "agent": "SAFETY"
-            })
+        except Exception as e:
+            return self._review_error_result(e, query, answer, conclusion)
+    
+    async def areview_response(self, query: str, answer: str, conclusion: str) -> Dict[str, Any]:
+        """
+        Versão assíncrona de review_response.
+        
+        Args:
+            query: Consulta original
+            answer: Resposta gerada
+            conclusion: Conclusão sobre a veracidade
             
-            logger.info(f"Safety revisou resposta: {result['decision']}")
-            return result
+        Returns:
+            Dicionário com revisão de segurança
+        """
+        try:
+            review_prompt = self.review_prompt.format_messages(query=query, conclusion=conclusion, answer=answer)
+            response = await self.response_cache.ainvoke(self.llm, review_prompt, "safety")
+            return self._build_review_result(response, query, answer, conclusion)
             
         except Exception as e:
-            logger.error(f"Erro na revisão de segurança: {str(e)}")
-            return {
-                "decision": "APPROVE",
-                "reason": f"Erro na revisão: {str(e)}",
-                "suggestions": [],
-                "disclaimer": self._get_standard_disclaimer(),
-                "query": query,
-                "original_answer": answer,
-                "original_conclusion": conclusion,
-                "agent": "SAFETY"
-            }
+            return self._review_error_result(e, query, answer, conclusion)
+    
+    def _build_review_result(self, response, query: str, answer: str, conclusion: str) -> Dict[str, Any]:
+        """Monta o resultado da revisão a partir da resposta do LLM."""
+        # Processar resposta
+        result = self._parse_safety_response(response)
+        
+        # Adicionar disclaimer padrão
+        result["disclaimer"] = self._get_standard_disclaimer()
+        
+        # Adicionar metadados
+        result.update({
+            "query": query,
+            "original_answer": answer,
+            "original_conclusion": conclusion,
+            "agent": "SAFETY"
+        })
+        
+        logger.info("Safety revisou resposta: %s", result['decision'])
+        return result
+    
+    def _review_error_result(self, error: Exception, query: str, answer: str, conclusion: str) -> Dict[str, Any]:
+        """Monta o resultado de erro da revisão."""
+        logger.error(f"Erro na revisão de segurança: {str(error)}")
+        return {
+            "decision": "APPROVE",
+            "reason": f"Erro na revisão: {str(error)}",
+            "suggestions": [],
+            "disclaimer": self._get_standard_disclaimer(),
+            "query": query,
+            "original_answer": answer,
+            "original_conclusion": conclusion,
+            "agent": "SAFETY"
+        }
     
     def _parse_safety_response(self, response: str) -> Dict[str, Any]:
         """
@@ -117,41 +207,17 @@ SEMPRE inclua um disclaimer padrão."""
         Returns:
             Dicionário com revisão processada
         """
-        try:
-            if hasattr(response, 'content'):
-                response_text = response.content
-            else:
-                response_text = str(response)
-            
-            lines = response_text.strip().split('\n')
-            decision = "APPROVE"
-            reason = "Resposta aprovada"
-            suggestions = []
-            
-            for line in lines:
-                line = line.strip()
-                if line.startswith("DECISÃO:"):
-                    decision = line.split(":", 1)[1].strip().upper()
-                elif line.startswith("MOTIVO:"):
-                    reason = line.split(":", 1)[1].strip()
-                elif line.startswith("SUGESTÕES:"):
-                    suggestions_text = line.split(":", 1)[1].strip()
-                    if suggestions_text:
-                        suggestions = [s.strip() for s in suggestions_text.split(',')]
-            
-            return {
-                "decision": decision,
-                "reason": reason,
-                "suggestions": suggestions
-            }
-            
-        except Exception as e:
-            logger.error(f"Erro ao processar resposta de segurança: {str(e)}")
-            return {
-                "decision": "APPROVE",
-                "reason": f"Erro no processamento: {str(e)}",
-                "suggestions": []
-            }
+        response_text = extract_text(response)
+        
+        # Campos em uma única passada; repetidos, vale a última ocorrência
+        fields = dict(_SAFETY_RE.findall(response_text))
+        
+        suggestions_text = fields.get("SUGESTÕES", "")
+        return {
+            "decision": fields.get("DECISÃO", "APPROVE").upper(),
+            "reason": fields.get("MOTIVO", "Resposta aprovada"),
+            "suggestions": [s.strip() for s in suggestions_text.split(',')] if suggestions_text else []
+        }
     
     def _get_standard_disclaimer(self) -> str:
         """
@@ -160,14 +226,7 @@ SEMPRE inclua um disclaimer padrão."""
         Returns:
             Disclaimer padrão
         """
-        return """⚠️ **DISCLAIMER IMPORTANTE** ⚠️
-
-Esta informação é baseada em dados públicos disponíveis e não substitui a consulta a fontes primárias ou especialistas. O objetivo é fornecer uma análise informativa com base nas fontes disponíveis.
-
-- Não oferecemos conselhos legais, médicos ou financeiros específicos
-- Recomendamos sempre consultar fontes oficiais e especialistas
-- As informações podem estar desatualizadas ou incompletas
-- Use esta ferramenta como ponto de partida para investigação adicional"""
+        return _STANDARD_DISCLAIMER
     
     def check_harmful_content(self, text: str) -> Dict[str, Any]:
         """
@@ -180,16 +239,9 @@ Esta informação é baseada em dados públicos disponíveis e não substitui a
             Dicionário com resultado da verificação
         """
         try:
-            # Palavras-chave potencialmente problemáticas
-            harmful_keywords = [
-                "conselho legal", "advogado", "processo judicial",
-                "diagnóstico", "tratamento médico", "medicamento",
-                "investimento", "compra de ações", "conselho financeiro",
-                "violência", "ódio", "discriminação"
-            ]
-            
-            text_lower = text.lower()
-            found_keywords = [keyword for keyword in harmful_keywords if keyword in text_lower]
+            # Todas as palavras-chave em uma passada, na ordem da lista
+            found = _find_harmful_keywords(text.lower())
+            found_keywords = [keyword for keyword in HARMFUL_KEYWORDS if keyword in found]
             
             return {
                 "is_harmful": len(found_keywords) > 0,
@@ -249,34 +301,59 @@ Esta informação é baseada em dados públicos disponíveis e não substitui a
         try:
             # Revisar resposta
             review_result = self.review_response(query, answer, conclusion)
+            return self._finalize_result(review_result, answer)
             
-            # Adicionar medidas de segurança
-            safe_answer = self.add_safety_measures(answer)
-            
-            # Preparar resultado final
-            result = {
-                **review_result,
-                "final_answer": safe_answer,
-                "is_safe": review_result["decision"] in ["APPROVE", "MODIFY"],
-                "requires_modification": review_result["decision"] == "MODIFY"
-            }
+        except Exception as e:
+            return self._process_error_result(e, query, answer, conclusion)
+    
+    async def aprocess_query(self, query: str, answer: str, conclusion: str) -> Dict[str, Any]:
+        """
+        Versão assíncrona de process_query.
+        
+        Args:
+            query: Consulta do usuário
+            answer: Resposta gerada pelo AnswerAgent
+            conclusion: Conclusão sobre a veracidade
             
-            logger.info(f"Safety processou consulta: {result['is_safe']}")
-            return result
+        Returns:
+            Resultado completo da revisão de segurança
+        """
+        try:
+            review_result = await self.areview_response(query, answer, conclusion)
+            return self._finalize_result(review_result, answer)
             
         except Exception as e:
-            logger.error(f"Erro no processamento da consulta: {str(e)}")
-            return {
-                "decision": "APPROVE",
-                "reason": f"Erro no processamento: {str(e)}",
-                "suggestions": [],
-                "disclaimer": self._get_standard_disclaimer(),
-                "final_answer": answer + f"\n\n{self._get_standard_disclaimer()}",
-                "is_safe": True,
-                "requires_modification": False,
-                "query": query,
-                "original_answer": answer,
-                "original_conclusion": conclusion,
-                "agent": "SAFETY"
-            }
-
+            return self._process_error_result(e, query, answer, conclusion)
+    
+    def _finalize_result(self, review_result: Dict[str, Any], answer: str) -> Dict[str, Any]:
+        """Adiciona as medidas de segurança à resposta revisada."""
+        # Adicionar medidas de segurança
+        safe_answer = self.add_safety_measures(answer)
+        
+        # Preparar resultado final
+        result = {
+            **review_result,
+            "final_answer": safe_answer,
+            "is_safe": review_result["decision"] in ["APPROVE", "MODIFY"],
+            "requires_modification": review_result["decision"] == "MODIFY"
+        }
+        
+        logger.info("Safety processou consulta: %s", result['is_safe'])
+        return result
+    
+    def _process_error_result(self, error: Exception, query: str, answer: str, conclusion: str) -> Dict[str, Any]:
+        """Monta o resultado de erro do processamento da consulta."""
+        logger.error(f"Erro no processamento da consulta: {str(error)}")
+        return {
+            "decision": "APPROVE",
+            "reason": f"Erro no processamento: {str(error)}",
+            "suggestions": [],
+            "disclaimer": self._get_standard_disclaimer(),
+            "final_answer": answer + f"\n\n{self._get_standard_disclaimer()}",
+            "is_safe": True,
+            "requires_modification": False,
+            "query": query,
+            "original_answer": answer,
+            "original_conclusion": conclusion,
+            "agent": "SAFETY"
+        }
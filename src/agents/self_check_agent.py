@@ -2,29 +2,32 @@
 Agente Self-Check - Verifica se há evidências suficientes para responder.
 """
 
-from typing import Dict, Any, List
+import re
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
 from langchain_core.language_models.base import BaseLanguageModel
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
+from ..utils.llm_cache import LLMResponseCache
+from ..utils.llm_response import extract_text
+from ..utils.context import format_document_context
+from ..entity.evidence import EvidenceResult
 import logging
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+# Configurar logging (o nível e os handlers são definidos pela aplicação)
 logger = logging.getLogger(__name__)
 
 
-class SelfCheckAgent:
-    """
-    Agente responsável por verificar se há evidências suficientes para responder.
-    """
-    
-    def __init__(self, llm: BaseLanguageModel):
-        """
-        Inicializa o agente self-check.
-        
-        Args:
-            llm: Instância do modelo de linguagem
-        """
-        self.llm = llm
-        self.system_prompt = """Você é um agente especializado em avaliar a qualidade e suficiência de evidências para verificação de notícias.
+# Campos da avaliação ("DECISÃO: ...", um por linha)
+_EVALUATION_RE = re.compile(r"^\s*(DECISÃO|CONFIANÇA|JUSTIFICATIVA):[ \t]*(.*?)\s*$", re.MULTILINE)
+
+# Palavras da justificativa que indicam relevância temática
+_RELEVANCE_RE = re.compile(r"relevante|relacionado|tópico|assunto|similar", re.IGNORECASE)
+
+
+# Instruções do agente, compartilhadas por todas as instâncias
+_SELF_CHECK_SYSTEM_PROMPT = """Você é um agente especializado em avaliar a qualidade e suficiência de evidências para verificação de notícias.
 
 Sua função é determinar se há evidências suficientes para verificar uma afirmação.
 
@@ -38,91 +41,245 @@ REGRAS IMPORTANTES:
 EXEMPLOS:
 - Afirmação: "Vacina causa autismo" + Documentos sobre "Vacinas são seguras" = SUFFICIENT
 - Afirmação: "Aquecimento global é real" + Documentos sobre "Mudanças climáticas" = SUFFICIENT
-- Afirmação: "Exercícios melhoram saúde" + Documentos sobre "Vacinas COVID" = INSUFFICIENT"""
+- Afirmação: "Exercícios melhoram saúde" + Documentos sobre "Vacinas COVID" = INSUFFICIENT
+
+IMPORTANTE: Seja PERMISSIVO! Se os documentos são sobre o mesmo tópico geral, marque como SUFFICIENT.
+
+Considere:
+1. Os documentos são sobre o mesmo tópico geral da afirmação?
+2. Há informações que podem apoiar ou contradizer a afirmação?
+3. As fontes são confiáveis?
+4. Há informações suficientes para uma conclusão baseada em evidências + conhecimento geral?
+
+Se há relevância temática, marque como SUFFICIENT mesmo que não seja uma resposta direta.
+
+Responda no formato:
+DECISÃO: [SUFFICIENT/INSUFFICIENT/CONTRADICTORY]
+CONFIANÇA: [0.0-1.0]
+JUSTIFICATIVA: [explicação detalhada]"""
+
+# Instruções fixas no prefixo (sistema, idêntico em todas as chamadas);
+# a afirmação e os documentos vão na mensagem do usuário
+_EVALUATION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", _SELF_CHECK_SYSTEM_PROMPT),
+    ("human", 'Afirmação a verificar: "{query}"\n\nDocumentos encontrados:\n{documents}\n\n'
+              'Avalie se há evidências suficientes para verificar esta afirmação.')
+])
+
+
+@dataclass(slots=True)
+class BatchEvaluationConfig:
+    """Parâmetros da avaliação em lote (abatch_process)."""
+    
+    max_concurrency: int = 32
+    timeout_per_item: float = 60.0
+
 
-    def process_query(self, query: str, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+class SelfCheckAgent:
+    """
+    Agente responsável por verificar se há evidências suficientes para responder.
+    """
+    
+    def __init__(self, llm: BaseLanguageModel, response_cache: LLMResponseCache = None,
+                 min_relevance_score: float = 0.2, min_context_chars: int = 200):
+        """
+        Inicializa o agente self-check.
+        
+        Args:
+            llm: Instância do modelo de linguagem
+            response_cache: Cache de respostas do LLM (opcional)
+            min_relevance_score: Abaixo deste relevance_score (o maior entre os
+                documentos) as evidências são insuficientes, sem chamada ao LLM
+            min_context_chars: Abaixo deste total de caracteres de conteúdo as
+                evidências são insuficientes, sem chamada ao LLM
+        """
+        self.llm = llm
+        self.response_cache = response_cache or LLMResponseCache()
+        self.min_relevance_score = min_relevance_score
+        self.min_context_chars = min_context_chars
+        self.system_prompt = _SELF_CHECK_SYSTEM_PROMPT
+        self.evaluation_prompt = _EVALUATION_PROMPT
+
+    def process_query(self, query: str, documents: List[Dict[str, Any]],
+                      formatted_context: Optional[str] = None) -> EvidenceResult:
         """
         Processa uma consulta verificando se há evidências suficientes.
         
         Args:
             query: Consulta/afirmação a ser verificada
             documents: Lista de documentos com evidências
+            formatted_context: Contexto dos documentos já formatado
+                (format_document_context); calculado aqui se omitido
             
         Returns:
-            Dicionário com resultado da verificação
+            Resultado da verificação (EvidenceResult)
         """
         try:
-            if not documents:
-                return {
-                    "has_evidence": False,
-                    "evidence_quality": "INSUFFICIENT",
-                    "reasoning": "Nenhum documento encontrado",
-                    "confidence": 0.0,
-                    "query": query,
-                    "num_documents": 0,
-                    "agent": "SELF_CHECK"
-                }
-            
-            # Preparar contexto dos documentos
-            doc_context = self._prepare_document_context(documents)
-            
-            # Prompt de avaliação melhorado
-            evaluation_prompt = f"""
-            Afirmação a verificar: "{query}"
-            
-            Documentos encontrados:
-            {doc_context}
-            
-            Avalie se há evidências suficientes para verificar esta afirmação.
-            
-            IMPORTANTE: Seja PERMISSIVO! Se os documentos são sobre o mesmo tópico geral, marque como SUFFICIENT.
+            precheck = self._precheck_result(query, documents)
+            if precheck is not None:
+                return precheck
             
-            Exemplos de relevância:
-            - "Vacina causa autismo" + documentos sobre "vacinas são seguras" = SUFFICIENT
-            - "Aquecimento global é real" + documentos sobre "mudanças climáticas" = SUFFICIENT
-            - "Exercícios melhoram saúde" + documentos sobre "vacinas COVID" = INSUFFICIENT
+            # Fazer chamada para o LLM (a mesma avaliação é reaproveitada do cache)
+            prompt = self._build_evaluation_prompt(query, documents, formatted_context)
+            response = self.response_cache.invoke(self.llm, prompt, "self_check")
+            return self._build_evaluation_result(response, query, documents)
             
-            Considere:
-            1. Os documentos são sobre o mesmo tópico geral da afirmação?
-            2. Há informações que podem apoiar ou contradizer a afirmação?
-            3. As fontes são confiáveis?
-            4. Há informações suficientes para uma conclusão baseada em evidências + conhecimento geral?
-            
-            Se há relevância temática, marque como SUFFICIENT mesmo que não seja uma resposta direta.
+        except Exception as e:
+            return self._evaluation_error_result(e, query, documents)
+    
+    async def aprocess_query(self, query: str, documents: List[Dict[str, Any]],
+                             formatted_context: Optional[str] = None) -> EvidenceResult:
+        """
+        Versão assíncrona de process_query.
+        
+        Args:
+            query: Consulta/afirmação a ser verificada
+            documents: Lista de documentos com evidências
+            formatted_context: Contexto dos documentos já formatado
             
-            Responda no formato:
-            DECISÃO: [SUFFICIENT/INSUFFICIENT/CONTRADICTORY]
-            CONFIANÇA: [0.0-1.0]
-            JUSTIFICATIVA: [explicação detalhada]
-            """
+        Returns:
+            Resultado da verificação (EvidenceResult)
+        """
+        try:
+            precheck = self._precheck_result(query, documents)
+            if precheck is not None:
+                return precheck
             
-            # Fazer chamada para o LLM
-            response = self.llm.invoke(evaluation_prompt)
+            prompt = self._build_evaluation_prompt(query, documents, formatted_context)
+            response = await self.response_cache.ainvoke(self.llm, prompt, "self_check")
+            return self._build_evaluation_result(response, query, documents)
             
-            # Processar resposta
-            result = self._parse_evaluation_response(response)
+        except Exception as e:
+            return self._evaluation_error_result(e, query, documents)
+    
+    async def abatch_process(self, queries_with_docs: List[Tuple[str, List[Dict[str, Any]]]],
+                             config: Optional[BatchEvaluationConfig] = None) -> List[EvidenceResult]:
+        """
+        Avalia várias consultas com chamadas concorrentes ao LLM.
+        
+        As chamadas são disparadas em ordem de tamanho do prompt, para que
+        prompts de tamanho parecido cheguem juntos ao provedor, com no máximo
+        config.max_concurrency em andamento. Cada item tem seu próprio
+        timeout; novas tentativas ficam a cargo do cliente do LLM
+        (LLM_MAX_RETRIES).
+        
+        Args:
+            queries_with_docs: Lista de (consulta, documentos)
+            config: Parâmetros de concorrência e timeout
             
-            # Adicionar metadados
-            result.update({
-                "query": query,
-                "num_documents": len(documents),
-                "agent": "SELF_CHECK"
-            })
+        Returns:
+            Resultado de process_query para cada item, na mesma ordem
+        """
+        config = config or BatchEvaluationConfig()
+        semaphore = asyncio.Semaphore(max(1, config.max_concurrency))
+        prechecks = [self._precheck_result(query, documents) for query, documents in queries_with_docs]
+        prompts = [
+            self._build_evaluation_prompt(query, documents) if precheck is None else None
+            for (query, documents), precheck in zip(queries_with_docs, prechecks)
+        ]
+        
+        async def evaluate(index: int) -> EvidenceResult:
+            query, documents = queries_with_docs[index]
+            if prechecks[index] is not None:
+                return prechecks[index]
             
-            logger.info(f"Self-check concluído: {result['evidence_quality']} (confiança: {result['confidence']})")
-            return result
+            async with semaphore:
+                try:
+                    response = await asyncio.wait_for(
+                        self.response_cache.ainvoke(self.llm, prompts[index], "self_check"),
+                        config.timeout_per_item
+                    )
+                    return self._build_evaluation_result(response, query, documents)
+                except Exception as e:
+                    return self._evaluation_error_result(e, query, documents)
+        
+        # Tamanho estimado pelo número de caracteres das mensagens
+        order = sorted(
+            range(len(prompts)),
+            key=lambda i: sum(len(message.content) for message in prompts[i]) if prompts[i] else 0
+        )
+        tasks = {i: asyncio.create_task(evaluate(i)) for i in order}
+        results = await asyncio.gather(*(tasks[i] for i in range(len(prompts))))
+        
+        logger.info("Self-check em lote concluído: %d consultas", len(results))
+        return list(results)
+    
+    def _build_evaluation_prompt(self, query: str, documents: List[Dict[str, Any]],
+                                 formatted_context: Optional[str] = None) -> List[BaseMessage]:
+        """Monta as mensagens de avaliação das evidências."""
+        if formatted_context is None:
+            formatted_context = self._prepare_document_context(documents)
+        
+        return self.evaluation_prompt.format_messages(query=query, documents=formatted_context)
+    
+    def _build_evaluation_result(self, response, query: str, documents: List[Dict[str, Any]]) -> EvidenceResult:
+        """Monta o resultado da avaliação a partir da resposta do LLM."""
+        # Processar resposta
+        result = self._parse_evaluation_response(response)
+        
+        # Adicionar metadados
+        result.query = query
+        result.num_documents = len(documents)
+        
+        logger.info("Self-check concluído: %s (confiança: %s)", result.evidence_quality, result.confidence)
+        return result
+    
+    def _precheck_result(self, query: str, documents: List[Dict[str, Any]]) -> Optional[EvidenceResult]:
+        """
+        Decide sem o LLM os casos evidentes de evidências insuficientes.
+        
+        Args:
+            query: Consulta/afirmação a ser verificada
+            documents: Lista de documentos com evidências
             
-        except Exception as e:
-            logger.error(f"Erro na avaliação de evidências: {str(e)}")
-            return {
-                "has_evidence": False,
-                "evidence_quality": "INSUFFICIENT",
-                "reasoning": f"Erro na avaliação: {str(e)}",
-                "confidence": 0.0,
-                "query": query,
-                "num_documents": len(documents),
-                "agent": "SELF_CHECK"
-            }
+        Returns:
+            Resultado INSUFFICIENT, ou None se a avaliação precisa do LLM
+        """
+        if not documents:
+            return self._no_documents_result(query)
+        
+        # Scores já calculados pelo retriever; documentos sem score não entram no limiar
+        max_score = max((doc["relevance_score"] for doc in documents if "relevance_score" in doc), default=None)
+        if max_score is not None and max_score < self.min_relevance_score:
+            reasoning = "Documentos abaixo do limiar de relevância"
+        elif sum(len(doc.get("content", "")) for doc in documents) < self.min_context_chars:
+            reasoning = "Conteúdo dos documentos insuficiente para avaliação"
+        else:
+            return None
+        
+        logger.info("Self-check concluído sem LLM: %s", reasoning)
+        return EvidenceResult(
+            has_evidence=False,
+            evidence_quality="INSUFFICIENT",
+            reasoning=reasoning,
+            confidence=0.0,
+            query=query,
+            num_documents=len(documents)
+        )
+    
+    @staticmethod
+    def _no_documents_result(query: str) -> EvidenceResult:
+        """Resultado quando nenhum documento foi encontrado."""
+        return EvidenceResult(
+            has_evidence=False,
+            evidence_quality="INSUFFICIENT",
+            reasoning="Nenhum documento encontrado",
+            confidence=0.0,
+            query=query
+        )
+    
+    @staticmethod
+    def _evaluation_error_result(error: Exception, query: str, documents: List[Dict[str, Any]]) -> EvidenceResult:
+        """Monta o resultado de erro da avaliação."""
+        logger.error(f"Erro na avaliação de evidências: {str(error)}")
+        return EvidenceResult(
+            has_evidence=False,
+            evidence_quality="INSUFFICIENT",
+            reasoning=f"Erro na avaliação: {str(error)}",
+            confidence=0.0,
+            query=query,
+            num_documents=len(documents)
+        )
     
     def _prepare_document_context(self, documents: List[Dict[str, Any]]) -> str:
         """
@@ -134,23 +291,9 @@ EXEMPLOS:
         Returns:
             String com contexto formatado
         """
-        context_parts = []
-        
-        for i, doc in enumerate(documents, 1):
-            content = doc.get("content", "")
-            source = doc.get("source", "Fonte desconhecida")
-            url = doc.get("url", "")
-            
-            context_parts.append(f"Documento {i}:")
-            context_parts.append(f"Fonte: {source}")
-            if url:
-                context_parts.append(f"URL: {url}")
-            context_parts.append(f"Conteúdo: {content[:500]}...")
-            context_parts.append("")
-        
-        return "\n".join(context_parts)
+        return format_document_context(documents)
     
-    def _parse_evaluation_response(self, response) -> Dict[str, Any]:
+    def _parse_evaluation_response(self, response) -> EvidenceResult:
         """
         Processa a resposta do LLM para extrair informações estruturadas.
         
@@ -158,69 +301,39 @@ EXEMPLOS:
             response: Resposta do LLM
             
         Returns:
-            Dicionário com avaliação processada
+            Avaliação processada (sem consulta e número de documentos)
         """
+        response_text = extract_text(response)
+        
+        # Campos em uma única passada; repetidos, vale a última ocorrência
+        fields = dict(_EVALUATION_RE.findall(response_text))
+        decision = fields.get("DECISÃO", "INSUFFICIENT").upper()
+        reasoning = fields.get("JUSTIFICATIVA", "Resposta não processada corretamente")
         try:
-            if hasattr(response, 'content'):
-                response_text = response.content
-            else:
-                response_text = str(response)
-            
-            lines = response_text.strip().split('\n')
-            decision = "INSUFFICIENT"
+            confidence = float(fields.get("CONFIANÇA", "0.5"))
+        except ValueError:
             confidence = 0.5
-            reasoning = "Resposta não processada corretamente"
-            
-            for line in lines:
-                line = line.strip()
-                if line.startswith("DECISÃO:"):
-                    decision = line.split(":", 1)[1].strip().upper()
-                elif line.startswith("CONFIANÇA:"):
-                    try:
-                        confidence = float(line.split(":", 1)[1].strip())
-                    except ValueError:
-                        confidence = 0.5
-                elif line.startswith("JUSTIFICATIVA:"):
-                    reasoning = line.split(":", 1)[1].strip()
-            
-            # Determinar se há evidências suficientes - MAIS PERMISSIVO
-            has_evidence = decision in ["SUFFICIENT", "CONTRADICTORY"]
-            
-            # Se a confiança é alta (>0.6) e há documentos relevantes, considerar como SUFFICIENT
-            if confidence > 0.6 and decision == "INSUFFICIENT":
-                # Verificar se há palavras-chave que indicam relevância
-                reasoning_lower = reasoning.lower()
-                relevant_keywords = ["relevante", "relacionado", "tópico", "assunto", "similar"]
-                if any(keyword in reasoning_lower for keyword in relevant_keywords):
-                    decision = "SUFFICIENT"
-                    has_evidence = True
-            
-            return {
-                "has_evidence": has_evidence,
-                "evidence_quality": decision,
-                "reasoning": reasoning,
-                "confidence": confidence,
-                "source_reliability": {
-                    "total_sources": 1,  # Simplificado
-                    "reliable_sources": 1 if has_evidence else 0,
-                    "reliability_score": confidence,
-                    "is_reliable": has_evidence
-                },
-                "should_proceed": has_evidence
-            }
-            
-        except Exception as e:
-            logger.error(f"Erro ao processar resposta: {str(e)}")
-            return {
-                "has_evidence": False,
-                "evidence_quality": "INSUFFICIENT",
-                "reasoning": f"Erro no processamento: {str(e)}",
-                "confidence": 0.0,
-                "source_reliability": {
-                    "total_sources": 0,
-                    "reliable_sources": 0,
-                    "reliability_score": 0.0,
-                    "is_reliable": False
-                },
-                "should_proceed": False
-            }
+        
+        # Determinar se há evidências suficientes - MAIS PERMISSIVO
+        has_evidence = decision in ["SUFFICIENT", "CONTRADICTORY"]
+        
+        # Se a confiança é alta (>0.6) e há documentos relevantes, considerar como SUFFICIENT
+        if confidence > 0.6 and decision == "INSUFFICIENT":
+            # Verificar se há palavras-chave que indicam relevância
+            if _RELEVANCE_RE.search(reasoning):
+                decision = "SUFFICIENT"
+                has_evidence = True
+        
+        return EvidenceResult(
+            has_evidence=has_evidence,
+            evidence_quality=decision,
+            reasoning=reasoning,
+            confidence=confidence,
+            source_reliability={
+                "total_sources": 1,  # Simplificado
+                "reliable_sources": 1 if has_evidence else 0,
+                "reliability_score": confidence,
+                "is_reliable": has_evidence
+            },
+            should_proceed=has_evidence
+        )
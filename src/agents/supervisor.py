@@ -2,28 +2,31 @@
 Agente Supervisor - Roteador principal que decide qual agente ativar.
 """
 
-from typing import Dict, Any, List
-from langchain_core.messages import BaseMessage, HumanMessage
+import re
+from typing import Dict, Any, List, Optional, Union
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_core.language_models.base import BaseLanguageModel
+from ..entity.evidence import EvidenceResult
+from ..utils.llm_response import extract_text
 import logging
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+# Configurar logging (o nível e os handlers são definidos pela aplicação)
 logger = logging.getLogger(__name__)
 
+# Termos que identificam sem ambiguidade uma consulta de verificação: estas
+# consultas vão direto ao RETRIEVER, sem chamada ao LLM
+_FAST_PATH_RE = re.compile(
+    r"\b(verdade|verdadeir[oa]s?|fals[oa]s?|fake|not[íi]cias?|boatos?|mitos?|desinforma[çc][ãa]o|"
+    r"checagem|checar|verificar|procede|[ée] real|vacinas?|covid|elei[çc][õo]es|urnas?)\b",
+    re.IGNORECASE
+)
 
-class SupervisorAgent:
-    """Agente supervisor que roteia consultas para outros agentes."""
-    
-    def __init__(self, llm: BaseLanguageModel):
-        """
-        Inicializa o agente supervisor.
-        
-        Args:
-            llm: Instância do modelo de linguagem
-        """
-        self.llm = llm
-        self.system_prompt = """Você é um supervisor inteligente do sistema DesmentAI, responsável por rotear consultas de verificação de notícias.
+
+# Nome de agente em qualquer ponto da resposta (ex.: "Agente: RETRIEVER")
+_AGENT_NAME_RE = re.compile(r"\b(RETRIEVER|SELF_CHECK|ANSWER|SAFETY)\b", re.IGNORECASE)
+
+# Instruções do agente, compartilhadas por todas as instâncias
+_SUPERVISOR_SYSTEM_PROMPT = """Você é um supervisor inteligente do sistema DesmentAI, responsável por rotear consultas de verificação de notícias.
 
 Sua função é analisar a consulta do usuário e decidir qual agente deve ser ativado primeiro.
 
@@ -40,6 +43,28 @@ REGRAS:
 
 Responda APENAS com o nome do agente (RETRIEVER, SELF_CHECK, ANSWER, SAFETY) ou uma mensagem de redirecionamento."""
 
+# Criada uma vez: o prefixo enviado ao LLM é idêntico em todas as consultas
+_SUPERVISOR_SYSTEM_MESSAGE = SystemMessage(content=_SUPERVISOR_SYSTEM_PROMPT)
+
+
+class SupervisorAgent:
+    """Agente supervisor que roteia consultas para outros agentes."""
+    
+    def __init__(self, llm: BaseLanguageModel):
+        """
+        Inicializa o agente supervisor.
+        
+        Args:
+            llm: Instância do modelo de linguagem
+        """
+        self.llm = llm
+        self.system_prompt = _SUPERVISOR_SYSTEM_PROMPT
+        self.system_message = _SUPERVISOR_SYSTEM_MESSAGE
+        
+        # Roteamentos resolvidos pelo atalho de palavras-chave e pelo LLM
+        self.fast_path_hits = 0
+        self.llm_routed = 0
+
     def route_query(self, query: str, context: Dict[str, Any] = None) -> str:
         """
         Roteia uma consulta para o agente apropriado.
@@ -52,37 +77,92 @@ Responda APENAS com o nome do agente (RETRIEVER, SELF_CHECK, ANSWER, SAFETY) ou
             Nome do agente para ativar ou mensagem de redirecionamento
         """
         try:
-            # Criar mensagem para o LLM
-            messages = [
-                HumanMessage(content=f"Consulta: {query}")
-            ]
+            fast_route = self._fast_route(query)
+            if fast_route is not None:
+                return fast_route
             
             # Fazer chamada para o LLM
-            response = self.llm.invoke(messages)
+            self.llm_routed += 1
+            response = self.llm.invoke(self._build_route_messages(query))
+            return self._parse_route(response)
+                
+        except Exception as e:
+            logger.error(f"Erro no supervisor: {str(e)}")
+            # Em caso de erro, rotear para RETRIEVER por padrão
+            return "RETRIEVER"
+    
+    async def aroute_query(self, query: str, context: Dict[str, Any] = None) -> str:
+        """
+        Versão assíncrona de route_query.
+        
+        Args:
+            query: Consulta do usuário
+            context: Contexto adicional (opcional)
             
-            # Processar resposta
-            if hasattr(response, 'content'):
-                agent_name = response.content.strip().upper()
-            else:
-                agent_name = str(response).strip().upper()
+        Returns:
+            Nome do agente para ativar ou mensagem de redirecionamento
+        """
+        try:
+            fast_route = self._fast_route(query)
+            if fast_route is not None:
+                return fast_route
             
-            # Validar resposta
-            valid_agents = ["RETRIEVER", "SELF_CHECK", "ANSWER", "SAFETY"]
+            self.llm_routed += 1
+            response = await self.llm.ainvoke(self._build_route_messages(query))
+            return self._parse_route(response)
             
-            if agent_name in valid_agents:
-                logger.info(f"Supervisor roteou para: {agent_name}")
-                return agent_name
-            else:
-                # Se não for um agente válido, rotear para RETRIEVER por padrão
-                logger.info(f"Supervisor retornou '{agent_name}', roteando para RETRIEVER")
-                return "RETRIEVER"
-                
         except Exception as e:
             logger.error(f"Erro no supervisor: {str(e)}")
-            # Em caso de erro, rotear para RETRIEVER por padrão
             return "RETRIEVER"
     
-    def should_continue(self, agent_name: str, result: Dict[str, Any]) -> str:
+    def _fast_route(self, query: str) -> Optional[str]:
+        """Retorna RETRIEVER para consultas claramente de verificação, sem chamar o LLM."""
+        if not _FAST_PATH_RE.search(query):
+            return None
+        
+        self.fast_path_hits += 1
+        logger.info("Supervisor roteou para: RETRIEVER (atalho)")
+        return "RETRIEVER"
+    
+    def _build_route_messages(self, query: str) -> List[BaseMessage]:
+        """Cria as mensagens de roteamento para o LLM."""
+        return [
+            self.system_message,
+            HumanMessage(content=f"Consulta: {query}")
+        ]
+    
+    @staticmethod
+    def _parse_route(response) -> str:
+        """
+        Extrai a rota da resposta do LLM.
+        
+        O RETRIEVER é a única entrada do fluxo: os demais agentes dependem dos
+        documentos recuperados, então qualquer resposta que cite um agente
+        leva ao RETRIEVER. Só uma resposta sem nome de agente é tratada como
+        mensagem de redirecionamento.
+        
+        Args:
+            response: Resposta do LLM
+            
+        Returns:
+            "RETRIEVER" ou a mensagem de redirecionamento
+        """
+        text = extract_text(response).strip()
+        match = _AGENT_NAME_RE.search(text)
+        
+        if match:
+            logger.info("Supervisor roteou para: RETRIEVER (resposta: %s)", match.group(1).upper())
+            return "RETRIEVER"
+        
+        # Uma resposta vazia ou de uma palavra não é uma mensagem para o usuário
+        if len(text.split()) <= 1:
+            logger.info("Supervisor retornou '%s', roteando para RETRIEVER", text)
+            return "RETRIEVER"
+        
+        logger.info("Supervisor redirecionou a consulta")
+        return text
+    
+    def should_continue(self, agent_name: str, result: Union[Dict[str, Any], EvidenceResult]) -> str:
         """
         Decide se deve continuar para o próximo agente.
         
@@ -94,16 +174,22 @@ Responda APENAS com o nome do agente (RETRIEVER, SELF_CHECK, ANSWER, SAFETY) ou
             Nome do próximo agente ou "END" para finalizar
         """
         try:
+            # O self-check retorna um EvidenceResult; os demais agentes, dicionários
+            if isinstance(result, EvidenceResult):
+                has_evidence = result.has_evidence
+            else:
+                has_evidence = result.get("has_evidence", False)
+            
             # Fluxo padrão: RETRIEVER -> SELF_CHECK -> ANSWER -> SAFETY
             flow = {
                 "RETRIEVER": "SELF_CHECK",
-                "SELF_CHECK": "ANSWER" if result.get("has_evidence", False) else "END",
+                "SELF_CHECK": "ANSWER" if has_evidence else "END",
                 "ANSWER": "SAFETY",
                 "SAFETY": "END"
             }
             
             next_agent = flow.get(agent_name, "END")
-            logger.info(f"Próximo agente: {next_agent}")
+            logger.info("Próximo agente: %s", next_agent)
             return next_agent
             
         except Exception as e:
@@ -4,6 +4,7 @@ Módulo central do DesmentAI.
 
 from .desmentai import DesmentAI
 from .graph import DesmentAIGraph, DesmentAIState
+from .result import VerificationResult
 
-__all__ = ["DesmentAI", "DesmentAIGraph", "DesmentAIState"]
+__all__ = ["DesmentAI", "DesmentAIGraph", "DesmentAIState", "VerificationResult"]
 
@@ -4,10 +4,14 @@ Classe principal do DesmentAI - Sistema de combate a fake news.
 
 import os
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+from dataclasses import replace
+from typing import Callable, Dict, Any, Iterator, List, Optional
 from pathlib import Path
 
-from ..utils import LLMLoader, DocumentProcessor, EmbeddingManager
+from cachetools import TTLCache
+
+from ..utils import LLMLoader, DocumentProcessor, EmbeddingManager, LLMResponseCache
 from ..agents import (
     SupervisorAgent, 
     RetrieverAgent, 
@@ -16,9 +20,9 @@ from ..agents import (
     SafetyAgent
 )
 from .graph import DesmentAIGraph
+from .result import VerificationResult
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+# Configurar logging (o nível e os handlers são definidos pela aplicação)
 logger = logging.getLogger(__name__)
 
 
@@ -30,7 +34,9 @@ class DesmentAI:
         model_name: str = "llama3.1:8b",
         embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2",
         vector_store_path: str = "data/vector_store",
-        data_path: str = "data/raw"
+        data_path: str = "data/raw",
+        llm_loader: Optional[LLMLoader] = None,
+        lazy: bool = False
     ):
         """
         Inicializa o DesmentAI.
@@ -40,19 +46,38 @@ class DesmentAI:
             embedding_model: Nome do modelo de embeddings
             vector_store_path: Caminho para o vector store
             data_path: Caminho para os dados brutos
+            llm_loader: Carregador de LLM compartilhado (opcional). Quando
+                informado, o cliente do modelo e suas conexões são reutilizados.
+            lazy: Se True, o modelo de embeddings, o índice e os agentes só são
+                carregados na primeira verificação
         """
         self.model_name = model_name
         self.embedding_model = embedding_model
         self.vector_store_path = vector_store_path
         self.data_path = data_path
+        self.lazy = lazy
         
         # Inicializar componentes
-        self.llm_loader = None
+        self.llm_loader = llm_loader
         self.document_processor = None
         self.embedding_manager = None
         self.agents = {}
         self.graph = None
         self.vector_store = None
+        self.llm_cache = LLMResponseCache()
+        self._load_lock = threading.Lock()
+        
+        # Parâmetros de busca aplicados ao carregar os componentes
+        self.top_k = 5
+        self.nprobe: Optional[int] = None
+        self.ef_search: Optional[int] = None
+        self._pending_query_embeddings: List[str] = []
+        
+        # Cache de resultados por consulta normalizada. Apenas acertos exatos:
+        # consultas próximas no embedding (ex.: uma afirmação e a sua negação)
+        # podem ter veredictos opostos; a similaridade é usada só na busca
+        self._result_cache = TTLCache(maxsize=256, ttl=3600)
+        self._result_cache_lock = threading.Lock()
         
         # Status do sistema
         self.is_initialized = False
@@ -63,18 +88,28 @@ class DesmentAI:
         # Inicializar automaticamente
         self.initialize()
     
+    @property
+    def is_loaded(self) -> bool:
+        """Indica se embeddings, índice e agentes já foram carregados."""
+        return self.graph is not None
+    
     def initialize(self) -> bool:
         """
-        Inicializa todos os componentes do sistema.
+        Inicializa o sistema. Em modo lazy, apenas a conexão com o LLM é
+        verificada aqui; o restante é carregado por ensure_loaded().
         
         Returns:
             True se inicialização bem-sucedida, False caso contrário
         """
+        if self.is_initialized:
+            return True
+        
         try:
             logger.info("Inicializando DesmentAI...")
             
-            # 1. Inicializar LLM loader
-            self.llm_loader = LLMLoader()
+            # 1. Inicializar LLM loader (reutiliza o compartilhado, se houver)
+            if self.llm_loader is None:
+                self.llm_loader = LLMLoader()
             
             # Verificar conexão com o provedor configurado
             if not self.llm_loader.check_connection():
@@ -87,17 +122,9 @@ class DesmentAI:
             # 2. Inicializar processador de documentos
             self.document_processor = DocumentProcessor()
             
-            # 3. Inicializar gerenciador de embeddings
-            self.embedding_manager = EmbeddingManager(self.embedding_model)
-            
-            # 4. Carregar ou criar vector store
-            self._setup_vector_store()
-            
-            # 5. Inicializar agentes
-            self._initialize_agents()
-            
-            # 6. Criar grafo
-            self.graph = DesmentAIGraph(self.agents)
+            # 3. Carregar embeddings, índice e agentes (adiado em modo lazy)
+            if not self.lazy:
+                self._load_components()
             
             self.is_initialized = True
             logger.info("DesmentAI inicializado com sucesso!")
@@ -108,6 +135,74 @@ class DesmentAI:
             logger.error(f"Erro na inicialização: {str(e)}")
             return False
     
+    def ensure_loaded(self) -> bool:
+        """
+        Carrega embeddings, índice e agentes caso ainda não tenham sido carregados.
+        
+        Returns:
+            True se os componentes estão prontos, False caso contrário
+        """
+        if self.is_loaded:
+            return True
+        
+        if not self.is_initialized:
+            return False
+        
+        with self._load_lock:
+            if self.is_loaded:
+                return True
+            
+            try:
+                self._load_components()
+                return True
+            except Exception as e:
+                self.initialization_error = str(e)
+                logger.error(f"Erro ao carregar componentes: {str(e)}")
+                return False
+    
+    def _load_components(self):
+        """Carrega modelo de embeddings, vector store, agentes e grafo."""
+        logger.info("Carregando embeddings, índice e agentes...")
+        
+        # 1. Inicializar gerenciador de embeddings
+        self.embedding_manager = EmbeddingManager(self.embedding_model, nprobe=self.nprobe,
+                                                  ef_search=self.ef_search)
+        self.nprobe = self.embedding_manager.nprobe
+        self.ef_search = self.embedding_manager.ef_search
+        
+        # 2. Carregar ou criar vector store
+        self._setup_vector_store()
+        
+        # 3. Inicializar agentes
+        self._initialize_agents()
+        
+        # 4. Aquecer modelos para a primeira verificação
+        if os.getenv("DESMENTAI_WARMUP", "true").lower() == "true":
+            self._warmup()
+        
+        # 5. Criar grafo (marca os componentes como carregados)
+        self.graph = DesmentAIGraph(self.agents)
+        
+        # 6. Embeddings de consultas solicitados antes do carregamento
+        pending, self._pending_query_embeddings = self._pending_query_embeddings, []
+        if pending:
+            self.precompute_query_embeddings(pending)
+    
+    def _warmup(self):
+        """
+        Executa uma busca de aquecimento para que a primeira verificação
+        não pague o custo de carga do modelo de embeddings e do índice.
+        
+        O LLM já é aquecido pela verificação de conexão na inicialização.
+        """
+        try:
+            self.embedding_manager.embedding_model.embed_query("ok")
+            if self.vector_store is not None:
+                self.vector_store.similarity_search_with_score("ok", k=1)
+            logger.info("Aquecimento concluído")
+        except Exception as e:
+            logger.warning(f"Falha no aquecimento: {str(e)}")
+    
     def _setup_vector_store(self):
         """Configura o vector store."""
         try:
@@ -182,11 +277,13 @@ class DesmentAI:
                     self.document_processor,
                     self.embedding_manager,
                     min_local_docs=3,  # Mais rigoroso
-                    web_search_threshold=0.7  # Threshold mais alto
+                    web_search_threshold=0.7,  # Threshold mais alto
+                    top_k=self.top_k,
+                    response_cache=self.llm_cache
                 ),
-                "self_check": SelfCheckAgent(llm),
-                "answer": AnswerAgent(llm),
-                "safety": SafetyAgent(llm)
+                "self_check": SelfCheckAgent(llm, response_cache=self.llm_cache),
+                "answer": AnswerAgent(llm, response_cache=self.llm_cache),
+                "safety": SafetyAgent(llm, response_cache=self.llm_cache)
             }
             
             logger.info("Agentes inicializados com sucesso")
@@ -195,42 +292,257 @@ class DesmentAI:
             logger.error(f"Erro ao inicializar agentes: {str(e)}")
             raise
     
-    def verify_news(self, query: str) -> Dict[str, Any]:
+    def verify_news(self, query: str, on_stage: Optional[Callable[[str, float], None]] = None) -> VerificationResult:
         """
         Verifica uma notícia/afirmação.
         
         Args:
             query: Notícia ou afirmação a ser verificada
+            on_stage: Callback opcional chamado ao fim de cada etapa com
+                (nome da etapa, segundos desde o início)
             
         Returns:
             Resultado da verificação
         """
-        if not self.is_initialized:
-            return {
-                "error": "Sistema não inicializado",
-                "success": False
-            }
+        if not self.ensure_loaded():
+            return self._not_initialized_result()
+        
+        query = self.normalize_query(query)
+        cached = self._get_cached_result(query)
+        if cached is not None:
+            return cached
         
         try:
-            logger.info(f"Verificando: {query[:100]}...")
+            logger.info("Verificando: %s...", query[:100])
             
             # Processar através do grafo
-            result = self.graph.process_query(query)
+            result = self.graph.process_query(query, on_stage)
+            self._store_result(query, result)
             
-            logger.info(f"Verificação concluída: {result['success']}")
+            logger.info("Verificação concluída: %s", result.success)
             return result
             
         except Exception as e:
-            logger.error(f"Erro na verificação: {str(e)}")
-            return {
-                "query": query,
-                "final_answer": f"❌ Erro na verificação: {str(e)}",
-                "conclusion": "ERRO",
-                "citations": [],
-                "agent_results": {},
-                "error": str(e),
-                "success": False
-            }
+            return self._verification_error_result(query, e)
+    
+    def verify_news_stream(self, query: str, result: VerificationResult,
+                           on_stage: Optional[Callable[[str, float], None]] = None) -> Iterator[str]:
+        """
+        Verifica uma notícia emitindo a resposta em partes conforme é gerada.
+        
+        Args:
+            query: Notícia ou afirmação a ser verificada
+            result: Objeto preenchido com o resultado completo ao fim do stream
+            on_stage: Callback opcional chamado ao fim de cada etapa com
+                (nome da etapa, segundos desde o início)
+            
+        Yields:
+            Trechos da resposta gerada pelo agente Answer
+        """
+        if not self.ensure_loaded():
+            result.copy_from(self._not_initialized_result())
+            return
+        
+        query = self.normalize_query(query)
+        cached = self._get_cached_result(query)
+        if cached is not None:
+            result.copy_from(cached)
+            yield cached.final_answer
+            return
+        
+        logger.info("Verificando (stream): %s...", query[:100])
+        
+        yield from self.graph.stream_query(query, result, on_stage)
+        self._store_result(query, result)
+        
+        logger.info("Verificação concluída: %s", result.success)
+    
+    async def averify_news(self, query: str) -> VerificationResult:
+        """
+        Versão assíncrona de verify_news.
+        
+        Args:
+            query: Notícia ou afirmação a ser verificada
+            
+        Returns:
+            Resultado da verificação
+        """
+        if not self.ensure_loaded():
+            return self._not_initialized_result()
+        
+        query = self.normalize_query(query)
+        cached = self._get_cached_result(query)
+        if cached is not None:
+            return cached
+        
+        try:
+            logger.info("Verificando (async): %s...", query[:100])
+            
+            result = await self.graph.aprocess_query(query)
+            self._store_result(query, result)
+            
+            logger.info("Verificação concluída: %s", result.success)
+            return result
+            
+        except Exception as e:
+            return self._verification_error_result(query, e)
+    
+    def set_search_params(self, top_k: Optional[int] = None, nprobe: Optional[int] = None,
+                          ef_search: Optional[int] = None) -> None:
+        """
+        Ajusta os parâmetros de busca vetorial em tempo de execução.
+        
+        Args:
+            top_k: Número de documentos locais recuperados por consulta
+            nprobe: Número de listas IVF visitadas por busca (ignorado em índices não-IVF)
+            ef_search: Candidatos avaliados por busca HNSW (ignorado em índices sem HNSW)
+        """
+        changed = False
+        affects_results = False
+        
+        if top_k is not None and top_k != self.top_k:
+            self.top_k = top_k
+            changed = True
+            if self.is_loaded:
+                self.agents["retriever"].top_k = self.top_k
+                affects_results = True
+        
+        # Antes do carregamento, nprobe e efSearch são aplicados em _load_components
+        if nprobe is not None and nprobe != self.nprobe:
+            self.nprobe = nprobe
+            changed = True
+            if self.is_loaded:
+                affects_results |= self.embedding_manager.set_nprobe(self.nprobe)
+        
+        if ef_search is not None and ef_search != self.ef_search:
+            self.ef_search = ef_search
+            changed = True
+            if self.is_loaded:
+                affects_results |= self.embedding_manager.set_ef_search(self.ef_search)
+        
+        if not changed:
+            return
+        
+        # Resultados em cache foram obtidos com outros parâmetros; um parâmetro
+        # que o índice carregado ignora não invalida o cache
+        if affects_results:
+            self.clear_cache()
+        
+        logger.info(f"Parâmetros de busca: top_k={self.top_k}, nprobe={self.nprobe}, ef_search={self.ef_search}")
+    
+    def get_search_param_support(self) -> Dict[str, bool]:
+        """
+        Indica quais parâmetros de busca têm efeito no índice carregado.
+        
+        Returns:
+            Dicionário {"nprobe": bool, "ef_search": bool}; ambos False antes do carregamento
+        """
+        if not self.is_loaded:
+            return {"nprobe": False, "ef_search": False}
+        return self.embedding_manager.search_params()
+    
+    def precompute_query_embeddings(self, queries: List[str]) -> int:
+        """
+        Pré-calcula embeddings de consultas conhecidas para pular a codificação
+        quando forem verificadas.
+        
+        Args:
+            queries: Lista de consultas
+            
+        Returns:
+            Número de embeddings calculados (0 se adiados até o carregamento)
+        """
+        queries = [self.normalize_query(q) for q in queries]
+        
+        if not self.is_loaded:
+            self._pending_query_embeddings.extend(queries)
+            return 0
+        
+        try:
+            return self.embedding_manager.precompute_query_embeddings(queries)
+        except Exception as e:
+            logger.warning(f"Erro ao pré-calcular embeddings: {str(e)}")
+            return 0
+    
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Canonicaliza a consulta uma única vez na entrada do pipeline.
+        
+        A mesma string segue para o embedder e para os prompts, de modo que
+        variações de espaçamento reaproveitam embeddings já calculados.
+        
+        Args:
+            query: Consulta original
+            
+        Returns:
+            Consulta sem espaços redundantes
+        """
+        return " ".join(query.split())
+    
+    @staticmethod
+    def _cache_key(query: str) -> str:
+        """Chave do cache de resultados para uma consulta já normalizada."""
+        return query.lower()
+    
+    def _get_cached_result(self, query: str) -> Optional[VerificationResult]:
+        """
+        Busca um resultado já verificado para a consulta.
+        
+        Args:
+            query: Notícia ou afirmação a ser verificada
+            
+        Returns:
+            Cópia do resultado em cache ou None
+        """
+        # Acerto exato: consulta idêntica (após normalização)
+        with self._result_cache_lock:
+            cached = self._result_cache.get(self._cache_key(query))
+        
+        if cached is None:
+            return None
+        
+        logger.info("Resultado em cache para: %s...", query[:100])
+        return replace(cached)
+    
+    def _store_result(self, query: str, result: VerificationResult) -> None:
+        """
+        Armazena no cache apenas verificações bem-sucedidas.
+        
+        Consultas redirecionadas pelo supervisor não são armazenadas: um
+        roteamento equivocado se repetiria até a expiração do cache.
+        """
+        if not result.success:
+            return
+        if result.agent_results.get("supervisor", {}).get("redirected"):
+            return
+        
+        with self._result_cache_lock:
+            self._result_cache[self._cache_key(query)] = replace(result)
+    
+    def clear_cache(self) -> None:
+        """Remove todos os resultados armazenados no cache."""
+        with self._result_cache_lock:
+            self._result_cache.clear()
+        self.llm_cache.clear()
+        if self.agents.get("retriever"):
+            self.agents["retriever"].clear_cache()
+        logger.info("Cache de resultados limpo")
+    
+    def _not_initialized_result(self) -> VerificationResult:
+        """Resultado retornado quando o sistema não foi inicializado."""
+        return VerificationResult(success=False, error="Sistema não inicializado")
+    
+    def _verification_error_result(self, query: str, error: Exception) -> VerificationResult:
+        """Monta o resultado de erro da verificação."""
+        logger.error(f"Erro na verificação: {str(error)}")
+        return VerificationResult(
+            success=False,
+            query=query,
+            conclusion="ERRO",
+            final_answer=f"❌ Erro na verificação: {str(error)}",
+            error=str(error)
+        )
     
     def add_documents(self, documents: List[Dict[str, Any]]) -> bool:
         """
@@ -242,7 +554,7 @@ class DesmentAI:
         Returns:
             True se sucesso, False caso contrário
         """
-        if not self.is_initialized:
+        if not self.ensure_loaded():
             logger.error("Sistema não inicializado")
             return False
         
@@ -270,7 +582,8 @@ class DesmentAI:
             
             if success:
                 # Salvar vector store atualizado
-                self.vector_store.save_local(self.vector_store_path)
+                self.embedding_manager.save_vector_store(self.vector_store_path)
+                self.clear_cache()
                 logger.info(f"Adicionados {len(chunks)} chunks ao sistema")
             
             return success
@@ -292,21 +605,23 @@ class DesmentAI:
             "embedding_model": self.embedding_model,
             "vector_store_path": self.vector_store_path,
             "data_path": self.data_path,
-            "initialization_error": self.initialization_error
+            "initialization_error": self.initialization_error,
+            "components_loaded": self.is_loaded,
+            "llm_cache": self.llm_cache.stats()
         }
         
-        if self.is_initialized:
+        if self.is_loaded:
             # Adicionar informações do vector store
-            vector_info = self.embedding_manager.get_vector_store_info()
-            status["vector_store"] = vector_info
-            
+            status["vector_store"] = self.embedding_manager.get_vector_store_info()
+        
+        if self.is_initialized:
             # Verificar conexão Gemini
             status["gemini_connected"] = self.llm_loader.check_connection()
             
             # Configurações de performance do LLM
             config_info = self.llm_loader.get_config_info()
             status.update({
-                "temperature": config_info.get("temperature", 0.1),
+                "temperature": config_info.get("temperature", 0.0),
                 "top_p": config_info.get("top_p", 0.9),
                 "top_k": config_info.get("top_k", 40),
                 "repeat_penalty": config_info.get("repeat_penalty", 1.1),
@@ -323,6 +638,9 @@ class DesmentAI:
         Returns:
             True se sucesso, False caso contrário
         """
+        if not self.ensure_loaded():
+            return False
+        
         try:
             logger.info("Recarregando dados...")
             
@@ -331,15 +649,21 @@ class DesmentAI:
             
             # Reinicializar agente retriever
             if self.agents.get("retriever"):
+                self.agents["retriever"].close()
                 self.agents["retriever"] = RetrieverAgent(
                     self.llm_loader.get_llm(), 
                     self.vector_store,
                     self.document_processor,
                     self.embedding_manager,
                     min_local_docs=3,  
-                    web_search_threshold=0.7
+                    web_search_threshold=0.7,
+                    top_k=self.top_k,
+                    response_cache=self.llm_cache
                 )
             
+            # Resultados anteriores podem não refletir a nova base
+            self.clear_cache()
+            
             logger.info("Dados recarregados com sucesso")
             return True
             
@@ -2,19 +2,35 @@
 Grafo LangGraph para orquestração dos agentes do DesmentAI.
 """
 
-from typing import Dict, Any, List, TypedDict, Annotated
+import time
+from typing import Awaitable, Callable, Dict, Any, Iterator, List, Optional, TypedDict, Annotated, Union
+from langchain_core.runnables import RunnableLambda
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
+from .result import VerificationResult
+from ..utils.context import format_document_context
+from ..entity.evidence import EvidenceResult
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _merge_dicts(current: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Combina atualizações de dicionário vindas de nós executados em paralelo."""
+    return {**(current or {}), **(update or {})}
+
+
+def _keep_first_error(current: str, update: str) -> str:
+    """Mantém o primeiro erro registrado quando ramos paralelos falham."""
+    return current or update
+
+
 class DesmentAIState(TypedDict):
     """Estado do grafo DesmentAI."""
     query: str
     documents: List[Dict[str, Any]]
+    formatted_context: str
     key_claims: List[str]
     evidence_quality: str
     has_evidence: bool
@@ -22,13 +38,20 @@ class DesmentAIState(TypedDict):
     conclusion: str
     citations: List[Dict[str, Any]]
     final_answer: str
-    agent_results: Dict[str, Any]
+    agent_results: Annotated[Dict[str, Any], _merge_dicts]
     current_agent: str
-    error: str
+    error: Annotated[str, _keep_first_error]
+    timings: Annotated[Dict[str, float], _merge_dicts]
 
 
 class DesmentAIGraph:
-    """Grafo LangGraph para orquestração dos agentes."""
+    """Grafo LangGraph para orquestração dos agentes.
+    
+    Após o retriever, a extração de afirmações ("claims") e a avaliação de
+    evidências ("self_check") são independentes e executam em paralelo.
+    Por isso os nós retornam apenas as chaves que alteram, e os campos
+    escritos por mais de um ramo possuem reducers.
+    """
     
     def __init__(self, agents: Dict[str, Any]):
         """
@@ -45,11 +68,12 @@ class DesmentAIGraph:
         try:
             workflow = StateGraph(DesmentAIState)
             
-            workflow.add_node("supervisor", self._supervisor_node)
-            workflow.add_node("retriever", self._retriever_node)
-            workflow.add_node("self_check", self._self_check_node)
-            workflow.add_node("answer", self._answer_node)
-            workflow.add_node("safety", self._safety_node)
+            workflow.add_node("supervisor", self._timed("supervisor", self._supervisor_node, self._asupervisor_node))
+            workflow.add_node("retriever", self._timed("retriever", self._retriever_node, self._aretriever_node))
+            workflow.add_node("claims", self._timed("claims", self._claims_node, self._aclaims_node))
+            workflow.add_node("self_check", self._timed("self_check", self._self_check_node, self._aself_check_node))
+            workflow.add_node("answer", self._timed("answer", self._answer_node, self._aanswer_node))
+            workflow.add_node("safety", self._timed("safety", self._safety_node, self._asafety_node))
             workflow.add_node("error_handler", self._error_handler_node)
             
             workflow.set_entry_point("supervisor")
@@ -64,16 +88,21 @@ class DesmentAIGraph:
                 }
             )
             
+            # Fan-out: claims e self_check rodam no mesmo passo; o answer só
+            # executa no passo seguinte, depois que ambos terminarem
             workflow.add_conditional_edges(
                 "retriever",
                 self._retriever_router,
                 {
+                    "claims": "claims",
                     "self_check": "self_check",
                     "error_handler": "error_handler",
                     "end": END
                 }
             )
             
+            workflow.add_edge("claims", END)
+            
             workflow.add_conditional_edges(
                 "self_check",
                 self._self_check_router,
@@ -111,95 +140,252 @@ class DesmentAIGraph:
             logger.error(f"Erro ao construir grafo: {str(e)}")
             raise
     
-    def _supervisor_node(self, state: DesmentAIState) -> DesmentAIState:
+    def _timed(self, name: str, node: Callable[[DesmentAIState], Dict[str, Any]],
+               anode: Optional[Callable[[DesmentAIState], Awaitable[Dict[str, Any]]]] = None):
+        """
+        Envolve um nó registrando sua duração em state["timings"].
+        
+        Args:
+            name: Nome do nó
+            node: Função do nó
+            anode: Versão assíncrona do nó, usada por graph.ainvoke/astream
+            
+        Returns:
+            Função do nó instrumentada (ou RunnableLambda com as duas versões)
+        """
+        def timed_node(state: DesmentAIState) -> Dict[str, Any]:
+            start = time.perf_counter()
+            update = node(state)
+            update["timings"] = {f"{name}_ms": (time.perf_counter() - start) * 1000}
+            return update
+        
+        if anode is None:
+            return timed_node
+        
+        async def atimed_node(state: DesmentAIState) -> Dict[str, Any]:
+            start = time.perf_counter()
+            update = await anode(state)
+            update["timings"] = {f"{name}_ms": (time.perf_counter() - start) * 1000}
+            return update
+        
+        return RunnableLambda(timed_node, afunc=atimed_node, name=name)
+    
+    def _supervisor_node(self, state: DesmentAIState) -> Dict[str, Any]:
         """Nó do supervisor."""
         try:
             query = state.get("query", "")
             if not query:
-                state["error"] = "Consulta vazia"
-                return state
+                return {"error": "Consulta vazia"}
             
             agent_name = self.agents["supervisor"].route_query(query)
+            return self._supervisor_update(agent_name)
             
-            if agent_name == "RETRIEVER":
-                state["current_agent"] = "retriever"
-                state["agent_results"] = {"supervisor": {"routed_to": "retriever"}}
-            else:
-                state["final_answer"] = agent_name
-                state["current_agent"] = "end"
+        except Exception as e:
+            logger.error(f"Erro no supervisor: {str(e)}")
+            return {"error": str(e)}
+    
+    async def _asupervisor_node(self, state: DesmentAIState) -> Dict[str, Any]:
+        """Versão assíncrona do nó do supervisor."""
+        try:
+            query = state.get("query", "")
+            if not query:
+                return {"error": "Consulta vazia"}
             
-            return state
+            agent_name = await self.agents["supervisor"].aroute_query(query)
+            return self._supervisor_update(agent_name)
             
         except Exception as e:
             logger.error(f"Erro no supervisor: {str(e)}")
-            state["error"] = str(e)
-            return state
+            return {"error": str(e)}
     
-    def _retriever_node(self, state: DesmentAIState) -> DesmentAIState:
-        """Nó do retriever."""
+    @staticmethod
+    def _supervisor_update(agent_name: str) -> Dict[str, Any]:
+        """
+        Atualização de estado a partir da rota escolhida pelo supervisor.
+        
+        O supervisor retorna "RETRIEVER" ou uma mensagem de redirecionamento,
+        que encerra o fluxo como resposta final.
+        """
+        if agent_name == "RETRIEVER":
+            return {
+                "current_agent": "retriever",
+                "agent_results": {"supervisor": {"routed_to": "retriever"}}
+            }
+        
+        return {
+            "final_answer": agent_name,
+            "current_agent": "end",
+            "agent_results": {"supervisor": {"routed_to": "end", "redirected": True}}
+        }
+    
+    def _retriever_node(self, state: DesmentAIState) -> Dict[str, Any]:
+        """Nó do retriever (a extração de afirmações fica no nó claims)."""
         try:
             query = state.get("query", "")
-            result = self.agents["retriever"].process_query(query)
-            
-            state["documents"] = result.get("documents", [])
-            state["key_claims"] = result.get("key_claims", [])
-            state["agent_results"] = state.get("agent_results", {})
-            state["agent_results"]["retriever"] = result
+            result = self.agents["retriever"].process_query(query, extract_claims=False)
+            return self._retriever_update(result)
             
-            return state
+        except Exception as e:
+            logger.error(f"Erro no retriever: {str(e)}")
+            return {"error": str(e)}
+    
+    async def _aretriever_node(self, state: DesmentAIState) -> Dict[str, Any]:
+        """Versão assíncrona do nó do retriever."""
+        try:
+            query = state.get("query", "")
+            result = await self.agents["retriever"].aprocess_query(query, extract_claims=False)
+            return self._retriever_update(result)
             
         except Exception as e:
             logger.error(f"Erro no retriever: {str(e)}")
-            state["error"] = str(e)
-            return state
+            return {"error": str(e)}
     
-    def _self_check_node(self, state: DesmentAIState) -> DesmentAIState:
-        """Nó do self-check."""
+    @staticmethod
+    def _retriever_update(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Atualização de estado a partir do resultado do retriever."""
+        documents = result.get("documents", [])
+        
+        # Contexto formatado uma vez e reaproveitado pelos nós seguintes
+        return {
+            "documents": documents,
+            "formatted_context": format_document_context(documents),
+            "agent_results": {"retriever": result}
+        }
+    
+    def _claims_node(self, state: DesmentAIState) -> Dict[str, Any]:
+        """Nó de extração de afirmações, executado em paralelo ao self-check."""
         try:
             query = state.get("query", "")
             documents = state.get("documents", [])
             
-            result = self.agents["self_check"].process_query(query, documents)
+            key_claims = self.agents["retriever"].extract_key_claims(query, documents)
+            return self._claims_update(key_claims)
             
-            state["evidence_quality"] = result.get("evidence_quality", "INSUFFICIENT")
-            state["has_evidence"] = result.get("has_evidence", False)
-            state["agent_results"] = state.get("agent_results", {})
-            state["agent_results"]["self_check"] = result
+        except Exception as e:
+            # Afirmações são complementares; a falha não interrompe a verificação
+            logger.error(f"Erro na extração de afirmações: {str(e)}")
+            return {"key_claims": []}
+    
+    async def _aclaims_node(self, state: DesmentAIState) -> Dict[str, Any]:
+        """Versão assíncrona do nó de extração de afirmações."""
+        try:
+            query = state.get("query", "")
+            documents = state.get("documents", [])
             
-            return state
+            key_claims = await self.agents["retriever"].aextract_key_claims(query, documents)
+            return self._claims_update(key_claims)
             
         except Exception as e:
-            logger.error(f"Erro no self-check: {str(e)}")
-            state["error"] = str(e)
-            return state
+            logger.error(f"Erro na extração de afirmações: {str(e)}")
+            return {"key_claims": []}
     
-    def _answer_node(self, state: DesmentAIState) -> DesmentAIState:
-        """Nó do answer."""
+    @staticmethod
+    def _claims_update(key_claims: List[str]) -> Dict[str, Any]:
+        """Atualização de estado a partir das afirmações extraídas."""
+        return {
+            "key_claims": key_claims,
+            "agent_results": {"claims": {"key_claims": key_claims}}
+        }
+    
+    def _self_check_node(self, state: DesmentAIState) -> Dict[str, Any]:
+        """Nó do self-check."""
         try:
             query = state.get("query", "")
             documents = state.get("documents", [])
-            evidence_quality = state.get("evidence_quality", "INSUFFICIENT")
             
-            # Obter fonte da busca do resultado do retriever
-            retriever_result = state.get("agent_results", {}).get("retriever", {})
-            search_source = retriever_result.get("search_source", "unknown")
+            result = self.agents["self_check"].process_query(
+                query, documents, formatted_context=state.get("formatted_context") or None
+            )
+            return self._self_check_update(result)
             
-            result = self.agents["answer"].process_query(query, documents, evidence_quality, search_source)
+        except Exception as e:
+            logger.error(f"Erro no self-check: {str(e)}")
+            return {"error": str(e)}
+    
+    async def _aself_check_node(self, state: DesmentAIState) -> Dict[str, Any]:
+        """Versão assíncrona do nó do self-check."""
+        try:
+            result = await self.agents["self_check"].aprocess_query(
+                state.get("query", ""), state.get("documents", []),
+                formatted_context=state.get("formatted_context") or None
+            )
+            return self._self_check_update(result)
             
-            state["answer"] = result.get("answer", "")
-            state["conclusion"] = result.get("conclusion", "INSUFICIENTE")
-            state["citations"] = result.get("citations", [])
-            state["agent_results"] = state.get("agent_results", {})
-            state["agent_results"]["answer"] = result
+        except Exception as e:
+            logger.error(f"Erro no self-check: {str(e)}")
+            return {"error": str(e)}
+    
+    @staticmethod
+    def _self_check_update(result: EvidenceResult) -> Dict[str, Any]:
+        """Atualização de estado a partir do resultado do self-check."""
+        return {
+            "evidence_quality": result.evidence_quality,
+            "has_evidence": result.has_evidence,
+            "agent_results": {"self_check": result}
+        }
+    
+    def _answer_node(self, state: DesmentAIState) -> Dict[str, Any]:
+        """Nó do answer."""
+        try:
+            result = self.agents["answer"].process_query(
+                *self._answer_args(state),
+                on_conclusion=self._emit_conclusion,
+                evidence=self._answer_evidence(state)
+            )
+            return self._answer_update(result)
             
-            return state
+        except Exception as e:
+            logger.error(f"Erro no answer: {str(e)}")
+            return {"error": str(e)}
+    
+    async def _aanswer_node(self, state: DesmentAIState) -> Dict[str, Any]:
+        """Versão assíncrona do nó do answer."""
+        try:
+            result = await self.agents["answer"].aprocess_query(
+                *self._answer_args(state),
+                on_conclusion=self._emit_conclusion,
+                evidence=self._answer_evidence(state)
+            )
+            return self._answer_update(result)
             
         except Exception as e:
             logger.error(f"Erro no answer: {str(e)}")
-            state["error"] = str(e)
-            return state
+            return {"error": str(e)}
+    
+    @staticmethod
+    def _answer_args(state: DesmentAIState) -> tuple:
+        """Argumentos do AnswerAgent extraídos do estado."""
+        # Obter fonte da busca do resultado do retriever
+        retriever_result = state.get("agent_results", {}).get("retriever", {})
+        
+        return (
+            state.get("query", ""),
+            state.get("documents", []),
+            state.get("evidence_quality", "INSUFFICIENT"),
+            retriever_result.get("search_source", "unknown")
+        )
+    
+    @staticmethod
+    def _answer_evidence(state: DesmentAIState):
+        """Evidências em colunas montadas pelo retriever, se houver."""
+        return state.get("agent_results", {}).get("retriever", {}).get("evidence")
+    
+    @staticmethod
+    def _emit_conclusion(conclusion: str) -> None:
+        """Publica a conclusão antecipada no stream "custom" do grafo."""
+        get_stream_writer()({"conclusion": conclusion})
     
-    def _safety_node(self, state: DesmentAIState) -> DesmentAIState:
+    @staticmethod
+    def _answer_update(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Atualização de estado a partir do resultado do answer."""
+        return {
+            "answer": result.get("answer", ""),
+            "conclusion": result.get("conclusion", "INSUFICIENTE"),
+            "citations": result.get("citations", []),
+            "agent_results": {"answer": result}
+        }
+    
+    def _safety_node(self, state: DesmentAIState) -> Dict[str, Any]:
         """Nó do safety."""
         try:
             query = state.get("query", "")
@@ -207,23 +393,37 @@ class DesmentAIGraph:
             conclusion = state.get("conclusion", "")
             
             result = self.agents["safety"].process_query(query, answer, conclusion)
+            return self._safety_update(result, answer)
             
-            state["final_answer"] = result.get("final_answer", answer)
-            state["agent_results"] = state.get("agent_results", {})
-            state["agent_results"]["safety"] = result
-            
-            return state
+        except Exception as e:
+            logger.error(f"Erro no safety: {str(e)}")
+            return {"error": str(e)}
+    
+    async def _asafety_node(self, state: DesmentAIState) -> Dict[str, Any]:
+        """Versão assíncrona do nó do safety."""
+        try:
+            answer = state.get("answer", "")
+            result = await self.agents["safety"].aprocess_query(
+                state.get("query", ""), answer, state.get("conclusion", "")
+            )
+            return self._safety_update(result, answer)
             
         except Exception as e:
             logger.error(f"Erro no safety: {str(e)}")
-            state["error"] = str(e)
-            return state
+            return {"error": str(e)}
+    
+    @staticmethod
+    def _safety_update(result: Dict[str, Any], answer: str) -> Dict[str, Any]:
+        """Atualização de estado a partir do resultado do safety."""
+        return {
+            "final_answer": result.get("final_answer", answer),
+            "agent_results": {"safety": result}
+        }
     
-    def _error_handler_node(self, state: DesmentAIState) -> DesmentAIState:
+    def _error_handler_node(self, state: DesmentAIState) -> Dict[str, Any]:
         """Nó de tratamento de erros."""
         error = state.get("error", "Erro desconhecido")
-        state["final_answer"] = f"❌ Erro no processamento: {error}"
-        return state
+        return {"final_answer": f"❌ Erro no processamento: {error}"}
     
     def _supervisor_router(self, state: DesmentAIState) -> str:
         """Roteador do supervisor."""
@@ -234,12 +434,12 @@ class DesmentAIGraph:
         else:
             return "end"
     
-    def _retriever_router(self, state: DesmentAIState) -> str:
+    def _retriever_router(self, state: DesmentAIState) -> Union[str, List[str]]:
         """Roteador do retriever."""
         if state.get("error"):
             return "error_handler"
         elif state.get("documents"):
-            return "self_check"
+            return ["claims", "self_check"]
         else:
             return "error_handler"
     
@@ -266,53 +466,188 @@ class DesmentAIGraph:
         else:
             return "end"
     
-    def process_query(self, query: str) -> Dict[str, Any]:
+    def _initial_state(self, query: str) -> DesmentAIState:
+        """Cria o estado inicial do grafo para uma consulta."""
+        return DesmentAIState(
+            query=query,
+            documents=[],
+            formatted_context="",
+            key_claims=[],
+            evidence_quality="",
+            has_evidence=False,
+            answer="",
+            conclusion="",
+            citations=[],
+            final_answer="",
+            agent_results={},
+            current_agent="",
+            error="",
+            timings={}
+        )
+    
+    def _summarize_timings(self, result: Dict[str, Any], started_at: Optional[float]) -> Dict[str, float]:
+        """
+        Resume as durações registradas pelos nós em fases da verificação.
+        
+        Args:
+            result: Estado final do grafo
+            started_at: Instante (perf_counter) do início do processamento
+            
+        Returns:
+            Dicionário com embed_ms, search_ms, web_ms, llm_ms e total_ms
+        """
+        node_timings = result.get("timings", {})
+        retriever_timings = result.get("agent_results", {}).get("retriever", {}).get("timings", {})
+        
+        # Tempo gasto nas chamadas ao LLM. claims e self_check rodam em
+        # paralelo, então conta apenas o mais lento dos dois
+        llm_ms = sum(
+            node_timings.get(f"{name}_ms", 0.0)
+            for name in ("supervisor", "answer", "safety")
+        ) + max(node_timings.get("claims_ms", 0.0), node_timings.get("self_check_ms", 0.0))
+        
+        if started_at is not None:
+            total_ms = (time.perf_counter() - started_at) * 1000
+        else:
+            total_ms = sum(node_timings.values())
+        
+        return {
+            "embed_ms": retriever_timings.get("embed_ms", 0.0),
+            "search_ms": retriever_timings.get("search_ms", 0.0),
+            "web_ms": retriever_timings.get("web_ms", 0.0),
+            "llm_ms": llm_ms,
+            "total_ms": total_ms
+        }
+    
+    def _build_result(self, query: str, result: Dict[str, Any], started_at: Optional[float] = None) -> VerificationResult:
+        """Converte o estado final do grafo no resultado da verificação."""
+        error = result.get("error", "")
+        return VerificationResult(
+            success=not bool(error),
+            query=query,
+            conclusion=result.get("conclusion", ""),
+            final_answer=result.get("final_answer", ""),
+            citations=result.get("citations", []),
+            agent_results=result.get("agent_results", {}),
+            timings=self._summarize_timings(result, started_at),
+            error=error
+        )
+    
+    def _build_error_result(self, query: str, error: Exception) -> VerificationResult:
+        """Monta o resultado de erro do processamento."""
+        logger.error(f"Erro no processamento da consulta: {str(error)}")
+        return VerificationResult(
+            success=False,
+            query=query,
+            conclusion="ERRO",
+            final_answer=f"❌ Erro no processamento: {str(error)}",
+            error=str(error)
+        )
+    
+    def process_query(self, query: str, on_stage: Optional[Callable[[str, float], None]] = None) -> VerificationResult:
         """
         Processa uma consulta através do grafo.
         
         Args:
             query: Consulta do usuário
+            on_stage: Callback opcional chamado ao fim de cada nó com
+                (nome do nó, segundos desde o início)
             
         Returns:
             Resultado do processamento
         """
+        if on_stage is not None:
+            result = VerificationResult()
+            for _ in self.stream_query(query, result, on_stage):
+                pass
+            return result
+        
+        started_at = time.perf_counter()
         try:
-            initial_state = DesmentAIState(
-                query=query,
-                documents=[],
-                key_claims=[],
-                evidence_quality="",
-                has_evidence=False,
-                answer="",
-                conclusion="",
-                citations=[],
-                final_answer="",
-                agent_results={},
-                current_agent="",
-                error=""
-            )
+            result = self.graph.invoke(self._initial_state(query))
+            return self._build_result(query, result, started_at)
             
-            result = self.graph.invoke(initial_state)
+        except Exception as e:
+            return self._build_error_result(query, e)
+    
+    def stream_query(self, query: str, result: VerificationResult,
+                     on_stage: Optional[Callable[[str, float], None]] = None) -> Iterator[str]:
+        """
+        Processa uma consulta emitindo os tokens da resposta conforme são gerados.
+        
+        Apenas os tokens do nó "answer" são emitidos; as chamadas de LLM dos
+        demais agentes são internas ao pipeline. Assim que a linha de
+        conclusão é gerada, result.conclusion é preenchido e on_stage é
+        chamado com a etapa "conclusion", antes do fim da resposta.
+        
+        Args:
+            query: Consulta do usuário
+            result: Objeto preenchido com o resultado completo ao fim do stream
+            on_stage: Callback opcional chamado ao fim de cada nó com
+                (nome do nó, segundos desde o início). Executa na thread que
+                consome o gerador.
             
-            return {
-                "query": query,
-                "final_answer": result.get("final_answer", ""),
-                "conclusion": result.get("conclusion", ""),
-                "citations": result.get("citations", []),
-                "agent_results": result.get("agent_results", {}),
-                "error": result.get("error", ""),
-                "success": not bool(result.get("error", ""))
-            }
+        Yields:
+            Trechos de texto da resposta
+        """
+        final_state: Dict[str, Any] = {}
+        started_at = time.perf_counter()
+        try:
+            for mode, chunk in self.graph.stream(
+                self._initial_state(query),
+                stream_mode=["messages", "updates", "values", "custom"]
+            ):
+                if mode == "values":
+                    final_state = chunk
+                    continue
+                
+                if mode == "custom":
+                    if "conclusion" in chunk:
+                        result.conclusion = chunk["conclusion"]
+                        if on_stage is not None:
+                            on_stage("conclusion", time.perf_counter() - started_at)
+                    continue
+                
+                if mode == "updates":
+                    if on_stage is not None:
+                        for node_name in chunk:
+                            on_stage(node_name, time.perf_counter() - started_at)
+                    continue
+                
+                message, metadata = chunk
+                if metadata.get("langgraph_node") != "answer":
+                    continue
+                
+                text = getattr(message, "content", "")
+                if isinstance(text, str) and text:
+                    yield text
+            
+            result.copy_from(self._build_result(query, final_state, started_at))
             
         except Exception as e:
-            logger.error(f"Erro no processamento da consulta: {str(e)}")
-            return {
-                "query": query,
-                "final_answer": f"❌ Erro no processamento: {str(e)}",
-                "conclusion": "ERRO",
-                "citations": [],
-                "agent_results": {},
-                "error": str(e),
-                "success": False
-            }
-
+            result.copy_from(self._build_error_result(query, e))
+    
+    async def aprocess_query(self, query: str) -> VerificationResult:
+        """
+        Versão assíncrona de process_query.
+        
+        Todos os nós de agente (supervisor, retriever, claims, self_check,
+        answer e safety) têm versão assíncrona e chamam o LLM por
+        ainvoke/astream; a busca local do retriever roda em threads
+        (asyncio.to_thread). Assim, verificações concorrentes sobrepõem a
+        espera pela API sem ocupar threads. Apenas o error_handler, que não
+        faz I/O, é síncrono.
+        
+        Args:
+            query: Consulta do usuário
+            
+        Returns:
+            Resultado do processamento
+        """
+        started_at = time.perf_counter()
+        try:
+            result = await self.graph.ainvoke(self._initial_state(query))
+            return self._build_result(query, result, started_at)
+            
+        except Exception as e:
+            return self._build_error_result(query, e)
@@ -0,0 +1,33 @@
+"""
+Resultado de uma verificação do DesmentAI.
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import Dict, Any, List
+
+
+@dataclass(slots=True)
+class VerificationResult:
+    """Resultado de uma verificação de notícia/afirmação."""
+    
+    success: bool = False
+    query: str = ""
+    conclusion: str = "INSUFICIENTE"
+    final_answer: str = ""
+    citations: List[Dict[str, Any]] = field(default_factory=list)
+    agent_results: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    error: str = ""
+    
+    def copy_from(self, other: "VerificationResult") -> None:
+        """
+        Copia todos os campos de outro resultado para este.
+        
+        Usado pelo stream, em que quem chama mantém a referência do objeto
+        que será preenchido ao final.
+        
+        Args:
+            other: Resultado de origem
+        """
+        for f in fields(self):
+            setattr(self, f.name, getattr(other, f.name))
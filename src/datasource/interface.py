@@ -1,3 +1,4 @@
+import asyncio
 from typing_extensions import List
 from abc import ABC, abstractmethod
 from src.entity.document import Document
@@ -7,3 +8,8 @@ class Datasource(ABC):
     @abstractmethod
     def search(self, q: str) -> List[Document]:
         pass
+
+    @classmethod
+    async def asearch(cls, q: str) -> List[Document]:
+        """Versão assíncrona de search; por padrão executa search em uma thread."""
+        return await asyncio.to_thread(cls.search, q)
@@ -2,23 +2,30 @@ from typing_extensions import List
 from src.datasource.interface import Datasource
 from src.entity.document import Document
 import os
+import asyncio
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 class WebDatasource(Datasource):
+    _shared = None
+    _shared_lock = threading.Lock()
+    
     def __init__(self):
         """Inicializa o WebDatasource com verificação de API key."""
         self.client = None
+        self.async_client = None
         self._initialize_client()
     
     def _initialize_client(self):
         """Inicializa o cliente Tavily se a API key estiver disponível."""
         try:
-            from tavily import TavilyClient
+            from tavily import TavilyClient, AsyncTavilyClient
             api_key = os.getenv('TAVILY_API_KEY')
             if api_key:
                 self.client = TavilyClient(api_key=api_key)
+                self.async_client = AsyncTavilyClient(api_key=api_key)
                 logger.info("Cliente Tavily inicializado com sucesso")
             else:
                 logger.warning("TAVILY_API_KEY não encontrada. Busca web desabilitada.")
@@ -27,11 +34,41 @@ class WebDatasource(Datasource):
         except Exception as e:
             logger.error(f"Erro ao inicializar Tavily: {str(e)}")
 
+    @classmethod
+    def instance(cls) -> "WebDatasource":
+        """Retorna a instância compartilhada, para que os clientes Tavily sejam criados uma só vez."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+    
     @classmethod
     def search(cls, q: str) -> List[Document]:
         """Busca documentos na web."""
-        instance = cls()
-        return instance._search(q)
+        return cls.instance()._search(q)
+    
+    @classmethod
+    async def asearch(cls, q: str) -> List[Document]:
+        """Busca documentos na web sem bloquear o event loop."""
+        return await cls.instance()._asearch(q)
+    
+    async def _asearch(self, q: str) -> List[Document]:
+        """Implementa a busca assíncrona na web."""
+        if not self.async_client:
+            return await asyncio.to_thread(self._search, q)
+        
+        try:
+            response = await self.async_client.search(query=q)
+            return self._to_documents(response)
+        except Exception as e:
+            logger.error(f"Erro na busca web: {str(e)}")
+            return []
+    
+    @staticmethod
+    def _to_documents(response) -> List[Document]:
+        """Converte a resposta do Tavily em documentos."""
+        results = response.get('results', [])
+        return [Document(r['url'], r['url'], r['content'], r.get('title') or "") for r in results]
     
     def _search(self, q: str) -> List[Document]:
         """Implementa a busca na web."""
@@ -41,8 +78,7 @@ class WebDatasource(Datasource):
         
         try:
             response = self.client.search(query=q)
-            results = response.get('results', [])
-            return [Document(r['url'], r['url'], r['content']) for r in results]
+            return self._to_documents(response)
         except Exception as e:
             logger.error(f"Erro na busca web: {str(e)}")
             return []
@@ -5,3 +5,4 @@ class Document:
     id: str
     source: str
     content: str
+    title: str = ""
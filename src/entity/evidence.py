@@ -0,0 +1,49 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+
+@dataclass(slots=True)
+class EvidenceColumns:
+    """Evidências em colunas paralelas (estrutura de arrays).
+    
+    Montadas uma vez, na ordem final do reranking, para que a formatação
+    do contexto percorra listas com zip em vez de consultar os
+    dicionários de cada documento."""
+    
+    contents: List[str] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)
+    urls: List[str] = field(default_factory=list)
+    scores: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float32))
+    
+    def __len__(self) -> int:
+        return len(self.contents)
+    
+    @classmethod
+    def from_documents(cls, documents: List[Dict[str, Any]]) -> "EvidenceColumns":
+        """Monta as colunas a partir da lista de documentos do retriever."""
+        metadatas = [doc["metadata"] for doc in documents]
+        return cls(
+            contents=[doc["content"] for doc in documents],
+            sources=[metadata.get("source", "Fonte desconhecida") for metadata in metadatas],
+            urls=[metadata.get("url", "") for metadata in metadatas],
+            scores=np.fromiter((doc.get("relevance_score", 0.0) for doc in documents),
+                               dtype=np.float32, count=len(documents))
+        )
+
+
+@dataclass(slots=True)
+class EvidenceResult:
+    """Resultado da avaliação de evidências do agente self-check."""
+    
+    has_evidence: bool
+    evidence_quality: str
+    reasoning: str
+    confidence: float
+    query: str = ""
+    num_documents: int = 0
+    agent: str = "SELF_CHECK"
+    
+    # Preenchidos apenas quando a decisão vem do LLM
+    source_reliability: Optional[Dict[str, Any]] = None
+    should_proceed: bool = False
@@ -5,6 +5,9 @@ Sistema de avaliação RAGAS v2 para o DesmentAI - Com dados reais do sistema.
 import os
 import json
 import time
+import functools
+import random
+import asyncio
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import pandas as pd
@@ -22,21 +25,47 @@ from ragas.metrics import (
     answer_correctness
 )
 from datasets import Dataset
+from tqdm import tqdm
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
 
-logging.basicConfig(level=logging.INFO)
+from ..core.result import VerificationResult
+from ..utils.serialization import to_json_bytes
+
 logger = logging.getLogger(__name__)
 
+# Marcadores de erro de limite de requisições da API (repetidos com backoff)
+RATE_LIMIT_MARKERS = ("429", "rate limit", "quota", "resource_exhausted", "resourceexhausted")
+
+
+@functools.lru_cache(maxsize=4)
+def _load_dataset_file(path: str, mtime: float) -> Dict[str, List]:
+    """
+    Lê um dataset de avaliação em JSON. A data de modificação faz parte da
+    chave do cache, então o arquivo só é relido quando é alterado.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
 
 class RAGASEvaluatorV2:
     """Classe para avaliação do DesmentAI usando RAGAS com dados reais."""
     
-    def __init__(self, results_dir: str = "eval/results"):
+    def __init__(self, results_dir: str = "eval/results", concurrency: Optional[int] = None,
+                 max_retries: int = 3, retry_base_delay: float = 2.0):
         """
         Inicializa o avaliador RAGAS v2.
+        
+        Args:
+            results_dir: Diretório para salvar os resultados
+            concurrency: Máximo de verificações simultâneas (padrão: EVALUATION_CONCURRENCY ou 5)
+            max_retries: Tentativas extras em caso de limite de requisições
+            retry_base_delay: Espera inicial (s) do backoff exponencial
         """
         self.results_dir = Path(results_dir)
+        self.concurrency = concurrency or int(os.getenv("EVALUATION_CONCURRENCY", "5"))
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
         self.results_dir.mkdir(parents=True, exist_ok=True)
         
         self.metrics = [
@@ -85,6 +114,26 @@ class RAGASEvaluatorV2:
         logger.warning("Nenhuma API key configurada. RAGAS usará configuração padrão.")
         return None
     
+    def load_dataset(self, path: str) -> Dataset:
+        """
+        Carrega um dataset de avaliação de um arquivo JSON.
+        
+        Args:
+            path: Caminho do arquivo, no formato {"question": [...], "ground_truth": [...]}
+            
+        Returns:
+            Dataset de teste
+        """
+        path = str(Path(path).resolve())
+        data = _load_dataset_file(path, os.path.getmtime(path))
+        
+        missing = [key for key in ("question", "ground_truth") if key not in data]
+        if missing:
+            raise ValueError(f"Dataset {path} sem os campos: {', '.join(missing)}")
+        
+        logger.info(f"Dataset carregado de {path}: {len(data['question'])} perguntas")
+        return Dataset.from_dict(data)
+    
     def create_test_dataset(self) -> Dataset:
         """
         Cria dataset de teste para avaliação com ground truth manual.
@@ -134,36 +183,31 @@ class RAGASEvaluatorV2:
         """
         Avalia o DesmentAI usando RAGAS com dados reais do sistema.
         """
+        return asyncio.run(self.aevaluate_desmentai(desmentai, test_dataset))
+    
+    async def aevaluate_desmentai(self, desmentai, test_dataset: Optional[Dataset] = None) -> Dict[str, Any]:
+        """
+        Avalia o DesmentAI usando RAGAS, executando as verificações de forma concorrente.
+        
+        Args:
+            desmentai: Instância inicializada do DesmentAI
+            test_dataset: Dataset de teste (padrão: create_test_dataset)
+            
+        Returns:
+            Resultados da avaliação
+        """
         try:
             logger.info("Iniciando avaliação do DesmentAI com dados reais...")
             
             if test_dataset is None:
                 test_dataset = self.create_test_dataset()
             
-            evaluation_data = self._generate_real_evaluation_data(desmentai, test_dataset)
+            evaluation_data = await self._agenerate_real_evaluation_data(desmentai, test_dataset)
             
             logger.info("Executando avaliação RAGAS com dados reais...")
             
-            # Usar configuração padrão do RAGAS
-            result = evaluate(
-                Dataset.from_dict(evaluation_data),
-                metrics=self.metrics
-            )
-            
-            results = self._process_evaluation_results(result)
-            
-            # Adicionar informações sobre o dataset real
-            results["dataset_info"] = {
-                "total_questions": len(evaluation_data["question"]),
-                "questions_with_answers": len([a for a in evaluation_data["answer"] if a and not a.startswith("Erro:")]),
-                "questions_with_contexts": len([c for c in evaluation_data["contexts"] if c and c != [""]]),
-                "evaluation_type": "real_system_data"
-            }
-            
-            self._save_results(results)
-            
-            logger.info("Avaliação concluída com sucesso!")
-            return results
+            # O RAGAS gerencia seu próprio event loop, então roda fora deste
+            return await asyncio.to_thread(self._score_evaluation_data, evaluation_data)
             
         except Exception as e:
             logger.error(f"Erro na avaliação: {str(e)}")
@@ -172,56 +216,118 @@ class RAGASEvaluatorV2:
                 "success": False
             }
     
+    def _score_evaluation_data(self, evaluation_data: Dict[str, List]) -> Dict[str, Any]:
+        """
+        Calcula as métricas RAGAS sobre as respostas geradas e salva os resultados.
+        """
+        # Usar configuração padrão do RAGAS
+        result = evaluate(
+            Dataset.from_dict(evaluation_data),
+            metrics=self.metrics
+        )
+        
+        results = self._process_evaluation_results(result)
+        
+        # Adicionar informações sobre o dataset real
+        results["dataset_info"] = {
+            "total_questions": len(evaluation_data["question"]),
+            "questions_with_answers": len([a for a in evaluation_data["answer"] if a and not a.startswith("Erro:")]),
+            "questions_with_contexts": len([c for c in evaluation_data["contexts"] if c and c != [""]]),
+            "evaluation_type": "real_system_data"
+        }
+        
+        self._save_results(results)
+        
+        logger.info("Avaliação concluída com sucesso!")
+        return results
+    
+    @staticmethod
+    def _is_rate_limit_error(error: str) -> bool:
+        """Indica se a mensagem de erro corresponde a limite de requisições da API."""
+        error = error.lower()
+        return any(marker in error for marker in RATE_LIMIT_MARKERS)
+    
+    async def _averify_with_retry(self, desmentai, question: str) -> VerificationResult:
+        """
+        Verifica uma pergunta, repetindo com backoff exponencial em caso de limite de requisições.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = await desmentai.averify_news(question)
+                error = "" if result.success else result.error
+            except Exception as e:
+                result, error = None, str(e)
+            
+            if not error or not self._is_rate_limit_error(error) or attempt == self.max_retries:
+                if result is None:
+                    raise RuntimeError(error)
+                return result
+            
+            delay = self.retry_base_delay * (2 ** attempt) + random.uniform(0, 1)
+            logger.warning(f"Limite de requisições atingido; nova tentativa em {delay:.1f}s")
+            await asyncio.sleep(delay)
+    
+    @staticmethod
+    def _extract_answer_and_contexts(result: VerificationResult) -> tuple:
+        """
+        Extrai a resposta e os contextos recuperados de um resultado do DesmentAI.
+        
+        Returns:
+            Tupla (resposta, lista de contextos)
+        """
+        if not result.success:
+            return f"Erro: {result.error or 'Erro desconhecido'}", [""]
+        
+        answer = result.final_answer
+        
+        retriever_result = result.agent_results.get("retriever", {})
+        documents = retriever_result.get("documents", [])
+        
+        doc_contexts = []
+        for doc in documents[:5]:
+            content = doc.get("content", "")
+            if content:
+                truncated_content = content[:500] + "..." if len(content) > 500 else content
+                doc_contexts.append(truncated_content)
+        
+        return answer, doc_contexts if doc_contexts else [""]
+    
     def _generate_real_evaluation_data(self, desmentai, test_dataset: Dataset) -> Dict[str, List]:
+        return asyncio.run(self._agenerate_real_evaluation_data(desmentai, test_dataset))
+    
+    async def _agenerate_real_evaluation_data(self, desmentai, test_dataset: Dataset) -> Dict[str, List]:
+        """
+        Gera respostas e contextos para todas as perguntas, com no máximo
+        `self.concurrency` verificações em andamento ao mesmo tempo.
+        """
         questions = test_dataset["question"]
         ground_truths = test_dataset["ground_truth"]
-        sources = test_dataset["source"] if "source" in test_dataset.column_names else []
         
-        answers = []
-        contexts = []
+        answers: List[str] = [""] * len(questions)
+        contexts: List[List[str]] = [[""] for _ in questions]
+        
+        logger.info(f"Processando {len(questions)} perguntas com o sistema real (concorrência: {self.concurrency})...")
         
-        logger.info(f"Processando {len(questions)} perguntas com o sistema real...")
+        semaphore = asyncio.Semaphore(self.concurrency)
         
-        for i, question in enumerate(questions):
-            logger.info(f"Processando pergunta {i+1}/{len(questions)}: {question[:50]}...")
+        async def run_one(i: int, question: str):
+            async with semaphore:
+                try:
+                    return i, await self._averify_with_retry(desmentai, question)
+                except Exception as e:
+                    return i, VerificationResult(success=False, query=question, error=str(e))
+        
+        tasks = [run_one(i, question) for i, question in enumerate(questions)]
+        
+        for future in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Verificando perguntas"):
+            i, result = await future
+            answers[i], contexts[i] = self._extract_answer_and_contexts(result)
             
-            try:
-                result = desmentai.verify_news(question)
-                
-                if result.get("success", False):
-                    answer = result.get("final_answer", "")
-                    answers.append(answer)
-                    
-                    agent_results = result.get("agent_results", {})
-                    retriever_result = agent_results.get("retriever", {})
-                    documents = retriever_result.get("documents", [])
-                    
-                    doc_contexts = []
-                    for doc in documents[:5]:
-                        content = doc.get("content", "")
-                        if content:
-                            truncated_content = content[:500] + "..." if len(content) > 500 else content
-                            doc_contexts.append(truncated_content)
-                    
-                    contexts.append(doc_contexts if doc_contexts else [""])
-                    
-                    logger.info(f"✅ Pergunta {i+1} processada com sucesso")
-                    logger.info(f"   - Documentos encontrados: {len(documents)}")
-                    logger.info(f"   - Contextos extraídos: {len(doc_contexts)}")
-                    
-                else:
-                    error_msg = result.get("error", "Erro desconhecido")
-                    answers.append(f"Erro: {error_msg}")
-                    contexts.append([""])
-                    logger.warning(f"❌ Falha na pergunta {i+1}: {error_msg}")
-                
-                # Pausa para evitar rate limiting
-                time.sleep(1.0)
-                
-            except Exception as e:
-                logger.error(f"Erro ao processar pergunta {i+1}: {str(e)}")
-                answers.append(f"Erro: {str(e)}")
-                contexts.append([""])
+            if result.success:
+                logger.info(f"✅ Pergunta {i+1} processada com sucesso")
+                logger.info(f"   - Contextos extraídos: {len([c for c in contexts[i] if c])}")
+            else:
+                logger.warning(f"❌ Falha na pergunta {i+1}: {result.error or 'Erro desconhecido'}")
         
         return {
             "question": questions,
@@ -285,12 +391,10 @@ class RAGASEvaluatorV2:
             timestamp = int(time.time())
             
             summary_file = self.results_dir / f"evaluation_summary_v2_{timestamp}.json"
-            with open(summary_file, 'w', encoding='utf-8') as f:
-                json.dump(results["summary"], f, indent=2, ensure_ascii=False)
+            summary_file.write_bytes(to_json_bytes(results["summary"], indent=True))
             
             detailed_file = self.results_dir / f"evaluation_detailed_v2_{timestamp}.json"
-            with open(detailed_file, 'w', encoding='utf-8') as f:
-                json.dump(results["detailed_results"], f, indent=2, ensure_ascii=False)
+            detailed_file.write_bytes(to_json_bytes(results["detailed_results"], indent=True))
             
             report_file = self.results_dir / f"evaluation_report_v2_{timestamp}.md"
             self._generate_markdown_report(results, report_file)
@@ -356,33 +460,37 @@ class RAGASEvaluatorV2:
         except Exception as e:
             logger.error(f"Erro ao gerar relatório: {str(e)}")
     
+    def create_quick_dataset(self) -> Dataset:
+        """
+        Cria dataset reduzido para avaliação rápida.
+        """
+        quick_data = {
+            "question": [
+                "O Brasil é o maior produtor de café do mundo?",
+                "As vacinas contra COVID-19 causam autismo?",
+                "A Terra é plana?"
+            ],
+            "ground_truth": [
+                "VERDADEIRO: O Brasil é o maior produtor de café do mundo, responsável por cerca de 1/3 da produção global (FAO, 2023).",
+                "FALSO: Não há evidências científicas que comprovem que vacinas contra COVID-19 causam autismo (CDC, OMS, 2023).",
+                "FALSO: A Terra é esférica, não plana. Evidências científicas incontestáveis comprovam isso (NASA, 2023)."
+            ],
+            "source": [
+                "FAO (Organização das Nações Unidas para Alimentação e Agricultura)",
+                "CDC (Centers for Disease Control and Prevention) e OMS",
+                "NASA (National Aeronautics and Space Administration)"
+            ]
+        }
+        
+        return Dataset.from_dict(quick_data)
+    
     def run_quick_evaluation(self, desmentai) -> Dict[str, Any]:
         """
         Executa avaliação rápida com poucas perguntas.
         """
         try:
             logger.info("Executando avaliação rápida...")
-            
-            quick_data = {
-                "question": [
-                    "O Brasil é o maior produtor de café do mundo?",
-                    "As vacinas contra COVID-19 causam autismo?",
-                    "A Terra é plana?"
-                ],
-                "ground_truth": [
-                    "VERDADEIRO: O Brasil é o maior produtor de café do mundo, responsável por cerca de 1/3 da produção global (FAO, 2023).",
-                    "FALSO: Não há evidências científicas que comprovem que vacinas contra COVID-19 causam autismo (CDC, OMS, 2023).",
-                    "FALSO: A Terra é esférica, não plana. Evidências científicas incontestáveis comprovam isso (NASA, 2023)."
-                ],
-                "source": [
-                    "FAO (Organização das Nações Unidas para Alimentação e Agricultura)",
-                    "CDC (Centers for Disease Control and Prevention) e OMS",
-                    "NASA (National Aeronautics and Space Administration)"
-                ]
-            }
-            
-            test_dataset = Dataset.from_dict(quick_data)
-            return self.evaluate_desmentai(desmentai, test_dataset)
+            return self.evaluate_desmentai(desmentai, self.create_quick_dataset())
             
         except Exception as e:
             logger.error(f"Erro na avaliação rápida: {str(e)}")
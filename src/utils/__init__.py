@@ -1,10 +1,33 @@
 """
 Módulo de utilitários para o DesmentAI.
+
+Os submódulos são importados sob demanda: carregar o LLMLoader não deve
+pagar o custo de importar FAISS, PyPDF e os loaders do LangChain.
 """
 
-from .llm_loader import LLMLoader
-from .document_processor import DocumentProcessor
-from .embeddings import EmbeddingManager
+import importlib
+
+_EXPORTS = {
+    "LLMLoader": ".llm_loader",
+    "DocumentProcessor": ".document_processor",
+    "EmbeddingManager": ".embeddings",
+    "SemanticCache": ".semantic_cache",
+    "LLMResponseCache": ".llm_cache",
+    "keyword_ids": ".keywords",
+    "keyword_overlap": ".keywords",
+    "format_document_context": ".context",
+    "extract_text": ".llm_response",
+    "MicroBatcher": ".batching",
+    "to_json": ".serialization",
+    "to_json_bytes": ".serialization",
+}
+
+__all__ = list(_EXPORTS)
 
-__all__ = ["LLMLoader", "DocumentProcessor", "EmbeddingManager"]
 
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,156 @@
+"""
+Agrupamento dinâmico de chamadas (micro-batching).
+"""
+
+import time
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+import logging
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Marca, na fila, o encerramento da thread de coleta
+_STOP = object()
+
+
+class MicroBatcher:
+    """Agrupa chamadas concorrentes em lotes processados de uma só vez.
+    
+    Cada chamada entra em uma fila; uma thread de fundo aguarda até
+    `max_wait_ms` (ou até `max_batch_size` itens) e entrega o lote a um pool
+    de threads, devolvendo a cada chamador o seu resultado. A coleta do
+    próximo lote não espera o processamento dos lotes em andamento."""
+    
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0,
+        max_workers: int = 4,
+        name: str = "micro-batcher"
+    ):
+        """
+        Inicializa o agrupador.
+        
+        Args:
+            process_batch: Função que recebe a lista de itens e retorna os
+                resultados na mesma ordem. Um resultado que seja uma exceção
+                é repassado apenas ao chamador correspondente
+            max_batch_size: Tamanho máximo de cada lote
+            max_wait_ms: Tempo máximo de espera por novos itens após o primeiro
+            max_workers: Lotes processados ao mesmo tempo
+            name: Nome das threads de fundo
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self.name = name
+        
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix=name)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._closed = False
+    
+    def submit(self, item: Any) -> Future:
+        """
+        Enfileira um item para o próximo lote.
+        
+        Args:
+            item: Item a processar
+        
+        Returns:
+            Future com o resultado do item
+        
+        Raises:
+            RuntimeError: Se o agrupador já foi encerrado
+        """
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+    
+    def __call__(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Processa um item e aguarda o seu resultado."""
+        return self.submit(item).result(timeout)
+    
+    def _ensure_worker(self) -> None:
+        """Inicia a thread de fundo na primeira chamada."""
+        with self._worker_lock:
+            if self._closed:
+                raise RuntimeError(f"Agrupador encerrado ({self.name})")
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+    
+    def close(self) -> None:
+        """
+        Encerra a thread de coleta e o pool de threads.
+        
+        Os itens já enfileirados ainda são processados; novos itens são recusados.
+        """
+        with self._worker_lock:
+            if self._closed:
+                return
+            self._closed = True
+            running = self._worker is not None and self._worker.is_alive()
+        
+        if running:
+            self._queue.put(_STOP)
+        else:
+            self._executor.shutdown(wait=False)
+    
+    def _run(self) -> None:
+        """Coleta itens da fila em lotes e os processa."""
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+            
+            self._executor.submit(self._dispatch, batch)
+        
+        self._executor.shutdown(wait=False)
+    
+    def _dispatch(self, batch: List[tuple]) -> None:
+        """Processa um lote e distribui os resultados."""
+        items = [item for item, _ in batch]
+        
+        try:
+            results = self.process_batch(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"Lote retornou {len(results)} resultados para {len(items)} itens")
+        except Exception as e:
+            logger.error(f"Erro no processamento do lote ({self.name}): {str(e)}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        
+        if len(items) > 1:
+            logger.debug("Lote de %d itens processado (%s)", len(items), self.name)
+        
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
@@ -0,0 +1,109 @@
+"""
+Formatação dos documentos recuperados para os prompts dos agentes.
+"""
+
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+import logging
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken é instalado com as dependências
+    tiktoken = None
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Orçamentos de tokens do contexto: por documento e no total
+DOC_MAX_TOKENS = int(os.getenv("CONTEXT_DOC_MAX_TOKENS", "150"))
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "2000"))
+
+# Caracteres por token usados quando o tokenizador não está disponível
+_CHARS_PER_TOKEN = 4
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """
+    Carrega o tokenizador na primeira chamada.
+    
+    O Gemini não expõe um tokenizador local; o o200k_base (tiktoken) é uma
+    aproximação suficiente para limitar o tamanho do prompt.
+    
+    Returns:
+        Encoding do tiktoken ou False se indisponível
+    """
+    global _encoding
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                _encoding = tiktoken.get_encoding("o200k_base") if tiktoken is not None else False
+            except Exception as e:
+                # O arquivo do vocabulário é baixado no primeiro uso
+                logger.warning(f"Tokenizador indisponível, truncando por caracteres: {str(e)}")
+                _encoding = False
+        return _encoding
+
+
+@lru_cache(maxsize=4096)
+def _truncate_tokens(text: str, max_tokens: int) -> Tuple[str, int]:
+    """
+    Trunca um texto a um número máximo de tokens.
+    
+    Args:
+        text: Texto
+        max_tokens: Número máximo de tokens
+    
+    Returns:
+        Tupla (texto truncado, número de tokens)
+    """
+    encoding = _get_encoding()
+    if not encoding:
+        truncated = text[:max_tokens * _CHARS_PER_TOKEN]
+        return truncated, -(-len(truncated) // _CHARS_PER_TOKEN)
+    
+    tokens = encoding.encode(text)[:max_tokens]
+    # Tokens que terminam no meio de um caractere multibyte são descartados
+    return encoding.decode(tokens, errors="ignore"), len(tokens)
+
+
+def format_document_context(documents: List[Dict[str, Any]],
+                            doc_max_tokens: int = DOC_MAX_TOKENS,
+                            max_tokens: int = CONTEXT_MAX_TOKENS) -> str:
+    """
+    Formata os documentos no contexto usado pela avaliação de evidências.
+    
+    Calculado uma vez por consulta (após o retriever) e reaproveitado pelo
+    grafo. O conteúdo de cada documento é truncado por tokens e os
+    documentos que excedem o orçamento total são omitidos.
+    
+    Args:
+        documents: Lista de documentos do retriever
+        doc_max_tokens: Tokens de conteúdo por documento
+        max_tokens: Tokens de conteúdo somados de todos os documentos
+    
+    Returns:
+        String com contexto formatado
+    """
+    parts = []
+    remaining = max_tokens
+    
+    for i, doc in enumerate(documents, 1):
+        if remaining <= 0:
+            break
+        
+        content, used = _truncate_tokens(doc.get("content", ""), min(doc_max_tokens, remaining))
+        remaining -= used
+        
+        parts.append(
+            f"Documento {i}:\n"
+            f"Fonte: {doc.get('source', 'Fonte desconhecida')}\n"
+            + (f"URL: {doc['url']}\n" if doc.get("url") else "")
+            + f"Conteúdo: {content}...\n"
+        )
+    
+    return "\n".join(parts)
@@ -3,18 +3,49 @@ Sistema de ingestão de dados para o DesmentAI.
 """
 
 import os
+import hashlib
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 from bs4 import BeautifulSoup
 import logging
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+# Configurar logging (o nível e os handlers são definidos pela aplicação)
 logger = logging.getLogger(__name__)
 
 
+# Fontes confiáveis conhecidas, compartilhadas por todas as instâncias
+TRUSTED_SOURCES = {
+    "agencia_lupa": {
+        "name": "Agência Lupa",
+        "base_url": "https://piaui.folha.uol.com.br/lupa/",
+        "type": "fact_checking"
+    },
+    "aos_fatos": {
+        "name": "Aos Fatos",
+        "base_url": "https://www.aosfatos.org/",
+        "type": "fact_checking"
+    },
+    "boatos_org": {
+        "name": "Boatos.org",
+        "base_url": "https://www.boatos.org/",
+        "type": "fact_checking"
+    },
+    "g1": {
+        "name": "G1",
+        "base_url": "https://g1.globo.com/",
+        "type": "news"
+    },
+    "folha": {
+        "name": "Folha de S.Paulo",
+        "base_url": "https://www1.folha.uol.com.br/",
+        "type": "news"
+    }
+}
+
+
 class DataIngestion:
     """Classe para ingestão de dados de fontes confiáveis."""
     
@@ -28,34 +59,7 @@ class DataIngestion:
         self.data_path = Path(data_path)
         self.data_path.mkdir(parents=True, exist_ok=True)
         
-        # Fontes confiáveis conhecidas
-        self.trusted_sources = {
-            "agencia_lupa": {
-                "name": "Agência Lupa",
-                "base_url": "https://piaui.folha.uol.com.br/lupa/",
-                "type": "fact_checking"
-            },
-            "aos_fatos": {
-                "name": "Aos Fatos",
-                "base_url": "https://www.aosfatos.org/",
-                "type": "fact_checking"
-            },
-            "boatos_org": {
-                "name": "Boatos.org",
-                "base_url": "https://www.boatos.org/",
-                "type": "fact_checking"
-            },
-            "g1": {
-                "name": "G1",
-                "base_url": "https://g1.globo.com/",
-                "type": "news"
-            },
-            "folha": {
-                "name": "Folha de S.Paulo",
-                "base_url": "https://www1.folha.uol.com.br/",
-                "type": "news"
-            }
-        }
+        self.trusted_sources = TRUSTED_SOURCES
     
     def download_sample_data(self) -> bool:
         """
@@ -71,11 +75,7 @@ class DataIngestion:
             sample_data = self._create_sample_data()
             
             # Salvar dados
-            for source, data in sample_data.items():
-                file_path = self.data_path / f"{source}.txt"
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(data)
-                logger.info(f"Dados de exemplo salvos: {file_path}")
+            self._write_files({f"{source}.txt": data for source, data in sample_data.items()})
             
             return True
             
@@ -187,8 +187,9 @@ Data: 2024
             # Limpar texto
             text = self._clean_text(text)
             
-            # Salvar arquivo
-            file_path = self.data_path / f"{source_name}_{int(time.time())}.txt"
+            # Salvar arquivo (o hash da URL evita colisões entre ingestões simultâneas)
+            url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
+            file_path = self.data_path / f"{source_name}_{int(time.time())}_{url_hash}.txt"
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(f"URL: {url}\n")
                 f.write(f"Data: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
@@ -202,6 +203,31 @@ Data: 2024
             logger.error(f"Erro ao ingerir dados de {url}: {str(e)}")
             return False
     
+    def ingest_from_urls(self, urls: List[str], source_name: str = "web",
+                         max_workers: int = 16) -> Dict[str, bool]:
+        """
+        Ingesta dados de várias URLs em paralelo.
+        
+        O download domina o tempo de cada ingestão, então as requisições
+        são sobrepostas em um pool de threads.
+        
+        Args:
+            urls: URLs para baixar
+            source_name: Nome da fonte
+            max_workers: Número máximo de downloads simultâneos
+            
+        Returns:
+            Dicionário URL -> sucesso da ingestão
+        """
+        if not urls:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+            results = list(executor.map(lambda url: self.ingest_from_url(url, source_name), urls))
+        
+        logger.info(f"Ingeridas {sum(results)}/{len(urls)} URLs")
+        return dict(zip(urls, results))
+    
     def ingest_from_file(self, file_path: str, source_name: str = "file") -> bool:
         """
         Ingesta dados de um arquivo local.
@@ -333,15 +359,28 @@ Data: 2024
             }
             
             # Salvar arquivos HTML
-            for filename, content in html_samples.items():
-                file_path = self.data_path / filename
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                logger.info(f"Arquivo HTML criado: {file_path}")
+            self._write_files(html_samples)
             
             return True
             
         except Exception as e:
             logger.error(f"Erro ao criar arquivos HTML: {str(e)}")
             return False
+    
+    def _write_files(self, files: Dict[str, str]) -> None:
+        """
+        Grava arquivos na pasta de dados em paralelo.
+        
+        Args:
+            files: Dicionário nome do arquivo -> conteúdo
+        """
+        def write(item):
+            filename, content = item
+            file_path = self.data_path / filename
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            logger.info(f"Arquivo salvo: {file_path}")
+        
+        with ThreadPoolExecutor(max_workers=min(16, len(files) or 1)) as executor:
+            list(executor.map(write, files.items()))
 
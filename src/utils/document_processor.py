@@ -4,6 +4,8 @@ Módulo para processamento de documentos e criação de chunks.
 
 import os
 import hashlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import requests
@@ -12,26 +14,47 @@ import pypdf
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 from langchain_community.document_loaders import PyPDFLoader, WebBaseLoader
+from .keywords import TOKEN_HASHES_KEY, keyword_ids
 import logging
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+# Configurar logging (o nível e os handlers são definidos pela aplicação)
 logger = logging.getLogger(__name__)
 
 
+# Estratégias de processamento de diretórios
+PARALLEL_STRATEGIES = ("sequential", "threads", "processes")
+
+
+def _load_file(processor: "DocumentProcessor", file_path: str) -> List[Document]:
+    """Carrega um arquivo (função de módulo para poder ser usada por processos)."""
+    if file_path.lower().endswith('.pdf'):
+        return processor.load_pdf(file_path)
+    return processor.load_html_file(file_path)
+
+
 class DocumentProcessor:
     """Classe para processamento e chunking de documentos."""
     
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200,
+                 parallel_strategy: Optional[str] = None, max_workers: Optional[int] = None):
         """
         Inicializa o processador de documentos.
         
         Args:
             chunk_size: Tamanho dos chunks em caracteres
             chunk_overlap: Sobreposição entre chunks
+            parallel_strategy: Como carregar os arquivos de um diretório
+                ("sequential", "threads" ou "processes").
+                Padrão: variável INGESTION_STRATEGY ou "threads"
+            max_workers: Número máximo de workers (padrão: definido pelo executor)
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.parallel_strategy = parallel_strategy or os.getenv("INGESTION_STRATEGY", "threads")
+        if self.parallel_strategy not in PARALLEL_STRATEGIES:
+            logger.warning(f"Estratégia de ingestão desconhecida: {self.parallel_strategy}; usando sequential")
+            self.parallel_strategy = "sequential"
+        self.max_workers = max_workers
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
@@ -114,15 +137,19 @@ class DocumentProcessor:
             soup = BeautifulSoup(content, 'html.parser')
             text = soup.get_text()
             
+            # Título da página (ou o primeiro cabeçalho), reaproveitado como afirmação principal
+            heading = soup.find('h1') or soup.title
+            
+            metadata = {
+                "source": file_path,
+                "type": "html",
+                "file_hash": self._get_file_hash(file_path)
+            }
+            if heading is not None and heading.get_text(strip=True):
+                metadata["title"] = heading.get_text(strip=True)
+            
             # Criar documento
-            doc = Document(
-                page_content=text,
-                metadata={
-                    "source": file_path,
-                    "type": "html",
-                    "file_hash": self._get_file_hash(file_path)
-                }
-            )
+            doc = Document(page_content=text, metadata=metadata)
             
             logger.info(f"Carregado arquivo HTML: {file_path}")
             return [doc]
@@ -144,11 +171,14 @@ class DocumentProcessor:
         try:
             chunks = self.text_splitter.split_documents(documents)
             
-            # Adicionar metadados de chunk
-            for i, chunk in enumerate(chunks):
+            # Adicionar metadados de chunk, incluindo os ids de palavras usados
+            # no reranking (calculados aqui uma vez, não a cada consulta)
+            token_hashes = keyword_ids([chunk.page_content for chunk in chunks]) if chunks else []
+            for i, (chunk, hashes) in enumerate(zip(chunks, token_hashes)):
                 chunk.metadata.update({
                     "chunk_id": i,
-                    "chunk_size": len(chunk.page_content)
+                    "chunk_size": len(chunk.page_content),
+                    TOKEN_HASHES_KEY: hashes
                 })
             
             logger.info(f"Criados {len(chunks)} chunks de {len(documents)} documentos")
@@ -179,20 +209,36 @@ class DocumentProcessor:
             logger.warning(f"Diretório não encontrado: {directory_path}")
             return all_documents
         
-        for file_path in directory.rglob("*"):
-            if file_path.suffix.lower() in file_extensions:
-                if file_path.suffix.lower() == '.pdf':
-                    documents = self.load_pdf(str(file_path))
-                elif file_path.suffix.lower() == '.html':
-                    documents = self.load_html_file(str(file_path))
-                else:
-                    continue
-                
-                all_documents.extend(documents)
+        file_paths = [
+            str(file_path) for file_path in directory.rglob("*")
+            if file_path.suffix.lower() in file_extensions and file_path.suffix.lower() in ('.pdf', '.html')
+        ]
+        
+        for documents in self._load_files(file_paths):
+            all_documents.extend(documents)
         
         logger.info(f"Processados {len(all_documents)} documentos do diretório: {directory_path}")
         return all_documents
     
+    def _load_files(self, file_paths: List[str]) -> List[List[Document]]:
+        """
+        Carrega arquivos segundo a estratégia configurada, preservando a ordem.
+        
+        Args:
+            file_paths: Caminhos dos arquivos
+            
+        Returns:
+            Lista com os documentos de cada arquivo
+        """
+        load = partial(_load_file, self)
+        
+        if self.parallel_strategy == "sequential" or len(file_paths) < 2:
+            return [load(path) for path in file_paths]
+        
+        executor_class = ProcessPoolExecutor if self.parallel_strategy == "processes" else ThreadPoolExecutor
+        with executor_class(max_workers=self.max_workers) as executor:
+            return list(executor.map(load, file_paths))
+    
     def deduplicate_documents(self, documents: List[Document]) -> List[Document]:
         """
         Remove documentos duplicados baseado no hash do conteúdo.
@@ -3,33 +3,110 @@ Módulo para gerenciamento de embeddings e vector stores.
 """
 
 import os
+import re
+import uuid
+import atexit
+import hashlib
 import pickle
+import threading
 from typing import List, Dict, Any, Optional
 import numpy as np
-from sentence_transformers import SentenceTransformer
+import faiss
+from cachetools import LRUCache
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain.schema import Document
 import logging
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+# Configurar logging (o nível e os handlers são definidos pela aplicação)
 logger = logging.getLogger(__name__)
 
+# Pontos de treino por centróide recomendados pelo FAISS para k-means
+MIN_POINTS_PER_CENTROID = 39
+
+# Atalhos para especificações do faiss.index_factory. IVFPQ guarda cada vetor
+# em 16 bytes (16 subquantizadores de 8 bits) em vez de dim * 4; abaixo de
+# ~10 mil vetores não há pontos para treinar os 256 centróides de cada
+# subquantizador, e _fit_index_factory troca o PQ por Flat (IVFFlat)
+INDEX_FACTORY_PRESETS = {
+    "IVFPQ": "IVF256,PQ16x8",
+}
+
 
 class EmbeddingManager:
     """Classe para gerenciar embeddings e vector stores."""
     
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+                 index_factory: Optional[str] = None, nprobe: Optional[int] = None,
+                 device: Optional[str] = None, ef_search: Optional[int] = None,
+                 precision: Optional[str] = None, mmap: Optional[bool] = None,
+                 backend: Optional[str] = None, batch_size: Optional[int] = None,
+                 use_gpu: Optional[bool] = None):
         """
         Inicializa o gerenciador de embeddings.
         
         Args:
             model_name: Nome do modelo de embeddings
+            index_factory: Especificação do índice FAISS (ex.: "HNSW32", "IVF4096,SQ8")
+                ou atalho de INDEX_FACTORY_PRESETS ("IVFPQ").
+                Padrão: variável FAISS_INDEX_FACTORY
+            nprobe: Número de listas IVF visitadas por busca.
+                Padrão: variável FAISS_NPROBE
+            device: Dispositivo do modelo de embeddings ("cpu", "cuda", "mps").
+                Padrão: variável EMBEDDING_DEVICE
+            ef_search: Tamanho da lista de candidatos em buscas HNSW.
+                Padrão: variável FAISS_EF_SEARCH
+            precision: Precisão do modelo de embeddings ("fp32", "fp16" ou "int8").
+                Padrão: variável EMBEDDING_PRECISION
+            mmap: Mapear o índice salvo em memória (somente leitura) em vez de
+                lê-lo por inteiro. Padrão: variável FAISS_MMAP
+            backend: Runtime do modelo de embeddings ("torch", "onnx" ou
+                "openvino"). Padrão: variável EMBEDDING_BACKEND
+            batch_size: Textos por lote na codificação de documentos.
+                Padrão: variável EMBEDDING_BATCH_SIZE
+            use_gpu: Copiar o índice FAISS para a GPU quando houver CUDA (requer
+                faiss-gpu). Padrão: variável FAISS_USE_GPU
         """
         self.model_name = model_name
+        self.index_factory = index_factory or os.getenv("FAISS_INDEX_FACTORY", "HNSW32")
+        self.index_factory = INDEX_FACTORY_PRESETS.get(self.index_factory.upper(), self.index_factory)
+        self.nprobe = nprobe or int(os.getenv("FAISS_NPROBE", "32"))
+        self.ef_search = ef_search or int(os.getenv("FAISS_EF_SEARCH", "64"))
+        self.ef_construction = int(os.getenv("FAISS_EF_CONSTRUCTION", "200"))
+        self.device = device or os.getenv("EMBEDDING_DEVICE", "cpu")
+        self.precision = (precision or os.getenv("EMBEDDING_PRECISION", "fp32")).lower()
+        self.backend = (backend or os.getenv("EMBEDDING_BACKEND", "torch")).lower()
+        self.batch_size = batch_size or int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+        self.mmap = mmap if mmap is not None else os.getenv("FAISS_MMAP", "false").lower() == "true"
+        self.use_gpu = use_gpu if use_gpu is not None else os.getenv("FAISS_USE_GPU", "false").lower() == "true"
+        self.on_gpu = False
+        self._gpu_resources = None
+        self.read_only = False
+        
+        # Arquivos do índice levam o hash do modelo: vetores de outro modelo
+        # (ou precisão) no mesmo diretório não são carregados por engano
+        model_hash = hashlib.sha256(f"{self.model_name}|{self.precision}".encode("utf-8")).hexdigest()[:12]
+        self.index_name = f"index_{model_hash}"
+        
+        # Persistência adiada das inclusões (ex.: documentos salvos da web)
+        self.persist_directory: Optional[str] = None
+        self.persist_delay = float(os.getenv("FAISS_PERSIST_DELAY", "30"))
+        self._dirty = False
+        self._flush_at_exit = False
+        self._persist_timer: Optional[threading.Timer] = None
+        self._persist_lock = threading.Lock()
+        
         self.embedding_model = None
         self.vector_store = None
+        
+        # O FAISS não permite inclusões concorrentes com buscas: buscas,
+        # inclusões, ajustes de parâmetros e gravação usam este lock
+        self.index_lock = threading.RLock()
+        
+        self._query_embeddings = LRUCache(maxsize=1024)
+        self._query_embeddings_lock = threading.Lock()
         self._load_embedding_model()
     
     def _load_embedding_model(self):
@@ -37,14 +114,50 @@ class EmbeddingManager:
         try:
             self.embedding_model = HuggingFaceEmbeddings(
                 model_name=self.model_name,
-                model_kwargs={'device': 'cpu'},  # Usar CPU para compatibilidade
-                encode_kwargs={'normalize_embeddings': True}
+                model_kwargs={'device': self.device, 'backend': self.backend},
+                encode_kwargs={
+                    'normalize_embeddings': True,
+                    'batch_size': self.batch_size,
+                    'convert_to_numpy': True
+                }
             )
-            logger.info(f"Modelo de embeddings carregado: {self.model_name}")
+            self._apply_precision()
+            logger.info(f"Modelo de embeddings carregado: {self.model_name} ({self.device}, {self.backend}, {self.precision})")
         except Exception as e:
             logger.error(f"Erro ao carregar modelo de embeddings: {str(e)}")
             raise
     
+    def _apply_precision(self):
+        """
+        Reduz a precisão dos pesos do modelo de embeddings.
+        
+        fp16 vale para GPU; int8 usa quantização dinâmica das camadas
+        lineares do PyTorch e vale para CPU. Em caso de combinação não
+        suportada, o modelo permanece em fp32.
+        """
+        if self.precision == "fp32":
+            return
+        
+        # Em ONNX/OpenVINO o grafo já é otimizado pelo runtime; a conversão de pesos é do PyTorch
+        if self.backend != "torch":
+            logger.warning(f"Precisão {self.precision} requer o backend torch; usando fp32 com {self.backend}")
+            self.precision = "fp32"
+            return
+        
+        model = self.embedding_model.client
+        
+        if self.precision == "fp16" and self.device != "cpu":
+            model.half()
+        elif self.precision == "int8" and self.device == "cpu":
+            import torch
+            
+            self.embedding_model.client = torch.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        else:
+            logger.warning(f"Precisão {self.precision} não suportada em {self.device}; usando fp32")
+            self.precision = "fp32"
+    
     def create_embeddings(self, texts: List[str]) -> np.ndarray:
         """
         Cria embeddings para uma lista de textos.
@@ -62,6 +175,51 @@ class EmbeddingManager:
             logger.error(f"Erro ao criar embeddings: {str(e)}")
             raise
     
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Retorna o embedding de uma consulta, reaproveitando vetores já calculados.
+        
+        Args:
+            query: Texto da consulta
+            
+        Returns:
+            Vetor de embedding da consulta
+        """
+        with self._query_embeddings_lock:
+            vector = self._query_embeddings.get(query)
+        
+        if vector is None:
+            vector = self.embedding_model.embed_query(query)
+            with self._query_embeddings_lock:
+                self._query_embeddings[query] = vector
+        
+        return vector
+    
+    def precompute_query_embeddings(self, queries: List[str]) -> int:
+        """
+        Calcula em lote os embeddings de consultas conhecidas (ex.: exemplos da interface).
+        
+        Args:
+            queries: Lista de consultas
+            
+        Returns:
+            Número de embeddings calculados
+        """
+        with self._query_embeddings_lock:
+            missing = [q for q in dict.fromkeys(queries) if q not in self._query_embeddings]
+        
+        if not missing:
+            return 0
+        
+        # Uma única chamada em lote amortiza o custo do tokenizador e do modelo
+        vectors = self.embedding_model.embed_documents(missing)
+        with self._query_embeddings_lock:
+            for query, vector in zip(missing, vectors):
+                self._query_embeddings[query] = vector
+        
+        logger.info(f"Pré-calculados {len(missing)} embeddings de consultas")
+        return len(missing)
+    
     def create_vector_store(self, documents: List[Document], persist_directory: str = None) -> FAISS:
         """
         Cria um vector store FAISS a partir de documentos.
@@ -78,17 +236,24 @@ class EmbeddingManager:
                 logger.warning("Nenhum documento fornecido para criar vector store")
                 return None
             
-            # Criar vector store
-            self.vector_store = FAISS.from_documents(
-                documents=documents,
-                embedding=self.embedding_model
+            # Criar vector store com o índice configurado
+            texts = [doc.page_content for doc in documents]
+            vectors = np.asarray(self.embedding_model.embed_documents(texts), dtype="float32")
+            index = self._to_gpu(self._build_index(vectors))
+            
+            ids = [str(uuid.uuid4()) for _ in documents]
+            self.vector_store = FAISS(
+                embedding_function=self.embedding_model,
+                index=index,
+                docstore=InMemoryDocstore(dict(zip(ids, documents))),
+                index_to_docstore_id=dict(enumerate(ids)),
+                distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
             )
+            self.read_only = False
             
             # Persistir se diretório especificado
             if persist_directory:
-                os.makedirs(persist_directory, exist_ok=True)
-                self.vector_store.save_local(persist_directory)
-                logger.info(f"Vector store salvo em: {persist_directory}")
+                self.save_vector_store(persist_directory)
             
             logger.info(f"Vector store criado com {len(documents)} documentos")
             return self.vector_store
@@ -97,6 +262,207 @@ class EmbeddingManager:
             logger.error(f"Erro ao criar vector store: {str(e)}")
             raise
     
+    def _fit_index_factory(self, num_vectors: int, dim: int) -> str:
+        """
+        Ajusta a especificação do índice ao tamanho do corpus.
+        
+        Bases pequenas não têm pontos suficientes para treinar milhares de
+        listas IVF ou codebooks PQ; nesses casos o número de listas é reduzido
+        e, se preciso, a quantização é trocada por vetores exatos.
+        
+        Args:
+            num_vectors: Número de vetores a indexar
+            dim: Dimensão dos vetores
+            
+        Returns:
+            Especificação compatível com faiss.index_factory
+        """
+        parts = self.index_factory.split(",")
+        fitted = []
+        
+        for part in parts:
+            # IVF com quantizador opcional (ex.: IVF4096_HNSW32)
+            ivf = re.fullmatch(r"IVF(\d+)(_\w+)?", part)
+            if ivf:
+                nlist = min(int(ivf.group(1)), num_vectors // MIN_POINTS_PER_CENTROID)
+                if nlist > 1:
+                    fitted.append(f"IVF{nlist}{ivf.group(2) or ''}")
+                continue
+            
+            pq = re.fullmatch(r"PQ(\d+)(?:x(\d+))?(fs)?", part)
+            if pq:
+                m, nbits = int(pq.group(1)), int(pq.group(2) or 8)
+                if dim % m != 0 or num_vectors < MIN_POINTS_PER_CENTROID * 2 ** nbits:
+                    fitted.append("Flat")
+                    continue
+            
+            fitted.append(part)
+        
+        # Um índice sem codificador (ex.: só "IVF") não é válido
+        if not fitted or fitted[-1].startswith("IVF"):
+            fitted.append("Flat")
+        
+        return ",".join(fitted)
+    
+    def _build_index(self, vectors: np.ndarray) -> faiss.Index:
+        """
+        Cria, treina e popula o índice FAISS configurado.
+        
+        Args:
+            vectors: Matriz float32 com os embeddings dos documentos
+            
+        Returns:
+            Índice FAISS com os vetores adicionados
+        """
+        num_vectors, dim = vectors.shape
+        spec = self._fit_index_factory(num_vectors, dim)
+        if spec != self.index_factory:
+            logger.info(f"Índice '{self.index_factory}' ajustado para '{spec}' ({num_vectors} vetores)")
+        
+        # Embeddings normalizados + produto interno = similaridade de cosseno
+        faiss.normalize_L2(vectors)
+        index = faiss.index_factory(dim, spec, faiss.METRIC_INNER_PRODUCT)
+        self._apply_ef_construction(index, self.ef_construction)
+        if not index.is_trained:
+            index.train(vectors)
+        index.add(vectors)
+        
+        self._apply_nprobe(index, self.nprobe)
+        self._apply_ef_search(index, self.ef_search)
+        logger.info(f"Índice FAISS criado: {spec}")
+        return index
+    
+    def _to_gpu(self, index: faiss.Index) -> faiss.Index:
+        """
+        Copia o índice para a GPU 0 se use_gpu estiver ativo e houver suporte.
+        
+        Flat, IVFFlat, IVFPQ e IVFSQ têm versão em GPU; HNSW não, e nesse caso
+        (ou sem faiss-gpu/CUDA) o índice permanece na CPU.
+        
+        Args:
+            index: Índice na CPU
+            
+        Returns:
+            Índice na GPU, ou o próprio índice
+        """
+        self.on_gpu = False
+        if not self.use_gpu:
+            return index
+        
+        if not hasattr(faiss, "StandardGpuResources") or faiss.get_num_gpus() == 0:
+            logger.warning("FAISS_USE_GPU ativo, mas faiss-gpu/CUDA não está disponível; usando a CPU")
+            return index
+        
+        try:
+            if self._gpu_resources is None:
+                self._gpu_resources = faiss.StandardGpuResources()
+            gpu_index = faiss.index_cpu_to_gpu(self._gpu_resources, 0, index)
+        except RuntimeError as e:
+            logger.warning(f"Índice não suportado na GPU, usando a CPU: {str(e)}")
+            return index
+        
+        self.on_gpu = True
+        logger.info("Índice FAISS copiado para a GPU")
+        return gpu_index
+    
+    @staticmethod
+    def _apply_nprobe(index: faiss.Index, nprobe: int) -> bool:
+        """Define o nprobe em índices IVF; retorna False para outros tipos."""
+        try:
+            faiss.extract_index_ivf(index).nprobe = nprobe
+            return True
+        except RuntimeError:
+            # Índices IVF na GPU expõem o nprobe diretamente
+            if hasattr(index, "nprobe"):
+                index.nprobe = nprobe
+                return True
+            return False
+    
+    @staticmethod
+    def _apply_ef_construction(index: faiss.Index, ef_construction: int) -> bool:
+        """
+        Define o efConstruction do grafo HNSW (do índice ou do quantizador
+        IVF) antes da inserção dos vetores; retorna False para outros tipos.
+        """
+        try:
+            graph_index = faiss.downcast_index(faiss.extract_index_ivf(index).quantizer)
+        except RuntimeError:
+            graph_index = index
+        
+        if not hasattr(graph_index, "hnsw"):
+            return False
+        
+        graph_index.hnsw.efConstruction = ef_construction
+        return True
+    
+    @staticmethod
+    def _apply_ef_search(index: faiss.Index, ef_search: int) -> bool:
+        """
+        Define o efSearch em índices HNSW, ou no quantizador HNSW de um índice
+        IVF; retorna False para outros tipos.
+        """
+        params = faiss.ParameterSpace()
+        for name in ("efSearch", "quantizer_efSearch"):
+            try:
+                params.set_index_parameter(index, name, ef_search)
+                return True
+            except RuntimeError:
+                continue
+        return False
+    
+    def search_params(self) -> Dict[str, bool]:
+        """
+        Indica quais parâmetros de busca têm efeito no índice carregado.
+        
+        Returns:
+            Dicionário {"nprobe": índice IVF, "ef_search": índice ou quantizador HNSW}
+        """
+        if self.vector_store is None:
+            return {"nprobe": False, "ef_search": False}
+        
+        with self.index_lock:
+            index = self.vector_store.index
+            try:
+                graph_index = faiss.downcast_index(faiss.extract_index_ivf(index).quantizer)
+                is_ivf = True
+            except RuntimeError:
+                graph_index = index
+                # Índices IVF na GPU expõem o nprobe diretamente
+                is_ivf = hasattr(index, "nprobe")
+            return {"nprobe": is_ivf, "ef_search": hasattr(graph_index, "hnsw")}
+    
+    def set_ef_search(self, ef_search: int) -> bool:
+        """
+        Atualiza o tamanho da lista de candidatos das buscas HNSW.
+        
+        Args:
+            ef_search: Novo valor de efSearch
+            
+        Returns:
+            True se o índice atual usa HNSW e foi atualizado, False caso contrário
+        """
+        self.ef_search = ef_search
+        if self.vector_store is None:
+            return False
+        with self.index_lock:
+            return self._apply_ef_search(self.vector_store.index, ef_search)
+    
+    def set_nprobe(self, nprobe: int) -> bool:
+        """
+        Atualiza o número de listas IVF visitadas por busca.
+        
+        Args:
+            nprobe: Novo valor de nprobe
+            
+        Returns:
+            True se o índice atual é IVF e foi atualizado, False caso contrário
+        """
+        self.nprobe = nprobe
+        if self.vector_store is None:
+            return False
+        with self.index_lock:
+            return self._apply_nprobe(self.vector_store.index, nprobe)
+    
     def load_vector_store(self, persist_directory: str) -> FAISS:
         """
         Carrega um vector store existente.
@@ -112,12 +478,37 @@ class EmbeddingManager:
                 logger.warning(f"Diretório não encontrado: {persist_directory}")
                 return None
             
-            self.vector_store = FAISS.load_local(
-                persist_directory,
-                self.embedding_model,
-                allow_dangerous_deserialization=True
+            index_name = self.index_name
+            if not os.path.exists(os.path.join(persist_directory, f"{index_name}.faiss")):
+                # Índices salvos antes do nome com hash do modelo
+                logger.warning(f"Índice {index_name} não encontrado; usando o nome legado 'index'")
+                index_name = "index"
+            
+            if self.mmap:
+                self.vector_store = self._load_mmap(persist_directory, index_name)
+            else:
+                self.vector_store = FAISS.load_local(
+                    persist_directory,
+                    self.embedding_model,
+                    index_name=index_name,
+                    allow_dangerous_deserialization=True
+                )
+            self.persist_directory = persist_directory
+            
+            # Índices salvos antes da métrica de cosseno continuam usando L2
+            self.vector_store.distance_strategy = (
+                DistanceStrategy.MAX_INNER_PRODUCT
+                if self.vector_store.index.metric_type == faiss.METRIC_INNER_PRODUCT
+                else DistanceStrategy.EUCLIDEAN_DISTANCE
             )
             
+            self.set_nprobe(self.nprobe)
+            self.set_ef_search(self.ef_search)
+            
+            # O índice mapeado em memória permanece na CPU (somente leitura)
+            if not self.read_only:
+                self.vector_store.index = self._to_gpu(self.vector_store.index)
+            
             logger.info(f"Vector store carregado de: {persist_directory}")
             return self.vector_store
             
@@ -125,6 +516,57 @@ class EmbeddingManager:
             logger.error(f"Erro ao carregar vector store: {str(e)}")
             return None
     
+    def _load_mmap(self, persist_directory: str, index_name: str) -> FAISS:
+        """
+        Carrega o vector store mapeando o índice em memória.
+        
+        As páginas do índice são lidas sob demanda e compartilhadas entre
+        processos; em contrapartida, o índice fica somente leitura.
+        
+        Args:
+            persist_directory: Diretório salvo por save_local
+            index_name: Nome dos arquivos do índice
+            
+        Returns:
+            Vector store com o índice mapeado
+        """
+        index = faiss.read_index(
+            os.path.join(persist_directory, f"{index_name}.faiss"),
+            faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        )
+        
+        # Mesmo formato gravado por FAISS.save_local
+        with open(os.path.join(persist_directory, f"{index_name}.pkl"), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        
+        self.read_only = True
+        return FAISS(
+            embedding_function=self.embedding_model,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id
+        )
+    
+    @staticmethod
+    def to_similarity(index: faiss.Index, scores: np.ndarray) -> np.ndarray:
+        """
+        Converte os scores do índice em similaridade de cosseno.
+        
+        Em índices de produto interno o score já é o cosseno; em índices L2
+        (bases antigas), a distância quadrática entre vetores normalizados
+        vale 2 - 2·cos.
+        
+        Args:
+            index: Índice FAISS que produziu os scores
+            scores: Scores retornados pela busca
+            
+        Returns:
+            Similaridades de cosseno
+        """
+        if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            return scores
+        return 1.0 - scores / 2.0
+    
     def similarity_search(self, query: str, k: int = 5, score_threshold: float = 0.7) -> List[Document]:
         """
         Realiza busca por similaridade no vector store.
@@ -142,8 +584,8 @@ class EmbeddingManager:
             return []
         
         try:
-            # Busca com scores
-            docs_with_scores = self.vector_store.similarity_search_with_score(query, k=k)
+            # Busca com similaridade de cosseno
+            docs_with_scores = self.similarity_search_by_vectors([self.embed_query(query)], k=k)[0]
             
             # Filtrar por score threshold
             filtered_docs = [
@@ -151,13 +593,50 @@ class EmbeddingManager:
                 if score >= score_threshold
             ]
             
-            logger.info(f"Encontrados {len(filtered_docs)} documentos similares para: {query[:50]}...")
+            logger.info("Encontrados %d documentos similares para: %s...", len(filtered_docs), query[:50])
             return filtered_docs
             
         except Exception as e:
             logger.error(f"Erro na busca por similaridade: {str(e)}")
             return []
     
+    def similarity_search_by_vectors(self, vectors: List[List[float]], k: int = 5) -> List[List[tuple]]:
+        """
+        Busca várias consultas com uma única chamada ao índice FAISS.
+        
+        Args:
+            vectors: Embeddings das consultas
+            k: Número de documentos por consulta
+            
+        Returns:
+            Para cada consulta, lista de (documento, similaridade de cosseno)
+            em ordem decrescente de similaridade
+        """
+        if self.vector_store is None:
+            logger.warning("Vector store não inicializado")
+            return [[] for _ in vectors]
+        
+        xq = np.asarray(vectors, dtype="float32")
+        faiss.normalize_L2(xq)
+        
+        with self.index_lock:
+            index = self.vector_store.index
+            scores, indices = index.search(xq, k)
+            similarities = self.to_similarity(index, scores)
+            
+            index_to_id = self.vector_store.index_to_docstore_id
+            docstore = self.vector_store.docstore
+            
+            results = []
+            for row_similarities, row_indices in zip(similarities, indices):
+                results.append([
+                    (docstore.search(index_to_id[idx]), float(similarity))
+                    for similarity, idx in zip(row_similarities, row_indices)
+                    if idx != -1
+                ])
+        
+        return results
+    
     def get_vector_store_info(self) -> Dict[str, Any]:
         """
         Retorna informações sobre o vector store.
@@ -173,7 +652,15 @@ class EmbeddingManager:
             info = {
                 "status": "initialized",
                 "model_name": self.model_name,
-                "index_type": "FAISS"
+                "device": self.device,
+                "backend": self.backend,
+                "precision": self.precision,
+                "mmap": self.read_only,
+                "gpu": self.on_gpu,
+                "index_type": "FAISS",
+                "index_factory": self.index_factory,
+                "nprobe": self.nprobe,
+                "ef_search": self.ef_search
             }
             
             # Adicionar número de documentos se possível
@@ -200,11 +687,88 @@ class EmbeddingManager:
             logger.warning("Vector store não inicializado")
             return False
         
+        if self.read_only:
+            logger.warning("Vector store mapeado em memória (FAISS_MMAP) é somente leitura")
+            return False
+        
         try:
-            self.vector_store.add_documents(documents)
+            if not documents:
+                return True
+            
+            # Codificar todos os chunks em uma única chamada (em lotes de batch_size)
+            texts = [doc.page_content for doc in documents]
+            vectors = self.embedding_model.embed_documents(texts)
+            with self.index_lock:
+                self.vector_store.add_embeddings(
+                    zip(texts, vectors),
+                    metadatas=[doc.metadata for doc in documents]
+                )
             logger.info(f"Adicionados {len(documents)} documentos ao vector store")
+            
+            if self.persist_directory:
+                self.schedule_persist()
             return True
             
         except Exception as e:
             logger.error(f"Erro ao adicionar documentos: {str(e)}")
             return False
+    
+    def save_vector_store(self, persist_directory: Optional[str] = None) -> bool:
+        """
+        Salva o vector store em disco imediatamente.
+        
+        Args:
+            persist_directory: Diretório de destino (padrão: o último usado)
+            
+        Returns:
+            True se salvou, False caso contrário
+        """
+        persist_directory = persist_directory or self.persist_directory
+        if self.vector_store is None or not persist_directory:
+            return False
+        
+        with self._persist_lock, self.index_lock:
+            if self._persist_timer is not None:
+                self._persist_timer.cancel()
+                self._persist_timer = None
+            
+            # Índices na GPU não são serializáveis: salvar uma cópia na CPU
+            gpu_index = self.vector_store.index if self.on_gpu else None
+            try:
+                os.makedirs(persist_directory, exist_ok=True)
+                if gpu_index is not None:
+                    self.vector_store.index = faiss.index_gpu_to_cpu(gpu_index)
+                self.vector_store.save_local(persist_directory, index_name=self.index_name)
+                self.persist_directory = persist_directory
+                self._dirty = False
+                logger.info(f"Vector store salvo em: {persist_directory} ({self.index_name})")
+                return True
+            except Exception as e:
+                logger.error(f"Erro ao salvar vector store: {str(e)}")
+                return False
+            finally:
+                if gpu_index is not None:
+                    self.vector_store.index = gpu_index
+    
+    def schedule_persist(self) -> None:
+        """
+        Marca o vector store como alterado e agenda a gravação.
+        
+        Inclusões seguidas dentro de persist_delay segundos resultam em uma
+        única gravação; o que estiver pendente é salvo ao encerrar o processo.
+        """
+        with self._persist_lock:
+            if not self._flush_at_exit:
+                atexit.register(self.flush)
+                self._flush_at_exit = True
+            self._dirty = True
+            
+            if self._persist_timer is None:
+                self._persist_timer = threading.Timer(self.persist_delay, self.flush)
+                self._persist_timer.daemon = True
+                self._persist_timer.start()
+    
+    def flush(self) -> None:
+        """Grava o vector store se houver alterações pendentes."""
+        if self._dirty:
+            self.save_vector_store()
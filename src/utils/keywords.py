@@ -0,0 +1,70 @@
+"""
+Vetorização de palavras-chave para o reranking.
+"""
+
+from typing import List, Sequence
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+
+# Vetorizador binário de palavras (mesma tokenização de str.split). O hash
+# (MurmurHash3) é estável entre processos, ao contrário de hash(), então os
+# ids podem ser gravados nos metadados do índice na ingestão
+KEYWORD_VECTORIZER = HashingVectorizer(
+    tokenizer=str.split,
+    token_pattern=None,
+    lowercase=True,
+    binary=True,
+    norm=None,
+    alternate_sign=False,
+    n_features=2**18
+)
+
+# Chave dos ids de palavras nos metadados dos chunks
+TOKEN_HASHES_KEY = "doc_token_hashes"
+
+
+def keyword_ids(texts: Sequence[str]) -> List[np.ndarray]:
+    """
+    Calcula os ids (hashes) das palavras distintas de cada texto.
+    
+    Args:
+        texts: Textos a vetorizar
+        
+    Returns:
+        Lista de arrays uint32 ordenados, um por texto
+    """
+    matrix = KEYWORD_VECTORIZER.transform(texts)
+    matrix.sort_indices()
+    return [
+        matrix.indices[matrix.indptr[i]:matrix.indptr[i + 1]].astype(np.uint32)
+        for i in range(matrix.shape[0])
+    ]
+
+
+def keyword_overlap(query_ids: np.ndarray, ids: Sequence[np.ndarray]) -> np.ndarray:
+    """
+    Conta as palavras da consulta presentes em cada documento.
+    
+    Os ids de todos os documentos são concatenados e procurados de uma vez
+    (busca binária) entre os ids ordenados da consulta; a contagem por
+    documento sai de uma soma acumulada, sem montar matrizes nem conjuntos.
+    
+    Args:
+        query_ids: Ids ordenados e distintos das palavras da consulta
+        ids: Ids distintos das palavras de cada documento
+        
+    Returns:
+        Array com o número de palavras em comum por documento
+    """
+    if len(ids) == 0 or len(query_ids) == 0:
+        return np.zeros(len(ids), dtype=np.int64)
+    
+    lengths = np.fromiter((len(row) for row in ids), dtype=np.int64, count=len(ids))
+    all_ids = np.concatenate(ids)
+    
+    positions = np.minimum(np.searchsorted(query_ids, all_ids), len(query_ids) - 1)
+    matches = np.zeros(len(all_ids) + 1, dtype=np.int64)
+    np.cumsum(query_ids[positions] == all_ids, out=matches[1:])
+    
+    ends = np.cumsum(lengths)
+    return matches[ends] - matches[ends - lengths]
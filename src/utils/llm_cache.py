@@ -0,0 +1,259 @@
+"""
+Cache de respostas do LLM endereçado por conteúdo.
+"""
+
+import os
+import json
+import atexit
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Tuple
+from cachetools import TTLCache
+from .serialization import to_json_bytes
+from .llm_response import extract_text
+import logging
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """Armazena o texto das respostas do LLM pelo hash SHA-256 do prompt.
+    
+    Como o prompt já contém a consulta e as evidências, prompts iguais
+    enviados ao mesmo modelo implicam a mesma pergunta sobre os mesmos
+    documentos, e a resposta pode ser reaproveitada sem nova inferência.
+    Só LLMs determinísticos (temperatura 0) usam o cache; com amostragem,
+    cada chamada vai ao modelo."""
+    
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[float] = None,
+                 path: Optional[str] = None):
+        """
+        Inicializa o cache.
+        
+        Args:
+            maxsize: Número máximo de respostas (padrão: LLM_CACHE_MAX_ENTRIES ou 1024)
+            ttl: Validade das respostas em segundos (padrão: LLM_CACHE_TTL ou 3600)
+            path: Arquivo JSON em que as respostas são mantidas entre execuções:
+                carregado na criação e gravado ao encerrar o processo
+                (padrão: LLM_CACHE_PATH; vazio desativa)
+        """
+        self._cache = TTLCache(
+            maxsize=maxsize or int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")),
+            ttl=ttl or float(os.getenv("LLM_CACHE_TTL", "3600"))
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        
+        self.path = path if path is not None else os.getenv("LLM_CACHE_PATH", "")
+        if self.path:
+            self.load(self.path)
+            atexit.register(self.save, self.path)
+    
+    def __len__(self) -> int:
+        return len(self._cache)
+    
+    @staticmethod
+    def llm_params(llm) -> Tuple[str, Optional[float]]:
+        """
+        Identifica o modelo e a temperatura de um LLM.
+        
+        Args:
+            llm: LLM (ex.: ChatGoogleGenerativeAI)
+        
+        Returns:
+            Tupla (nome do modelo, temperatura ou None se não informada)
+        """
+        model = getattr(llm, "model", None) or getattr(llm, "model_name", None) or type(llm).__name__
+        temperature = getattr(llm, "temperature", None)
+        return str(model), (float(temperature) if temperature is not None else None)
+    
+    @staticmethod
+    def _serialize_prompt(prompt: Any) -> Any:
+        """
+        Converte o prompt em uma estrutura estável para o hash.
+        
+        Mensagens viram pares papel/conteúdo, sem ids, metadados ou a
+        representação textual dos objetos.
+        
+        Args:
+            prompt: String, PromptValue ou lista de mensagens
+        
+        Returns:
+            String ou lista de dicionários com "role" e "content"
+        """
+        if isinstance(prompt, str):
+            return prompt
+        if hasattr(prompt, "to_messages"):
+            prompt = prompt.to_messages()
+        
+        messages = []
+        for message in prompt:
+            if isinstance(message, str):
+                messages.append({"role": "human", "content": message})
+            elif isinstance(message, (tuple, list)) and len(message) == 2:
+                messages.append({"role": str(message[0]), "content": message[1]})
+            elif isinstance(message, dict):
+                messages.append({"role": message.get("role", ""), "content": message.get("content", "")})
+            else:
+                messages.append({"role": getattr(message, "type", type(message).__name__),
+                                 "content": getattr(message, "content", str(message))})
+        return messages
+    
+    @classmethod
+    def key(cls, namespace: str, prompt: Any, model: str = "", temperature: float = 0.0) -> str:
+        """
+        Calcula a chave de um prompt.
+        
+        Args:
+            namespace: Identifica o uso (ex.: "answer"), separando prompts de agentes distintos
+            prompt: Prompt enviado ao LLM
+            model: Nome do modelo
+            temperature: Temperatura do modelo
+        
+        Returns:
+            Hash SHA-256 em hexadecimal
+        """
+        payload = json.dumps(
+            [namespace, model, temperature, cls._serialize_prompt(prompt)],
+            ensure_ascii=False, sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def key_for(self, llm, prompt: Any, namespace: str) -> Optional[str]:
+        """
+        Calcula a chave de um prompt para um LLM, se as respostas dele
+        puderem ser reaproveitadas.
+        
+        Args:
+            llm: LLM que responderá ao prompt
+            prompt: Prompt
+            namespace: Identificação do uso
+        
+        Returns:
+            Hash SHA-256 ou None se o LLM amostra (temperatura > 0 ou não informada)
+        """
+        model, temperature = self.llm_params(llm)
+        if temperature is None or temperature > 0:
+            return None
+        return self.key(namespace, prompt, model, temperature)
+    
+    def get(self, key: str) -> Optional[str]:
+        """Retorna a resposta armazenada para a chave, se houver."""
+        with self._lock:
+            text = self._cache.get(key)
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return text
+    
+    def set(self, key: str, text: str) -> None:
+        """Armazena o texto de uma resposta."""
+        with self._lock:
+            self._cache[key] = text
+    
+    def invoke(self, llm, prompt: Any, namespace: str) -> str:
+        """
+        Retorna a resposta em cache ou chama o LLM e armazena o resultado.
+        
+        Args:
+            llm: LLM com método invoke
+            prompt: Prompt
+            namespace: Identificação do uso
+        
+        Returns:
+            Texto da resposta
+        """
+        key = self.key_for(llm, prompt, namespace)
+        if key is None:
+            return extract_text(llm.invoke(prompt))
+        
+        text = self.get(key)
+        if text is not None:
+            logger.info("Resposta do LLM em cache (%s)", namespace)
+            return text
+        
+        text = extract_text(llm.invoke(prompt))
+        self.set(key, text)
+        return text
+    
+    async def ainvoke(self, llm, prompt: Any, namespace: str) -> str:
+        """Versão assíncrona de invoke."""
+        key = self.key_for(llm, prompt, namespace)
+        if key is None:
+            return extract_text(await llm.ainvoke(prompt))
+        
+        text = self.get(key)
+        if text is not None:
+            logger.info("Resposta do LLM em cache (%s)", namespace)
+            return text
+        
+        text = extract_text(await llm.ainvoke(prompt))
+        self.set(key, text)
+        return text
+    
+    def stats(self) -> Dict[str, Any]:
+        """Retorna acertos, falhas e tamanho do cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._cache)
+            }
+    
+    def load(self, path: str) -> int:
+        """
+        Carrega respostas gravadas por save.
+        
+        Args:
+            path: Arquivo JSON
+        
+        Returns:
+            Número de respostas carregadas
+        """
+        if not os.path.exists(path):
+            return 0
+        
+        try:
+            with open(path, "rb") as f:
+                entries = json.loads(f.read())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cache do LLM não carregado de {path}: {str(e)}")
+            return 0
+        
+        # As respostas carregadas recebem uma nova validade (TTL)
+        with self._lock:
+            for key, text in entries.items():
+                self._cache[key] = text
+        
+        logger.info(f"Cache do LLM carregado: {len(entries)} respostas de {path}")
+        return len(entries)
+    
+    def save(self, path: str) -> None:
+        """
+        Grava as respostas válidas em um arquivo JSON.
+        
+        Args:
+            path: Arquivo JSON
+        """
+        with self._lock:
+            entries = dict(self._cache.items())
+        
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(to_json_bytes(entries))
+            logger.info(f"Cache do LLM gravado: {len(entries)} respostas em {path}")
+        except OSError as e:
+            logger.warning(f"Cache do LLM não gravado em {path}: {str(e)}")
+    
+    def clear(self) -> None:
+        """Remove todas as respostas armazenadas."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
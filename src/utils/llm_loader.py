@@ -3,14 +3,27 @@ Módulo para carregamento e configuração do Google Gemini.
 """
 
 import os
+import threading
 from typing import Optional, Dict, Any, List
+import httpx
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.language_models.base import BaseLanguageModel
 from dotenv import load_dotenv
+import logging
+
+# Configurar logging (o nível e os handlers são definidos pela aplicação)
+logger = logging.getLogger(__name__)
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
+# Endpoint de metadados dos modelos: valida chave e modelo sem gerar texto
+GEMINI_MODELS_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+
+# Configurações (modelo, chave) cuja verificação no Gemini já teve sucesso
+# neste processo; evita repetir a requisição a cada verificação de status
+_VERIFIED_CONNECTIONS = set()
+
 
 class LLMLoader:
     """Classe para carregar e configurar o Google Gemini."""
@@ -22,10 +35,19 @@ class LLMLoader:
         self.embedding_model = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
         self._llm: Optional[BaseLanguageModel] = None
         
-        self.temperature = float(os.getenv("LLM_TEMPERATURE", "0.1"))
+        # Cliente HTTP das verificações de conexão (mantém a conexão TLS aberta)
+        self._http_client: Optional[httpx.Client] = None
+        self._http_client_lock = threading.Lock()
+        
+        self.temperature = float(os.getenv("LLM_TEMPERATURE", "0.0"))
         self.top_p = float(os.getenv("LLM_TOP_P", "0.9"))
         self.top_k = int(os.getenv("LLM_TOP_K", "40"))
         self.repeat_penalty = float(os.getenv("LLM_REPEAT_PENALTY", "1.1"))
+        
+        # Falhas transitórias (429/503, timeout) são repetidas pelo próprio cliente
+        # do Gemini, com espera exponencial, antes de chegarem aos agentes
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "6"))
+        self.timeout = float(os.getenv("LLM_TIMEOUT", "0")) or None
     
     def get_llm(self) -> BaseLanguageModel:
         """
@@ -46,6 +68,8 @@ class LLMLoader:
                 temperature=self.temperature,
                 top_p=self.top_p,
                 top_k=self.top_k,
+                max_retries=self.max_retries,
+                timeout=self.timeout,
                 convert_system_message_to_human=True
             )
         return self._llm
@@ -91,7 +115,55 @@ class LLMLoader:
         Returns:
             True se a conexão estiver funcionando, False caso contrário
         """
-        return self._check_gemini_connection()
+        key = (self.model_name, self.gemini_api_key)
+        if key in _VERIFIED_CONNECTIONS:
+            return True
+        
+        connected = self._check_gemini_connection()
+        if connected:
+            _VERIFIED_CONNECTIONS.add(key)
+        return connected
+    
+    @staticmethod
+    def clear_connection_cache() -> None:
+        """Descarta as verificações de conexão memorizadas, forçando um novo teste."""
+        _VERIFIED_CONNECTIONS.clear()
+    
+    def probe_connection(self, timeout: float = 2.0) -> bool:
+        """
+        Verificação leve: consulta os metadados do modelo, sem gerar texto.
+        
+        A conexão HTTP é reaproveitada entre chamadas, sendo adequada para
+        checagens frequentes (ex.: a cada expiração do cache da interface).
+        
+        Args:
+            timeout: Tempo máximo de espera pela resposta, em segundos
+            
+        Returns:
+            True se a chave e o modelo são aceitos pela API, False caso contrário
+        """
+        if not self.gemini_api_key:
+            return False
+        
+        try:
+            return self._get_model_metadata(timeout).status_code == 200
+        except httpx.HTTPError:
+            return False
+    
+    def _get_model_metadata(self, timeout: float = 2.0) -> httpx.Response:
+        """Consulta os metadados do modelo configurado na API do Gemini."""
+        return self._get_http_client().get(
+            f"{GEMINI_MODELS_URL}/{self._get_gemini_model_name()}",
+            headers={"x-goog-api-key": self.gemini_api_key},
+            timeout=timeout
+        )
+    
+    def _get_http_client(self) -> httpx.Client:
+        """Retorna o cliente HTTP compartilhado, criando-o na primeira chamada."""
+        with self._http_client_lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(timeout=2.0)
+            return self._http_client
     
     def _check_gemini_connection(self) -> bool:
         """
@@ -104,19 +176,14 @@ class LLMLoader:
             if not self.gemini_api_key:
                 return False
             
-            # Tentar criar uma instância do LLM para verificar a conexão
-            test_llm = ChatGoogleGenerativeAI(
-                model="gemini-2.0-flash",
-                google_api_key=self.gemini_api_key,
-                temperature=0.1
-            )
-            
-            # Fazer uma chamada simples para testar
-            response = test_llm.invoke("Teste de conexão")
-            return response is not None
+            response = self._get_model_metadata()
+            if response.status_code != 200:
+                logger.warning(f"Erro na conexão com Gemini: HTTP {response.status_code}")
+                return False
+            return True
             
         except Exception as e:
-            print(f"Erro na conexão com Gemini: {str(e)}")
+            logger.warning(f"Erro na conexão com Gemini: {str(e)}")
             return False
     
     
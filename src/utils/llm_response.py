@@ -0,0 +1,25 @@
+"""
+Texto das respostas do LLM.
+"""
+
+from typing import Any
+
+
+def extract_text(response: Any) -> str:
+    """
+    Extrai o texto de uma resposta (ou trecho em streaming) do LLM.
+    
+    Os modelos de chat retornam mensagens (AIMessage/AIMessageChunk), cujo
+    texto é lido diretamente; respostas já em texto (cache, adaptadores)
+    são convertidas com str.
+    
+    Args:
+        response: Resposta do LLM
+        
+    Returns:
+        Texto da resposta
+    """
+    try:
+        return response.content
+    except AttributeError:
+        return str(response)
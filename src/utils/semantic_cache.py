@@ -0,0 +1,98 @@
+"""
+Cache semântico de resultados de verificação.
+"""
+
+import threading
+from typing import Any, List, Optional, Tuple
+import numpy as np
+import faiss
+import logging
+
+# Configurar logging (o nível e os handlers são definidos pela aplicação)
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """Reaproveita resultados de consultas cujo embedding é quase idêntico.
+    
+    Os embeddings do projeto são normalizados, então o produto interno
+    (IndexFlatIP) equivale à similaridade de cosseno."""
+    
+    def __init__(self, threshold: float = 0.95, max_entries: int = 512):
+        """
+        Inicializa o cache semântico.
+        
+        Args:
+            threshold: Similaridade mínima (cosseno) para considerar um acerto
+            max_entries: Número máximo de consultas armazenadas
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._index: Optional[faiss.IndexFlatIP] = None
+        self._vectors: List[np.ndarray] = []
+        self._entries: List[Any] = []
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @staticmethod
+    def _as_row(vector) -> np.ndarray:
+        """Converte um vetor para a matriz float32 (1, dim) esperada pelo FAISS."""
+        return np.asarray(vector, dtype="float32").reshape(1, -1)
+    
+    def lookup(self, vector) -> Optional[Tuple[float, Any]]:
+        """
+        Busca o resultado da consulta mais similar já armazenada.
+        
+        Args:
+            vector: Embedding normalizado da consulta
+        
+        Returns:
+            Tupla (similaridade, resultado) se acima do limiar, None caso contrário
+        """
+        with self._lock:
+            if self._index is None or self._index.ntotal == 0:
+                return None
+            
+            scores, ids = self._index.search(self._as_row(vector), 1)
+            score, idx = float(scores[0][0]), int(ids[0][0])
+            if idx < 0 or score < self.threshold:
+                return None
+            
+            return score, self._entries[idx]
+    
+    def add(self, vector, result: Any) -> None:
+        """
+        Armazena o resultado de uma consulta.
+        
+        Args:
+            vector: Embedding normalizado da consulta
+            result: Resultado da verificação
+        """
+        row = self._as_row(vector)
+        
+        with self._lock:
+            if self._index is None:
+                self._index = faiss.IndexFlatIP(row.shape[1])
+            
+            # Ao atingir o limite, descartar a metade mais antiga e reconstruir
+            if len(self._entries) >= self.max_entries:
+                keep = self.max_entries // 2
+                self._vectors = self._vectors[-keep:]
+                self._entries = self._entries[-keep:]
+                self._index.reset()
+                if self._vectors:
+                    self._index.add(np.vstack(self._vectors))
+            
+            self._vectors.append(row)
+            self._entries.append(result)
+            self._index.add(row)
+    
+    def clear(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._vectors = []
+            self._entries = []
+            if self._index is not None:
+                self._index.reset()
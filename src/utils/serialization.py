@@ -0,0 +1,60 @@
+"""
+Serialização JSON dos resultados do DesmentAI.
+"""
+
+import json
+import dataclasses
+from typing import Any
+import logging
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é instalado com as dependências
+    orjson = None
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+
+def _default(obj: Any) -> Any:
+    """Converte tipos não suportados em dicionário (dataclasses) ou texto (ex.: Document do LangChain)."""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    return str(obj)
+
+
+def to_json_bytes(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serializa um objeto para JSON em UTF-8.
+    
+    Usa orjson quando disponível, que também serializa dataclasses e
+    arrays numpy presentes nos resultados dos agentes.
+    
+    Args:
+        obj: Objeto a serializar
+        indent: Indentar com 2 espaços
+        
+    Returns:
+        JSON em bytes (UTF-8)
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+    
+    return json.dumps(obj, default=_default, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+def to_json(obj: Any, indent: bool = False) -> str:
+    """
+    Serializa um objeto para uma string JSON.
+    
+    Args:
+        obj: Objeto a serializar
+        indent: Indentar com 2 espaços
+        
+    Returns:
+        String JSON
+    """
+    return to_json_bytes(obj, indent).decode("utf-8")
@@ -0,0 +1,53 @@
+"""
+Testes da contagem de palavras-chave em comum usada no reranking.
+"""
+
+import numpy as np
+import pytest
+
+from src.utils.keywords import keyword_ids, keyword_overlap
+
+
+def naive_overlap(query_ids, ids):
+    """Contagem de referência por interseção de conjuntos."""
+    query = set(query_ids.tolist())
+    return [len(query & set(row.tolist())) for row in ids]
+
+
+@pytest.mark.parametrize("query, documents", [
+    ("vacina causa autismo", ["a vacina não causa autismo", "urnas eletrônicas", "autismo"]),
+    ("vacina causa autismo", ["", "vacina", ""]),
+    ("", ["a vacina não causa autismo", ""]),
+    ("zzz", ["a b c", "x y"]),
+    ("A Vacina", ["a vacina a vacina", "VACINA"]),
+])
+def test_matches_set_intersection(query, documents):
+    query_ids = keyword_ids([query])[0]
+    ids = keyword_ids(documents)
+    
+    assert keyword_overlap(query_ids, ids).tolist() == naive_overlap(query_ids, ids)
+
+
+def test_ids_beyond_largest_query_id():
+    # Ids maiores que todos os da consulta caem após o fim do array ordenado
+    query_ids = np.array([5, 10], dtype=np.uint32)
+    ids = [np.array([1, 10, 20], dtype=np.uint32), np.array([30, 40], dtype=np.uint32)]
+    
+    assert keyword_overlap(query_ids, ids).tolist() == [1, 0]
+
+
+def test_empty_document():
+    query_ids = np.array([3, 7], dtype=np.uint32)
+    ids = [np.array([], dtype=np.uint32), np.array([3, 7], dtype=np.uint32)]
+    
+    assert keyword_overlap(query_ids, ids).tolist() == [0, 2]
+
+
+def test_empty_query():
+    ids = [np.array([1, 2], dtype=np.uint32), np.array([], dtype=np.uint32)]
+    
+    assert keyword_overlap(np.array([], dtype=np.uint32), ids).tolist() == [0, 0]
+
+
+def test_no_documents():
+    assert keyword_overlap(np.array([1], dtype=np.uint32), []).tolist() == []
@@ -0,0 +1,43 @@
+"""
+Testes do roteamento do agente supervisor.
+"""
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.agents.supervisor import SupervisorAgent
+
+
+@pytest.mark.parametrize("reply", [
+    "RETRIEVER",
+    "SELF_CHECK",
+    "ANSWER",
+    "SAFETY",
+    "retriever",
+    "**RETRIEVER**",
+    "RETRIEVER.",
+    "Agente: RETRIEVER",
+    "Rota: SELF_CHECK",
+    "O agente é RETRIEVER",
+    "Safety first, sorry",
+])
+def test_reply_with_agent_name_routes_to_retriever(reply):
+    assert SupervisorAgent._parse_route(reply) == "RETRIEVER"
+
+
+@pytest.mark.parametrize("reply", ["", "   ", "desconhecido"])
+def test_empty_or_single_word_reply_routes_to_retriever(reply):
+    assert SupervisorAgent._parse_route(reply) == "RETRIEVER"
+
+
+def test_reply_without_agent_name_is_redirect():
+    reply = "Olá! Eu só verifico notícias. Envie uma afirmação para checar."
+    assert SupervisorAgent._parse_route(reply) == reply
+
+
+def test_redirect_is_stripped():
+    assert SupervisorAgent._parse_route("  Posso ajudar com notícias.\n") == "Posso ajudar com notícias."
+
+
+def test_message_response():
+    assert SupervisorAgent._parse_route(AIMessage(content="Rota: ANSWER")) == "RETRIEVER"